@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import News, Tags
+from .models import ArticleRetry, News, Tags
 
 # Register your models here.
 
@@ -22,3 +22,18 @@ class AdminNews(admin.ModelAdmin):
     ordering = [
         "created_at",
     ]
+
+
+@admin.register(ArticleRetry)
+class AdminArticleRetry(admin.ModelAdmin):
+    list_display = [
+        "source",
+        "error_class",
+        "attempts",
+        "next_attempt_at",
+        "updated_at",
+    ]
+    list_filter = ["error_class"]
+    search_fields = ["source"]
+    search_help_text = "Search for failed articles via 'source'"
+    ordering = ["next_attempt_at"]
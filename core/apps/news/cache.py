@@ -0,0 +1,191 @@
+import hashlib
+import time
+from calendar import timegm
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+NEWS = "news"
+TAGS = "tags"
+
+KEY_PREFIX = "news-api"
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+def generation_key(namespace):
+    return f"{KEY_PREFIX}:generation:{namespace}"
+
+
+def get_generations(namespaces):
+    """
+    Current generation of every namespace. Cached responses embed these, so
+    bumping a generation orphans every response built from that namespace.
+    """
+    keys = {generation_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+
+    generations = {}
+    for key, namespace in keys.items():
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        generations[namespace] = found[key]
+    return generations
+
+
+def bump(namespaces):
+    for namespace in namespaces:
+        key = generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*namespaces):
+    # Bump now so this process sees its own writes, and again after commit
+    # so a reader racing the transaction can't keep a stale response alive.
+    bump(namespaces)
+    transaction.on_commit(lambda: bump(namespaces))
+
+
+def normalize_params(query_params, list_params=()):
+    items = []
+    for name in sorted(query_params):
+        for value in sorted(query_params.getlist(name)):
+            if name in list_params:
+                parts = sorted({part.strip() for part in value.split(",")} - {""})
+                # Keep "only separators" distinct from "empty": filters treat
+                # the former as matching nothing.
+                value = ",".join(parts) if parts or not value.strip() else ","
+            items.append((name, value.strip()))
+    return urlencode(items)
+
+
+def response_key(request, namespaces, list_params=()):
+    generations = get_generations(namespaces)
+    raw = "|".join(
+        [
+            request.get_host(),
+            request.path,
+            normalize_params(request.query_params, list_params),
+            *(f"{namespace}={generations[namespace]}" for namespace in namespaces),
+        ]
+    )
+    return f"{KEY_PREFIX}:response:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Return the cached value for ``key`` or compute it.
+
+    Concurrent misses on the same key are collapsed: the first caller takes
+    a short lock and computes, the others wait for its result and only fall
+    back to computing themselves if it doesn't show up in time.
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        try:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if cache.get(lock_key) is None:
+            break
+
+    return compute()
+
+
+def cached_response(*namespaces, list_params=()):
+    """
+    Cache the data of successful GET responses of a view method.
+
+    The key is built from the host, path and normalized query parameters,
+    plus the generation of each namespace the response depends on.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = response_key(request, namespaces, list_params)
+            response = None
+
+            def compute():
+                nonlocal response
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return None
+                return response.data
+
+            data = get_or_compute(key, compute, timeout=settings.NEWS_API_CACHE_TIMEOUT)
+            if response is not None:
+                return response
+            return Response(data, status=status.HTTP_200_OK)
+
+        return wrapper
+
+    return decorator
+
+
+def make_etag(*parts):
+    return f'W/"{hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()}"'
+
+
+def conditional_response(freshness):
+    """
+    Answer If-None-Match / If-Modified-Since before running a view method.
+
+    ``freshness(view, request, *args, **kwargs)`` returns ``(etag,
+    last_modified)`` and should be cheap, as it runs on every request; when
+    the client is up to date a 304 is returned without serializing anything.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = freshness(view, request, *args, **kwargs)
+            timestamp = last_modified and timegm(last_modified.utctimetuple())
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+
+            if response.status_code in (
+                status.HTTP_200_OK,
+                status.HTTP_304_NOT_MODIFIED,
+            ):
+                if etag:
+                    response.headers.setdefault("ETag", quote_etag(etag))
+                if timestamp:
+                    response.headers.setdefault("Last-Modified", http_date(timestamp))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,229 @@
+"""
+Coordination of crawls split across Celery workers.
+
+A crawl holds a lease in Redis while it runs, so a scheduled run never
+overlaps the previous one. Article urls are claimed before they're rendered,
+so two workers, or two overlapping crawls, never render the same source. The
+summaries of the subtasks are merged back into one crawl summary.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from scraper import connection
+from scraper.runner import RESULT_STATS
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY = "crawl:{}:lease"
+PENDING_KEY = "crawl:{}:pending"
+CLAIM_KEY = "crawl:zoomit:claim:{}"
+# Sources claimed by a crawl, to release them all if it dies.
+CLAIMED_KEY = "crawl:zoomit:claimed:{}"
+# Outcomes after which the article is stored; other claims are released so
+# a later crawl can try again.
+STORED_OUTCOMES = {"created", "updated", "unchanged", "skipped"}
+
+
+def redis_client():
+    return connection.get_redis(settings.CRAWL_REDIS_URL)
+
+
+class CrawlLease:
+    """
+    Exclusive, expiring right to run the crawl called ``name``.
+
+    The lease is a Redis key holding the owner and the state of the crawl as
+    JSON. It expires ``ttl`` seconds after the last heartbeat, so the lease
+    of a crawl whose worker died is freed without anyone releasing it.
+    """
+
+    def __init__(self, name, owner, ttl=None, client=None):
+        self.name = name
+        self.owner = owner
+        self.ttl = ttl or settings.CRAWL_LEASE_TTL
+        self.client = client or redis_client()
+        self.key = LEASE_KEY.format(name)
+
+    def acquire(self, **state):
+        now = time.time()
+        value = {
+            **state,
+            "owner": self.owner,
+            "started_at": now,
+            "heartbeat_at": now,
+        }
+        return bool(self.client.set(self.key, json.dumps(value), nx=True, ex=self.ttl))
+
+    def read(self):
+        value = self.client.get(self.key)
+        return None if value is None else json.loads(value)
+
+    def heartbeat(self, **state):
+        """
+        Extend the lease and merge ``state`` into it. Returns False when the
+        lease expired or belongs to another crawl now.
+        """
+        current = self.read()
+        if current is None or current["owner"] != self.owner:
+            logger.warning(f"{self.name} crawl {self.owner} lost its lease")
+            return False
+
+        value = {**current, **state, "heartbeat_at": time.time()}
+        # xx: don't resurrect a lease that expired since it was read.
+        return bool(self.client.set(self.key, json.dumps(value), xx=True, ex=self.ttl))
+
+    def release(self):
+        """
+        Give the lease up. Returns True when another run was requested while
+        this one held it (see ``request_run``).
+        """
+        current = self.read()
+        if current is not None and current["owner"] == self.owner:
+            self.client.delete(self.key)
+        return bool(self.client.delete(PENDING_KEY.format(self.name)))
+
+    @contextmanager
+    def keep_alive(self, interval=None, limit=None, **state):
+        """
+        Heartbeat from a background thread for the duration of the block,
+        but for ``limit`` seconds (CRAWL_TIMEOUT) at most: the lease of a
+        crawl stuck past that expires instead of being held forever.
+        """
+        interval = interval or self.ttl / 3
+        limit = limit or settings.CRAWL_TIMEOUT
+        deadline = time.monotonic() + limit
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(interval):
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"{self.name} crawl {self.owner} still running after "
+                        f"{limit}s, letting its lease expire"
+                    )
+                    return
+                self.heartbeat()
+
+        self.heartbeat(**state)
+        thread = threading.Thread(target=beat, name=f"{self.name}-lease", daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stopped.set()
+            thread.join()
+
+    @classmethod
+    def state(cls, name, client=None):
+        """The state of the running crawl, or None when none is running."""
+        client = client or redis_client()
+        with client.pipeline(transaction=False) as pipeline:
+            value, ttl, pending = (
+                pipeline.get(LEASE_KEY.format(name))
+                .ttl(LEASE_KEY.format(name))
+                .exists(PENDING_KEY.format(name))
+                .execute()
+            )
+        if value is None:
+            return None
+        return {**json.loads(value), "ttl": ttl, "pending": bool(pending)}
+
+    @classmethod
+    def request_run(cls, name, client=None):
+        """Ask for one more run once the running crawl releases its lease."""
+        client = client or redis_client()
+        client.set(PENDING_KEY.format(name), 1, ex=24 * 60 * 60)
+
+
+def claim_sources(crawl_id, sources, ttl=None):
+    """
+    Reserve ``sources`` for ``crawl_id`` and return the ones it got, in
+    order. A source claimed by another crawl is left out until its claim is
+    released or expires.
+    """
+    ttl = ttl or settings.ZOOMIT_CLAIM_TTL
+    client = redis_client()
+    pipeline = client.pipeline(transaction=False)
+    for source in sources:
+        pipeline.set(CLAIM_KEY.format(source), crawl_id, nx=True, ex=ttl)
+    claimed = [
+        source for source, claimed in zip(sources, pipeline.execute()) if claimed
+    ]
+    if claimed:
+        key = CLAIMED_KEY.format(crawl_id)
+        pipeline = client.pipeline(transaction=False)
+        pipeline.sadd(key, *claimed).expire(key, ttl).execute()
+    return claimed
+
+
+def release_sources(crawl_id, sources):
+    """Release the claims ``crawl_id`` holds on ``sources``."""
+    client = redis_client()
+    keys = [CLAIM_KEY.format(source) for source in sources]
+    pipeline = client.pipeline(transaction=False)
+    for key in keys:
+        pipeline.get(key)
+    # A claim that expired and was taken by another crawl in between is kept.
+    owned = [key for key, owner in zip(keys, pipeline.execute()) if owner == crawl_id]
+    if owned:
+        client.delete(*owned)
+    return len(owned)
+
+
+def release_crawl_sources(crawl_id):
+    """Release every claim ``crawl_id`` still holds."""
+    client = redis_client()
+    key = CLAIMED_KEY.format(crawl_id)
+    sources = sorted(client.smembers(key))
+    client.delete(key)
+    return release_sources(crawl_id, sources) if sources else 0
+
+
+def batches(urls, batch_size=None, max_batches=None):
+    """
+    Split ``urls`` into batches of ``batch_size``, made larger when that
+    would take more than ``max_batches``.
+    """
+    if not urls:
+        return []
+
+    batch_size = batch_size or settings.ZOOMIT_FANOUT_BATCH_SIZE
+    max_batches = max_batches or settings.ZOOMIT_FANOUT_MAX_TASKS
+    size = max(batch_size, math.ceil(len(urls) / max_batches))
+    result = []
+    for start in range(0, len(urls), size):
+        end = start + size
+        result.append(urls[start:end])
+    return result
+
+
+def merge_summaries(summaries, duration, **extra):
+    """
+    One summary for a crawl made of several runs: their counts added up,
+    their outcomes and errors collected.
+    """
+    result = {
+        "spider": "zoomit",
+        "finish_reason": "finished",
+        "duration": round(duration, 3),
+        "runs": len(summaries),
+        **{name: 0 for name in RESULT_STATS},
+        "outcomes": {},
+        "errors_detail": [],
+        **extra,
+    }
+    for summary in summaries:
+        for name in RESULT_STATS:
+            result[name] += summary.get(name, 0)
+        result["outcomes"].update(summary.get("outcomes", {}))
+        if summary.get("error"):
+            result["errors_detail"].append(summary["error"])
+        if summary.get("finish_reason") != "finished":
+            result["finish_reason"] = "partial"
+    return result
@@ -1,6 +1,7 @@
-from django.db.models import Q
 from django_filters import rest_framework as filters
 
+from .search import get_search_backend
+
 
 class NewsFilter(filters.FilterSet):
     tags_title = filters.CharFilter(method="get_by_tags_title", label="Tags Title")
@@ -27,11 +28,7 @@ class NewsFilter(filters.FilterSet):
         if not keywords:
             return queryset.none()
 
-        objects = Q()
-        for keyword in keywords:
-            objects |= Q(content__icontains=keyword) | Q(title__icontains=keyword)
-
-        return queryset.filter(objects).distinct()
+        return get_search_backend().search(queryset, keywords).distinct()
 
     def get_by_excludes(self, queryset, name, value):
         if not value:
@@ -41,9 +38,4 @@ class NewsFilter(filters.FilterSet):
         if not excludes:
             return queryset.none()
 
-        objects = Q()
-
-        for exclude in excludes:
-            objects &= ~Q(content__icontains=exclude) & ~Q(title__icontains=exclude)
-
-        return queryset.filter(objects).distinct()
+        return get_search_backend().exclude(queryset, excludes).distinct()
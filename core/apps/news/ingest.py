@@ -0,0 +1,166 @@
+import hashlib
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache
+from .models import News, Tags
+from .read_time_engine import NewsReadTimeEngine
+from .search import get_search_backend
+
+NEWS_UPDATE_FIELDS = [
+    "title",
+    "content",
+    "is_public",
+    "updated_at",
+    "title_word_count",
+    "content_word_count",
+    "tags_count",
+    "estimated_reading_time",
+    "content_hash",
+    "source_etag",
+    "source_last_modified",
+]
+VALIDATOR_FIELDS = ["source_etag", "source_last_modified"]
+
+
+def clean_tag_titles(titles):
+    return list(dict.fromkeys(title.strip() for title in titles if title.strip()))
+
+
+def fingerprint(title, content, tag_titles):
+    """Hash of the article text, insensitive to whitespace and tag order."""
+    parts = [" ".join(title.split()), " ".join(content.split()), *sorted(tag_titles)]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def resolve_tags(titles):
+    """
+    Map tag titles to Tags, creating the missing ones.
+
+    Costs one INSERT ... ON CONFLICT DO NOTHING and one SELECT whatever the
+    number of titles.
+    """
+    titles = set(titles)
+    if not titles:
+        return {}
+
+    Tags.objects.bulk_create(
+        [Tags(title=title) for title in titles], ignore_conflicts=True
+    )
+    return {tag.title: tag for tag in Tags.objects.filter(title__in=titles)}
+
+
+def bulk_upsert_news(items, update_existing=True, batch_size=500):
+    """
+    Insert or update news by their unique ``source`` in a single transaction.
+
+    ``items`` are validated dicts with ``title``, ``content``, ``source``,
+    ``tags`` and optionally ``is_public``, ``etag`` and ``last_modified``;
+    sources must be unique. Stored news are only written when their
+    fingerprint or ``is_public`` changed, and their tags are then replaced by
+    the given ones; unchanged news keep their ``updated_at`` and don't
+    invalidate the cache. With ``update_existing`` off, stored news are left
+    untouched. Returns a dict mapping each source to ``(pk, status)``, status
+    being "created", "updated", "unchanged" or "skipped".
+    """
+    if not items:
+        return {}
+
+    sources = [item["source"] for item in items]
+
+    with transaction.atomic():
+        existing = {
+            source: (pk, content_hash, is_public)
+            for source, pk, content_hash, is_public in News.objects.filter(
+                source__in=sources
+            ).values_list("source", "pk", "content_hash", "is_public")
+        }
+        statuses = {source: "skipped" for source in existing}
+        if not update_existing:
+            items = [item for item in items if item["source"] not in existing]
+
+        item_tags = {item["source"]: clean_tag_titles(item["tags"]) for item in items}
+
+        now = timezone.now()
+        news = []
+        unchanged = []
+        for item in items:
+            source = item["source"]
+            stored = existing.get(source)
+            instance = News(
+                title=item["title"],
+                content=item["content"],
+                source=source,
+                # Scraped items don't carry is_public: keep the stored value.
+                is_public=item.get("is_public", stored[2] if stored else True),
+                created_at=now,
+                updated_at=now,
+                content_hash=fingerprint(
+                    item["title"], item["content"], item_tags[source]
+                ),
+                source_etag=item.get("etag", ""),
+                source_last_modified=item.get("last_modified", ""),
+            )
+
+            if stored and stored[1:] == (instance.content_hash, instance.is_public):
+                instance.pk = stored[0]
+                unchanged.append(instance)
+                statuses[source] = "unchanged"
+                continue
+
+            news.append(instance)
+            statuses[source] = "updated" if stored else "created"
+
+        NewsReadTimeEngine.apply(
+            news, [len(item_tags[instance.source]) for instance in news]
+        )
+
+        # Refresh the validators of unchanged news for the next conditional
+        # request, without touching updated_at or the cache.
+        unchanged = [
+            instance
+            for instance in unchanged
+            if instance.source_etag or instance.source_last_modified
+        ]
+        if unchanged:
+            News.objects.bulk_update(unchanged, VALIDATOR_FIELDS, batch_size=batch_size)
+
+        if not news:
+            ids = {source: pk for source, (pk, *_) in existing.items()}
+            return {source: (ids[source], statuses[source]) for source in sources}
+
+        tags = resolve_tags(
+            title for instance in news for title in item_tags[instance.source]
+        )
+
+        News.objects.bulk_create(
+            news,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["source"],
+            update_fields=NEWS_UPDATE_FIELDS,
+        )
+
+        # Conflicting rows keep their own primary key, so read the ids back.
+        written = [instance.source for instance in news]
+        ids = dict(News.objects.filter(source__in=written).values_list("source", "pk"))
+
+        through = News.tags.through
+        through.objects.filter(news_id__in=ids.values()).delete()
+        through.objects.bulk_create(
+            [
+                through(news_id=ids[source], tags_id=tags[title].pk)
+                for source in written
+                for title in item_tags[source]
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+        get_search_backend().index(ids.values())
+        # bulk_create skips the model signals that normally invalidate.
+        cache.invalidate(cache.NEWS, cache.TAGS)
+
+    ids = {**{source: pk for source, (pk, *_) in existing.items()}, **ids}
+    return {source: (ids[source], statuses[source]) for source in sources}
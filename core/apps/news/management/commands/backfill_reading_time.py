@@ -0,0 +1,52 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from ...models import News
+from ...read_time_engine import NewsReadTimeEngine
+
+
+class Command(BaseCommand):
+
+    help = "Backfill the stored word counts and reading time of news in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Rows updated per batch"
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs["batch_size"]
+        queryset = (
+            News.objects.only("pk", "title", "content")
+            .annotate(tags_total=Count("tags"))
+            .order_by("pk")
+        )
+
+        last_pk = None
+        updated = 0
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+
+            # The tags_total annotation saves the tag count queries.
+            NewsReadTimeEngine.apply(batch)
+
+            with transaction.atomic():
+                News.objects.bulk_update(
+                    batch,
+                    [
+                        "title_word_count",
+                        "content_word_count",
+                        "tags_count",
+                        "estimated_reading_time",
+                    ],
+                )
+
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Updated {updated} news")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} news"))
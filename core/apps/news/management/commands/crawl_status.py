@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from ...crawls import CrawlLease
+
+
+class Command(BaseCommand):
+
+    help = "Show the crawl currently holding the lease, if any"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--name", default="zoomit", help="Crawl name")
+        parser.add_argument("--json", action="store_true", help="Print raw JSON")
+
+    def handle(self, *args, **kwargs):
+        state = CrawlLease.state(kwargs["name"])
+        if kwargs["json"]:
+            self.stdout.write(json.dumps(state))
+            return
+
+        if state is None:
+            self.stdout.write(f"No {kwargs['name']} crawl running")
+            return
+
+        now = timezone.now().timestamp()
+        for field in ("started_at", "heartbeat_at"):
+            moment = datetime.fromtimestamp(
+                state[field], tz=timezone.get_current_timezone()
+            )
+            state[field] = f"{moment:%Y-%m-%d %H:%M:%S} ({now - state[field]:.0f}s ago)"
+        state["ttl"] = f"{state['ttl']}s"
+
+        self.stdout.write(f"{kwargs['name']} crawl running:")
+        for field, value in state.items():
+            self.stdout.write(f"  {field}: {value}")
@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+
+from ...search import get_search_backend
+
+
+class Command(BaseCommand):
+
+    help = "Rebuild the full-text search index for news"
+
+    def handle(self, *args, **kwargs):
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,124 @@
+import sys
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from scraper.runner import CrawlError, crawl
+
+from ...models import News
+
+
+class Command(BaseCommand):
+
+    help = "Scrape many Zoomit news by url, updating the stored ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", type=str, help="Zoomit article urls")
+        parser.add_argument(
+            "--file",
+            type=str,
+            help="File with one url per line, or - to read them from stdin",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            metavar="DAYS",
+            help="Also re-scrape every news not updated for this many days",
+        )
+        parser.add_argument(
+            "--skip-existing",
+            action="store_true",
+            help="Leave already stored news untouched instead of updating them",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Urls per crawl; each crawl starts one browser",
+        )
+
+    def handle(self, *args, **kwargs):
+        urls = self.collect_urls(kwargs)
+        if not urls:
+            raise CommandError("No urls to scrape")
+        if kwargs["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        outcomes = {}
+        if kwargs["skip_existing"]:
+            known = set(
+                News.objects.filter(source__in=urls).values_list("source", flat=True)
+            )
+            outcomes = {url: "skipped" for url in urls if url in known}
+            urls = [url for url in urls if url not in known]
+
+        total = len(urls)
+        batch_size = kwargs["batch_size"]
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            batch = urls[start:end]
+            try:
+                result = crawl(
+                    "zoomit",
+                    urls=batch,
+                    update_existing=not kwargs["skip_existing"],
+                    timeout=settings.CRAWL_TIMEOUT,
+                )
+            except CrawlError as e:
+                # The next batches run in a new crawl process.
+                result = {"finish_reason": "error", "error": str(e)}
+                self.stderr.write(
+                    self.style.ERROR(f"[{end}/{total}] Crawl failed: {e}")
+                )
+
+            scraped = result.get("outcomes", {})
+            missing = (
+                "error" if result.get("finish_reason") == "error" else "not scraped"
+            )
+            for url in batch:
+                outcomes[url] = scraped.get(url, missing)
+                if kwargs["verbosity"] > 1:
+                    self.stdout.write(f"{outcomes[url]}\t{url}")
+
+            self.stdout.write(
+                f"[{end}/{total}] {result.get('items_scraped', 0)} scraped, "
+                f"{result.get('items_created', 0)} created, "
+                f"{result.get('items_updated', 0)} updated, "
+                f"{result.get('items_unchanged', 0)} unchanged, "
+                f"{result.get('items_failed', 0)} failed "
+                f"in {result.get('duration', 0)}s"
+            )
+
+        counts = Counter(outcomes.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{count} {outcome}" for outcome, count in counts.items())
+            )
+        )
+
+    def collect_urls(self, options):
+        urls = list(options["urls"])
+
+        if options["file"] == "-":
+            urls += sys.stdin.read().splitlines()
+        elif options["file"]:
+            try:
+                with open(options["file"]) as file:
+                    urls += file.read().splitlines()
+            except OSError as e:
+                raise CommandError(f"Can't read {options['file']}: {e}")
+
+        if options["older_than"] is not None:
+            threshold = timezone.now() - timedelta(days=options["older_than"])
+            urls += News.objects.filter(updated_at__lt=threshold).values_list(
+                "source", flat=True
+            )
+
+        # Same url listed twice, or both given and matched by --older-than,
+        # is scraped once.
+        urls = (url.strip() for url in urls)
+        return list(
+            dict.fromkeys(url for url in urls if url and not url.startswith("#"))
+        )
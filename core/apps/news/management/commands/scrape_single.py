@@ -1,7 +1,9 @@
-import os
-from pathlib import Path
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from scraper.runner import crawl
 
-from django.core.management import BaseCommand
+from ...crawls import CrawlLease
+from ...tasks import zoomit_lease
 
 
 class Command(BaseCommand):
@@ -12,8 +14,12 @@ class Command(BaseCommand):
         parser.add_argument("url", type=str, help="Zoomit article url")
 
     def handle(self, *args, **kwargs):
-        url = kwargs["url"]
-
-        django_path = Path(__file__).resolve().parent.parent.parent.parent.parent
-        os.chdir(f"{str(django_path)}/scraper")
-        os.system(f"scrapy crawl zoomit -a custom_url={url}")
+        with zoomit_lease(command="scrape_single", url=kwargs["url"]) as lease:
+            if lease is None:
+                raise CommandError(
+                    f"A zoomit crawl is running: {CrawlLease.state('zoomit')}"
+                )
+            result = crawl(
+                "zoomit", custom_url=kwargs["url"], timeout=settings.CRAWL_TIMEOUT
+            )
+        self.stdout.write(self.style.SUCCESS(f"Zoomit crawl finished: {result}"))
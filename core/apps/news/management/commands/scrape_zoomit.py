@@ -1,7 +1,9 @@
-import os
-from pathlib import Path
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from scraper.runner import crawl
 
-from django.core.management import BaseCommand
+from ...crawls import CrawlLease
+from ...tasks import zoomit_lease
 
 
 class Command(BaseCommand):
@@ -9,7 +11,10 @@ class Command(BaseCommand):
     help = "Scrape Zoomit news"
 
     def handle(self, *args, **kwargs):
-
-        django_path = Path(__file__).resolve().parent.parent.parent.parent.parent
-        os.chdir(f"{str(django_path)}/scraper")
-        os.system("scrapy crawl zoomit")
+        with zoomit_lease(command="scrape_zoomit") as lease:
+            if lease is None:
+                raise CommandError(
+                    f"A zoomit crawl is running: {CrawlLease.state('zoomit')}"
+                )
+            result = crawl("zoomit", timeout=settings.CRAWL_TIMEOUT)
+        self.stdout.write(self.style.SUCCESS(f"Zoomit crawl finished: {result}"))
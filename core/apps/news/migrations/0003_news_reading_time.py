@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0002_news_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="news",
+            name="content_word_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="estimated_reading_time",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="tags_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="title_word_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
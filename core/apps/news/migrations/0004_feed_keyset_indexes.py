@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0003_news_reading_time"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="news",
+            index=models.Index(
+                fields=["updated_at", "created_at", "id"],
+                name="news_updated_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tags",
+            index=models.Index(fields=["created_at", "id"], name="tags_created_id_idx"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0004_feed_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="news",
+            name="content_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="source_etag",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="news",
+            name="source_last_modified",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
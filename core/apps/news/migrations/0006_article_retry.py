@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:34
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0005_news_fingerprint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleRetry",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("source", models.URLField(unique=True)),
+                ("error_class", models.CharField(max_length=255)),
+                ("error", models.TextField(blank=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Article retry",
+                "verbose_name_plural": "Article retries",
+                "ordering": ["next_attempt_at"],
+            },
+        ),
+    ]
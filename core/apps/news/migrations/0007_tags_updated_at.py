@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0006_article_retry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tags",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 import uuid
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Count
 from django.utils import timezone
 
 from .read_time_engine import NewsReadTimeEngine
@@ -21,15 +23,37 @@ class BaseModel(models.Model):
 
 class Tags(BaseModel):
     title = models.CharField(max_length=255, unique=True)
+    # Moves when the tag is renamed or added to or removed from news, for
+    # the conditional GETs of the news embedding it.
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="tags_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class NewsQuerySet(models.QuerySet):
+    def refresh_reading_time(self):
+        """Recompute the denormalized tag count and reading time of each row."""
+        rows = self.annotate(tags_total=Count("tags")).only(
+            "pk", "title_word_count", "content_word_count"
+        )
+        news = []
+        for row in rows:
+            row.tags_count = row.tags_total
+            row.estimated_reading_time = NewsReadTimeEngine.reading_time(
+                row.title_word_count + row.content_word_count, row.tags_total
+            )
+            news.append(row)
+        News.objects.bulk_update(news, ["tags_count", "estimated_reading_time"])
+
+
 class News(BaseModel):
     title = models.CharField(max_length=255, null=False)
     content = models.TextField(null=False)
@@ -37,15 +61,100 @@ class News(BaseModel):
     tags = models.ManyToManyField(Tags, related_name="news")
     is_public = models.BooleanField(null=False, default=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    title_word_count = models.PositiveIntegerField(default=0, editable=False)
+    content_word_count = models.PositiveIntegerField(default=0, editable=False)
+    tags_count = models.PositiveIntegerField(default=0, editable=False)
+    estimated_reading_time = models.PositiveIntegerField(default=0, editable=False)
+    # Fingerprint of the scraped title, content and tags, and the validators
+    # the origin sent with them, used to refresh articles only when changed.
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    source_etag = models.CharField(max_length=255, blank=True, editable=False)
+    source_last_modified = models.CharField(max_length=64, blank=True, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         verbose_name = "News"
         verbose_name_plural = "News"
         ordering = ["-updated_at", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["updated_at", "created_at", "id"],
+                name="news_updated_created_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def estimated_reading_time(self):
-        return NewsReadTimeEngine.estimate(self)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_text = instance._text_values()
+        return instance
+
+    def _text_values(self):
+        # Read from __dict__ so deferred fields are not fetched.
+        return {
+            "title": self.__dict__.get("title"),
+            "content": self.__dict__.get("content"),
+        }
+
+    def update_word_counts(self):
+        """
+        Re-tokenize only the text fields that changed since the row was loaded.
+
+        Returns the names of the fields that were updated.
+        """
+        loaded = getattr(self, "_loaded_text", {})
+        changed = []
+
+        for field, value in self._text_values().items():
+            if field in loaded and loaded[field] == value:
+                continue
+            setattr(
+                self, f"{field}_word_count", NewsReadTimeEngine.word_count(value or "")
+            )
+            changed.append(f"{field}_word_count")
+
+        self.estimated_reading_time = NewsReadTimeEngine.reading_time(
+            self.title_word_count + self.content_word_count, self.tags_count
+        )
+        return changed
+
+    def save(self, *args, **kwargs):
+        changed = self.update_word_counts()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                *changed,
+                "estimated_reading_time",
+            }
+
+        super().save(*args, **kwargs)
+        self._loaded_text = self._text_values()
+
+
+class ArticleRetry(BaseModel):
+    """
+    An article whose render failed, queued to be tried again (see
+    apps/news/retries.py). ``next_attempt_at`` is None once it's given up on.
+    """
+
+    source = models.URLField(unique=True)
+    error_class = models.CharField(max_length=255)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Article retry"
+        verbose_name_plural = "Article retries"
+        ordering = ["next_attempt_at"]
+
+    def __str__(self):
+        return self.source
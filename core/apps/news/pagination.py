@@ -0,0 +1,158 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the whole (composite) ordering.
+
+    DRF's CursorPagination only keeps the first ordering field in the cursor
+    and skips ties with an offset. Here the cursor carries every ordering
+    value, so each page is one range scan on the matching index, and no
+    COUNT query is issued.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, "cursor_ordering", self.ordering))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse, key = False, None
+        else:
+            reverse, key = self.cursor.reverse, self.decode_key(self.cursor.position)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+
+        queryset = self.load_key_fields(queryset).order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self.after(ordering, key))
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = key is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = Cursor(
+            offset=0, reverse=False, position=self.encode_key(self.page[-1])
+        )
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        cursor = Cursor(offset=0, reverse=True, position=self.encode_key(self.page[0]))
+        return self.encode_cursor(cursor)
+
+    def load_key_fields(self, queryset):
+        # The cursor is built from the ordering values of the page edges, so
+        # they must not be deferred by the view's only()/defer().
+        names, deferred = queryset.query.deferred_loading
+        if not names:
+            return queryset
+
+        key_fields = {field.lstrip("-") for field in self.ordering}
+        if deferred:
+            return queryset.defer(None).defer(*(names - key_fields))
+        return queryset.only(*names, *key_fields)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def fields(self):
+        return [
+            self.model._meta.get_field(field.lstrip("-")) for field in self.ordering
+        ]
+
+    def encode_key(self, instance):
+        return json.dumps([field.value_to_string(instance) for field in self.fields()])
+
+    def decode_key(self, position):
+        try:
+            values = json.loads(position)
+            fields = self.fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(position)
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def after(ordering, key):
+        """
+        Rows strictly after ``key`` in ``ordering``, expanded as
+        ``a < x OR (a = x AND b < y) OR ...``. The redundant bound on the
+        leading column lets the database seek the index directly.
+        """
+        condition = Q()
+        equal = Q()
+
+        for field, value in zip(ordering, key):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        leading = ordering[0].lstrip("-")
+        lookup = "lte" if ordering[0].startswith("-") else "gte"
+        return Q(**{f"{leading}__{lookup}": key[0]}) & condition
+
+
+class PaginationModeMixin:
+    """
+    Lets clients opt into cursor pagination with ``?pagination=cursor`` (or by
+    sending a ``cursor``), while page-number pagination stays the default.
+    """
+
+    cursor_pagination_class = KeysetCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            params = getattr(request, "query_params", {})
+
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+
+        return self._paginator
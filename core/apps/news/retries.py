@@ -0,0 +1,115 @@
+"""
+Retry queue of the article renders that failed.
+
+Every crawl records its failed articles in ArticleRetry, with the class of
+the error, and removes the ones it stored. The retry_failed_articles task
+renders the due ones again: after each failure the next attempt is pushed
+back exponentially, and after CRAWL_RETRY_MAX_ATTEMPTS failures the article
+is given up on. Archive crawls leave the queued articles to it (see
+ZoomitSpider.known_sources).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .crawls import STORED_OUTCOMES
+from .models import ArticleRetry
+
+UNKNOWN_ERROR = {"error_class": "Unknown", "error": ""}
+
+
+def backoff(attempts):
+    """Seconds to wait after the ``attempts``-th failure."""
+    delay = settings.CRAWL_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.CRAWL_RETRY_MAX_DELAY)
+
+
+def record_failures(failures, now=None):
+    """
+    Count a failed attempt for each source of ``failures``, a mapping of
+    sources to their ``error_class`` and ``error``, and schedule the next.
+    Returns the sources given up on.
+    """
+    if not failures:
+        return []
+
+    now = now or timezone.now()
+    given_up = []
+    created, updated = [], []
+    with transaction.atomic():
+        existing = ArticleRetry.objects.select_for_update().in_bulk(
+            list(failures), field_name="source"
+        )
+        for source, failure in failures.items():
+            retry = existing.get(source)
+            if retry is None:
+                retry = ArticleRetry(source=source)
+                created.append(retry)
+            else:
+                updated.append(retry)
+
+            retry.attempts += 1
+            retry.error_class = failure["error_class"][:255]
+            retry.error = failure["error"]
+            retry.updated_at = now
+            if retry.attempts >= settings.CRAWL_RETRY_MAX_ATTEMPTS:
+                retry.next_attempt_at = None
+                given_up.append(source)
+            else:
+                retry.next_attempt_at = now + timedelta(seconds=backoff(retry.attempts))
+
+        # A concurrent crawl may have queued the same source in between.
+        ArticleRetry.objects.bulk_create(created, ignore_conflicts=True)
+        ArticleRetry.objects.bulk_update(
+            updated,
+            ["attempts", "error_class", "error", "next_attempt_at", "updated_at"],
+        )
+    return given_up
+
+
+def record_outcomes(outcomes, failures=None):
+    """
+    Queue the sources of ``outcomes`` that failed, with their error from
+    ``failures`` when known, and dequeue the ones that were stored.
+    """
+    failures = failures or {}
+    stored = [
+        source for source, outcome in outcomes.items() if outcome in STORED_OUTCOMES
+    ]
+    failed = {
+        source: failures.get(source, UNKNOWN_ERROR)
+        for source, outcome in outcomes.items()
+        if outcome == "failed"
+    }
+    with transaction.atomic():
+        if stored:
+            ArticleRetry.objects.filter(source__in=stored).delete()
+        return record_failures(failed)
+
+
+def record_crawl_error(sources, summary):
+    """
+    Count a failed attempt for the ``sources`` of a crawl that didn't
+    complete, e.g. whose process died: they got no outcome from the crawl.
+    """
+    if summary.get("finish_reason") != "error":
+        return []
+
+    outcomes = summary.get("outcomes", {})
+    error = {"error_class": "CrawlError", "error": summary.get("error") or ""}
+    return record_failures(
+        {source: error for source in sources if source not in outcomes}
+    )
+
+
+def due_sources(limit, now=None):
+    """Sources of the next ``limit`` articles due for another attempt."""
+    now = now or timezone.now()
+    return list(
+        ArticleRetry.objects.filter(next_attempt_at__lte=now)
+        .order_by("next_attempt_at")
+        .values_list("source", flat=True)[:limit]
+    )
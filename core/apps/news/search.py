@@ -0,0 +1,180 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+
+class NewsSearchBackend:
+    """
+    Fallback backend for databases without a full-text engine.
+
+    Keeps the historical ``icontains`` behaviour so filtering still works,
+    it just can't use an index.
+    """
+
+    def ensure_index(self):
+        pass
+
+    def index(self, news_ids):
+        pass
+
+    def remove(self, news_ids):
+        pass
+
+    def rebuild(self):
+        from .models import News
+
+        self.ensure_index()
+        self.index(News.objects.values_list("pk", flat=True))
+
+    def search(self, queryset, keywords):
+        objects = Q()
+        for keyword in keywords:
+            objects |= Q(content__icontains=keyword) | Q(title__icontains=keyword)
+
+        return queryset.filter(objects)
+
+    def exclude(self, queryset, keywords):
+        objects = Q()
+        for keyword in keywords:
+            objects &= ~Q(content__icontains=keyword) & ~Q(title__icontains=keyword)
+
+        return queryset.filter(objects)
+
+
+class PostgresNewsSearchBackend(NewsSearchBackend):
+    """
+    Stores a weighted ``tsvector`` in ``News.search_vector``.
+
+    The GIN index over the column is created by the migrations.
+    """
+
+    CONFIG = "simple"
+
+    def vector(self):
+        return SearchVector("title", weight="A", config=self.CONFIG) + SearchVector(
+            "content", weight="B", config=self.CONFIG
+        )
+
+    def query(self, keywords):
+        query = None
+        for keyword in keywords:
+            term = SearchQuery(keyword, search_type="phrase", config=self.CONFIG)
+            query = term if query is None else query | term
+        return query
+
+    def index(self, news_ids):
+        from .models import News
+
+        News.objects.filter(pk__in=list(news_ids)).update(search_vector=self.vector())
+
+    def search(self, queryset, keywords):
+        query = self.query(keywords)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", *queryset.model._meta.ordering)
+        )
+
+    def exclude(self, queryset, keywords):
+        return queryset.exclude(search_vector=self.query(keywords))
+
+
+class SQLiteNewsSearchBackend(NewsSearchBackend):
+    """
+    Mirrors title and content into an FTS5 virtual table keyed by news id.
+
+    The table is created by the migrations; ``rebuild`` creates it again if
+    it went missing. Keywords are matched as phrases of whole words, like
+    the Postgres backend does.
+    """
+
+    TABLE = "news_news_fts"
+
+    def ensure_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} "
+                "USING fts5(news_id UNINDEXED, title, content)"
+            )
+
+    def _db_id(self, news_id):
+        from .models import News
+
+        return News._meta.pk.get_db_prep_value(news_id, connection)
+
+    def index(self, news_ids):
+        from .models import News
+
+        rows = list(
+            News.objects.filter(pk__in=list(news_ids)).values_list(
+                "pk", "title", "content"
+            )
+        )
+        if not rows:
+            return
+
+        self.remove([pk for pk, _, _ in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.TABLE} (news_id, title, content) VALUES (%s, %s, %s)",
+                [(self._db_id(pk), title, content) for pk, title, content in rows],
+            )
+
+    def remove(self, news_ids):
+        db_ids = [(self._db_id(news_id),) for news_id in news_ids]
+        if not db_ids:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.TABLE} WHERE news_id = %s", db_ids)
+
+    def rebuild(self):
+        self.ensure_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.TABLE}")
+        super().rebuild()
+
+    def match(self, keywords):
+        terms = []
+        for keyword in keywords:
+            escaped = keyword.replace('"', '""')
+            terms.append(f'"{escaped}"')
+        return " OR ".join(terms)
+
+    def _matching_ids(self, keywords):
+        return RawSQL(
+            f"SELECT news_id FROM {self.TABLE} WHERE {self.TABLE} MATCH %s",
+            [self.match(keywords)],
+        )
+
+    def search(self, queryset, keywords):
+        table = queryset.model._meta.db_table
+        rank = RawSQL(
+            f"SELECT bm25({self.TABLE}, 0, 10.0, 1.0) FROM {self.TABLE} "
+            f"WHERE {self.TABLE} MATCH %s AND news_id = {table}.id",
+            [self.match(keywords)],
+        )
+        return (
+            queryset.filter(pk__in=self._matching_ids(keywords))
+            .annotate(rank=rank)
+            .order_by("rank", *queryset.model._meta.ordering)
+        )
+
+    def exclude(self, queryset, keywords):
+        return queryset.exclude(pk__in=self._matching_ids(keywords))
+
+
+_backends = {}
+
+
+def get_search_backend():
+    vendor = connection.vendor
+    if vendor not in _backends:
+        if vendor == "postgresql":
+            _backends[vendor] = PostgresNewsSearchBackend()
+        elif vendor == "sqlite":
+            _backends[vendor] = SQLiteNewsSearchBackend()
+        else:
+            _backends[vendor] = NewsSearchBackend()
+    return _backends[vendor]
@@ -31,6 +31,23 @@ class NewsCreateInputSerializer(serializers.Serializer):
     )
 
 
+class NewsBulkResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=["created", "updated", "unchanged", "error"]
+    )
+    id = serializers.UUIDField(required=False)
+    errors = serializers.DictField(required=False)
+
+
+class NewsBulkOutputSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    unchanged = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = NewsBulkResultSerializer(many=True)
+
+
 class NewsOutputSerializer(serializers.ModelSerializer):
     tags = TagOutputSerializer(many=True, read_only=True)
 
@@ -57,7 +74,6 @@ class NewsDetailsInputSerializer(serializers.Serializer):
 
 
 class NewsDetailsOutputSerializer(serializers.ModelSerializer):
-    estimated_reading_time = serializers.SerializerMethodField()
     tags = TagOutputSerializer(many=True, read_only=True)
 
     class Meta:
@@ -74,7 +90,10 @@ class NewsDetailsOutputSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "source", "created_at", "updated_at"]
-
-    def get_estimated_reading_time(self, obj):
-        return obj.estimated_reading_time
+        read_only_fields = [
+            "id",
+            "source",
+            "estimated_reading_time",
+            "created_at",
+            "updated_at",
+        ]
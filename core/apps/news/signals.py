@@ -0,0 +1,117 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache
+from .models import News, Tags
+from .read_time_engine import NewsReadTimeEngine
+from .search import get_search_backend
+
+SEARCH_FIELDS = {"title", "content"}
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    # The migrations create the index once; this covers databases whose
+    # schema is built without them, like the test database.
+    if sender.name == "apps.news" and using == DEFAULT_DB_ALIAS:
+        get_search_backend().ensure_index()
+
+
+@receiver(post_save, sender=News)
+def index_news(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+
+    get_search_backend().index([instance.pk])
+
+
+@receiver(post_delete, sender=News)
+def remove_news_from_index(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def refresh_reading_time(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        instance._cleared_news_ids = list(instance.news.values_list("pk", flat=True))
+        return
+
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+
+    if not reverse:
+        instance.tags_count = instance.tags.count()
+        instance.estimated_reading_time = NewsReadTimeEngine.reading_time(
+            instance.title_word_count + instance.content_word_count,
+            instance.tags_count,
+        )
+        News.objects.filter(pk=instance.pk).update(
+            tags_count=instance.tags_count,
+            estimated_reading_time=instance.estimated_reading_time,
+        )
+        return
+
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_news_ids", None)
+
+    if pk_set:
+        News.objects.filter(pk__in=pk_set).refresh_reading_time()
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def touch_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    # The Last-Modified of a news is the latest updated_at of it and its tags.
+    if action == "pre_clear" and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list("pk", flat=True))
+        return
+
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+
+    if reverse:
+        tag_ids = [instance.pk]
+    elif action == "post_clear":
+        tag_ids = getattr(instance, "_cleared_tag_ids", [])
+    else:
+        tag_ids = pk_set
+    if tag_ids:
+        Tags.objects.filter(pk__in=tag_ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Tags)
+def collect_tagged_news(sender, instance, **kwargs):
+    instance._tagged_news_ids = list(instance.news.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tags)
+def refresh_tagged_news(sender, instance, **kwargs):
+    news_ids = getattr(instance, "_tagged_news_ids", None)
+    if news_ids:
+        News.objects.filter(pk__in=news_ids).refresh_reading_time()
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_cache(sender, **kwargs):
+    cache.invalidate(cache.NEWS)
+
+
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+def invalidate_tags_cache(sender, **kwargs):
+    # News responses embed tag titles.
+    cache.invalidate(cache.TAGS, cache.NEWS)
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def invalidate_news_tags_cache(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        cache.invalidate(cache.NEWS)
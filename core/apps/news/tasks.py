@@ -1,9 +1,217 @@
-from celery import shared_task
-from django.core.management import call_command
+import logging
+import time
+import uuid
+from contextlib import contextmanager
 
+from celery import chord, shared_task
+from celery.exceptions import Ignore
+from django.conf import settings
+from scraper.runner import CrawlError, crawl
 
-@shared_task
-def scrape_zoomit():
-    call_command(
-        "scrape_zoomit",
+from . import retries
+from .crawls import (
+    STORED_OUTCOMES,
+    CrawlLease,
+    batches,
+    claim_sources,
+    merge_summaries,
+    release_crawl_sources,
+    release_sources,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def crawl_or_error(spider, **kwargs):
+    # A failed subtask would fail the whole chord; report it in the summary.
+    try:
+        return crawl(spider, timeout=settings.CRAWL_TIMEOUT, **kwargs)
+    except CrawlError as e:
+        return {"spider": spider, "finish_reason": "error", "error": str(e)}
+
+
+def render_claimed(urls, crawl_id):
+    summary = crawl_or_error("zoomit", urls=urls)
+    # A crawl that didn't complete recorded none of its failures.
+    retries.record_crawl_error(urls, summary)
+
+    # Keep the claims of stored articles until they expire, release the
+    # rest so the next crawl can try them again.
+    outcomes = summary.get("outcomes", {})
+    failed = [url for url in urls if outcomes.get(url) not in STORED_OUTCOMES]
+    if failed:
+        release_sources(crawl_id, failed)
+    return summary
+
+
+def finish_crawl(lease):
+    # A run that was coalesced into this one starts now.
+    if lease.release():
+        scrape_zoomit.delay()
+
+
+@contextmanager
+def zoomit_lease(**state):
+    """
+    Hold the Zoomit crawl lease around a crawl started outside scrape_zoomit,
+    such as by a management command. Yields None when another crawl holds it.
+    """
+    lease = CrawlLease("zoomit", uuid.uuid4().hex)
+    if not lease.acquire(stage="crawling", **state):
+        yield None
+        return
+    try:
+        with lease.keep_alive():
+            yield lease
+    finally:
+        finish_crawl(lease)
+
+
+@shared_task(bind=True)
+def scrape_zoomit(self):
+    """
+    Crawl the Zoomit archive. Every task runs in its worker's long-lived
+    crawl process and the result is a summary of the crawl (items scraped,
+    created, skipped, failed, duration...).
+
+    In the "fanout" ZOOMIT_CRAWL_MODE the archive pages are read in order
+    until one has no new article, then the new articles are claimed in Redis
+    and rendered in batches by as many workers as are available.
+
+    Only one crawl runs at a time: while one holds the lease, a new run is
+    skipped, or coalesced into a single follow-up run (CRAWL_OVERLAP_POLICY).
+    """
+    crawl_id = uuid.uuid4().hex
+    lease = CrawlLease("zoomit", crawl_id)
+    mode = settings.ZOOMIT_CRAWL_MODE
+    if not lease.acquire(task_id=self.request.id, mode=mode, stage="starting"):
+        coalesce = settings.CRAWL_OVERLAP_POLICY == "coalesce"
+        if coalesce:
+            CrawlLease.request_run("zoomit")
+        return {
+            "spider": "zoomit",
+            "finish_reason": "coalesced" if coalesce else "skipped",
+            "running": CrawlLease.state("zoomit"),
+        }
+
+    if mode != "fanout":
+        try:
+            with lease.keep_alive(stage="crawling"):
+                return crawl("zoomit", timeout=settings.CRAWL_TIMEOUT)
+        finally:
+            finish_crawl(lease)
+
+    lease.heartbeat(stage="discovering")
+    # The errback follows the workflow through every replace, down to the
+    # body of the render chord.
+    workflow = discover_zoomit_pages.s(crawl_id=crawl_id, started=time.time())
+    workflow.on_error(abort_zoomit_crawl.s(crawl_id=crawl_id))
+    try:
+        # The task's result becomes the merged summary at the end of the crawl.
+        return self.replace(workflow)
+    except Ignore:
+        raise
+    except Exception:
+        finish_crawl(lease)
+        raise
+
+
+@shared_task(bind=True)
+def discover_zoomit_pages(self, crawl_id, started, page=1, discoveries=()):
+    """
+    Read the archive from ``page`` on, one page per task, collecting the new
+    article urls in the summaries' "discovered". Like the serial crawl, it
+    stops at a page without new articles: the older ones are stored already.
+    """
+    with CrawlLease("zoomit", crawl_id).keep_alive(page=page):
+        summary = crawl_or_error("zoomit", pages=[page], discover="1")
+    discoveries = [*discoveries, summary]
+
+    # A page that failed to load says nothing about the next ones.
+    exhausted = summary.get("finish_reason") != "error" and not summary.get(
+        "discovered"
+    )
+    if exhausted or page >= settings.ZOOMIT_ARCHIVE_PAGES:
+        return self.replace(
+            dispatch_zoomit_articles.s(discoveries, crawl_id=crawl_id, started=started)
+        )
+    return self.replace(
+        discover_zoomit_pages.s(
+            crawl_id=crawl_id, started=started, page=page + 1, discoveries=discoveries
+        )
+    )
+
+
+@shared_task(bind=True)
+def dispatch_zoomit_articles(self, discoveries, crawl_id, started):
+    urls = list(
+        dict.fromkeys(
+            url for summary in discoveries for url in summary.get("discovered", [])
+        )
     )
+    claimed = claim_sources(crawl_id, urls)
+    extra = {
+        "crawl_id": crawl_id,
+        "pages": len(discoveries),
+        "discovered": len(urls),
+        "claimed": len(claimed),
+    }
+
+    lease = CrawlLease("zoomit", crawl_id)
+    work = batches(claimed)
+    if not work:
+        finish_crawl(lease)
+        return merge_summaries(discoveries, time.time() - started, **extra)
+
+    lease.heartbeat(stage="rendering", batches=len(work), **extra)
+    return self.replace(
+        chord(
+            (render_zoomit_articles.s(batch, crawl_id) for batch in work),
+            summarize_zoomit_crawl.s(
+                discoveries=discoveries, started=started, extra=extra
+            ),
+        )
+    )
+
+
+@shared_task
+def render_zoomit_articles(urls, crawl_id):
+    with CrawlLease("zoomit", crawl_id).keep_alive():
+        return render_claimed(urls, crawl_id)
+
+
+@shared_task
+def summarize_zoomit_crawl(summaries, discoveries, started, extra):
+    finish_crawl(CrawlLease("zoomit", extra["crawl_id"]))
+    return merge_summaries([*discoveries, *summaries], time.time() - started, **extra)
+
+
+@shared_task
+def abort_zoomit_crawl(request, exc, traceback, crawl_id):
+    """
+    Errback of the fan-out crawl, whose subtasks only report crawl errors:
+    one died of something else (lost worker, database or broker error).
+    Release what the crawl holds, as its end would have.
+    """
+    logger.error(f"zoomit crawl {crawl_id} failed in {request.task}: {exc!r}")
+    release_crawl_sources(crawl_id)
+    finish_crawl(CrawlLease("zoomit", crawl_id))
+
+
+# Lowest priority on the Redis broker, where 0 is the highest: a retry never
+# delays the renders of a scheduled crawl.
+@shared_task(priority=9)
+def retry_failed_articles(limit=None):
+    """
+    Render again the failed articles due for another attempt, at most
+    CRAWL_RETRY_BATCH_SIZE of them. The crawl dequeues the articles it
+    stores and pushes the others back (see apps/news/retries.py).
+    """
+    limit = limit or settings.CRAWL_RETRY_BATCH_SIZE
+    crawl_id = uuid.uuid4().hex
+    # Claimed like the articles of a crawl, so a crawl rendering the same
+    # article at the same time is never raced.
+    urls = claim_sources(crawl_id, retries.due_sources(limit))
+    if not urls:
+        return {"spider": "zoomit", "finish_reason": "finished", "retried": 0}
+    return {**render_claimed(urls, crawl_id), "retried": len(urls)}
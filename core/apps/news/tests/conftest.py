@@ -0,0 +1,30 @@
+import pytest
+from django.core.cache import cache
+from scraper import connection
+
+from .memory_redis import MEMORY_SCHEME, MemoryRedis
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def memory_redis(monkeypatch):
+    get_redis = connection.get_redis
+
+    def memory_or_redis(url):
+        if url.startswith(MEMORY_SCHEME):
+            return MemoryRedis.from_url(url)
+        return get_redis(url)
+
+    monkeypatch.setattr(connection, "get_redis", memory_or_redis)
+    MemoryRedis.flush_all()
+    yield
+    MemoryRedis.flush_all()
@@ -19,7 +19,7 @@ class NewsFactory(factory.django.DjangoModelFactory):
 
     title = factory.LazyAttribute(lambda x: faker.sentence())
     content = factory.LazyAttribute(lambda x: faker.paragraph())
-    source = factory.LazyAttribute(lambda x: faker.url())
+    source = factory.Sequence(lambda n: f"{faker.url()}{n}")
 
     @factory.post_generation
     def tags(self, create, extracted, **kwargs):
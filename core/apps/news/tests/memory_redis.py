@@ -0,0 +1,244 @@
+"""
+In-process stand-in for the Redis server the crawls coordinate through, so
+the tests run the same code without one. The conftest hands it out for
+memory:// urls.
+"""
+
+import threading
+import time
+
+from scraper.scheduler import POP_SCRIPT
+
+MEMORY_SCHEME = "memory://"
+
+
+class MemoryRedis:
+    """
+    In-memory stand-in for the few Redis commands the crawls use, with
+    string replies like a client created with ``decode_responses=True``.
+    Clients for the same url share their data.
+    """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+    # Python stand-ins of the Lua scripts run through register_script, by
+    # script source.
+    scripts = {}
+
+    def __init__(self, store=None, lock=None):
+        self.store = {} if store is None else store
+        self.lock = lock or threading.RLock()
+
+    @classmethod
+    def from_url(cls, url):
+        with cls._stores_lock:
+            store, lock = cls._stores.setdefault(url, ({}, threading.RLock()))
+        return cls(store, lock)
+
+    @classmethod
+    def flush_all(cls):
+        with cls._stores_lock:
+            for store, lock in cls._stores.values():
+                with lock:
+                    store.clear()
+
+    def _entry(self, name):
+        entry = self.store.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.store[name]
+            return None
+        return entry
+
+    @staticmethod
+    def _expiry(ex=None, px=None):
+        if ex is not None:
+            return time.monotonic() + ex
+        if px is not None:
+            return time.monotonic() + px / 1000
+        return None
+
+    def get(self, name):
+        with self.lock:
+            entry = self._entry(name)
+            return None if entry is None else entry[0]
+
+    def set(self, name, value, ex=None, px=None, nx=False, xx=False):
+        with self.lock:
+            exists = self._entry(name) is not None
+            if (nx and exists) or (xx and not exists):
+                return None
+            self.store[name] = (str(value), self._expiry(ex, px))
+            return True
+
+    def delete(self, *names):
+        with self.lock:
+            return sum(
+                self.store.pop(name, None) is not None
+                for name in names
+                if self._entry(name) is not None
+            )
+
+    def exists(self, *names):
+        with self.lock:
+            return sum(self._entry(name) is not None for name in names)
+
+    def expire(self, name, seconds):
+        with self.lock:
+            entry = self._entry(name)
+            if entry is None:
+                return False
+            self.store[name] = (entry[0], self._expiry(ex=seconds))
+            return True
+
+    def ttl(self, name):
+        with self.lock:
+            entry = self._entry(name)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(0, round(entry[1] - time.monotonic()))
+
+    def _collection(self, name, factory):
+        entry = self._entry(name)
+        if entry is None:
+            entry = self.store[name] = (factory(), None)
+        return entry[0]
+
+    def _prune(self, name):
+        # Redis deletes sets and sorted sets once they're empty.
+        entry = self.store.get(name)
+        if entry is not None and not entry[0]:
+            del self.store[name]
+
+    def sadd(self, name, *values):
+        with self.lock:
+            members = self._collection(name, set)
+            added = {str(value) for value in values} - members
+            members.update(added)
+            return len(added)
+
+    def sismember(self, name, value):
+        with self.lock:
+            entry = self._entry(name)
+            return entry is not None and str(value) in entry[0]
+
+    def smembers(self, name):
+        with self.lock:
+            entry = self._entry(name)
+            return set() if entry is None else set(entry[0])
+
+    def scard(self, name):
+        with self.lock:
+            entry = self._entry(name)
+            return 0 if entry is None else len(entry[0])
+
+    def zadd(self, name, mapping, nx=False):
+        with self.lock:
+            scores = self._collection(name, dict)
+            added = 0
+            for member, score in mapping.items():
+                if member not in scores:
+                    added += 1
+                elif nx:
+                    continue
+                scores[member] = float(score)
+            return added
+
+    def zrem(self, name, *members):
+        with self.lock:
+            entry = self._entry(name)
+            if entry is None:
+                return 0
+            removed = sum(entry[0].pop(member, None) is not None for member in members)
+            self._prune(name)
+            return removed
+
+    def zcard(self, name):
+        with self.lock:
+            entry = self._entry(name)
+            return 0 if entry is None else len(entry[0])
+
+    def zscore(self, name, member):
+        with self.lock:
+            entry = self._entry(name)
+            return None if entry is None else entry[0].get(member)
+
+    def _sorted(self, name):
+        entry = self._entry(name)
+        if entry is None:
+            return []
+        return sorted(entry[0].items(), key=lambda item: (item[1], item[0]))
+
+    def zpopmin(self, name, count=None):
+        with self.lock:
+            popped = self._sorted(name)[: count or 1]
+            for member, _ in popped:
+                del self.store[name][0][member]
+            self._prune(name)
+            return popped
+
+    def zrangebyscore(self, name, min, max, start=None, num=None, withscores=False):
+        with self.lock:
+            low = float("-inf") if min == "-inf" else float(min)
+            high = float("inf") if max == "+inf" else float(max)
+            items = [item for item in self._sorted(name) if low <= item[1] <= high]
+            if start is not None:
+                end = start + num
+                items = items[start:end]
+            return items if withscores else [member for member, _ in items]
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+    def register_script(self, script):
+        function = self.scripts[script]
+
+        def run(keys=(), args=(), client=None):
+            # Atomic like a script run by Redis.
+            with self.lock:
+                return function(client or self, list(keys), list(args))
+
+        return run
+
+
+class MemoryPipeline:
+    """Queues commands and runs them together, under the client's lock."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        with self.client.lock:
+            results = [
+                command(*args, **kwargs) for command, args, kwargs in self.commands
+            ]
+        self.commands = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commands = []
+
+
+def pop_script(client, keys, args):
+    popped = client.zpopmin(keys[0])
+    if not popped:
+        return None
+    client.zadd(keys[1], {popped[0][0]: args[0]})
+    return popped[0][0]
+
+
+MemoryRedis.scripts[POP_SCRIPT] = pop_script
@@ -0,0 +1,233 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..cache import get_or_compute, normalize_params
+from ..models import News, Tags
+from .factories import NewsFactory, TagsFactory
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    client = APIClient()
+    news_url = reverse("news-create-get")
+    tags_url = reverse("tag-create-get")
+
+    def test_news_list_is_cached(self, django_assert_num_queries):
+        NewsFactory.create_batch(3)
+        first = self.client.get(self.news_url)
+
+        # only the freshness check for the conditional GET
+        with django_assert_num_queries(1):
+            second = self.client.get(self.news_url)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+
+    def test_query_params_are_normalized(self):
+        params = ("keywords",)
+
+        assert normalize_params(
+            QueryDict("page=2&keywords=python, rust"), params
+        ) == normalize_params(QueryDict("keywords=rust,python,&page=2"), params)
+        assert normalize_params(QueryDict("keywords=,"), params) != normalize_params(
+            QueryDict("keywords="), params
+        )
+
+    def test_news_change_invalidates(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        self.client.get(url)
+        self.client.get(self.news_url)
+
+        news.title = "Updated title"
+        news.save()
+
+        assert self.client.get(url).data["title"] == "Updated title"
+        assert self.client.get(self.news_url).data["results"][0]["title"] == (
+            "Updated title"
+        )
+
+    def test_tag_change_invalidates_news(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        self.client.get(url)
+        self.client.get(self.tags_url)
+
+        tag = news.tags.first()
+        tag.title = "Renamed tag"
+        tag.save()
+
+        titles = [tag["title"] for tag in self.client.get(url).data["tags"]]
+        assert "Renamed tag" in titles
+        results = self.client.get(self.tags_url).data["results"]
+        assert "Renamed tag" in [result["title"] for result in results]
+
+    def test_tags_change_through_api_invalidates(self):
+        self.client.get(self.tags_url)
+        TagsFactory()
+
+        assert self.client.get(self.tags_url).data["count"] == 1
+
+    def test_not_found_is_not_cached(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        pk = news.pk
+        news.delete()
+
+        assert self.client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        NewsFactory(id=pk)
+        assert self.client.get(url).status_code == status.HTTP_200_OK
+
+
+class TestStampedeProtection:
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute("stampede", compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 5
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    client = APIClient()
+    news_url = reverse("news-create-get")
+
+    def test_news_list_etag(self, django_assert_num_queries):
+        NewsFactory.create_batch(3)
+        response = self.client.get(self.news_url)
+        etag = response.headers["ETag"]
+
+        assert etag.startswith('W/"')
+        assert response.headers["Last-Modified"]
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.news_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+        other_page = self.client.get(
+            self.news_url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert other_page.status_code == status.HTTP_200_OK
+
+    def test_news_list_etag_changes_on_write(self):
+        news = NewsFactory()
+        etag = self.client.get(self.news_url).headers["ETag"]
+
+        news.tags.first().delete()
+
+        response = self.client.get(self.news_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+    def test_news_list_etag_changes_on_delete(self):
+        older, newer = NewsFactory.create_batch(2)
+        etag = self.client.get(self.news_url).headers["ETag"]
+
+        # The newest updated_at stays the same.
+        older.delete()
+
+        response = self.client.get(self.news_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+    def test_etags_change_on_tag_rename(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        list_etag = self.client.get(self.news_url).headers["ETag"]
+        details_etag = self.client.get(url).headers["ETag"]
+
+        tag = news.tags.first()
+        tag.title = "renamed"
+        tag.save()
+
+        response = self.client.get(self.news_url, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == status.HTTP_200_OK
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=details_etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_news_list_etag_is_the_same_across_processes(self, monkeypatch):
+        NewsFactory()
+        etag = self.client.get(self.news_url).headers["ETag"]
+
+        # A fresh cache, like another API process without a shared one.
+        monkeypatch.setattr("apps.news.cache.cache", LocMemCache("other", {}))
+
+        response = self.client.get(self.news_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_news_details_if_modified_since(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        last_modified = self.client.get(url).headers["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_news_details_etag(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        etag = self.client.get(url).headers["ETag"]
+
+        assert (
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+            == status.HTTP_304_NOT_MODIFIED
+        )
+
+        news.content = "changed"
+        news.save()
+        assert (
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+            == status.HTTP_200_OK
+        )
+
+    def test_news_details_last_modified_follows_its_tags(self):
+        news = NewsFactory()
+        News.objects.filter(pk=news.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        Tags.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        url = reverse("news-details", args=[news.pk])
+        last_modified = self.client.get(url).headers["Last-Modified"]
+
+        tag = news.tags.first()
+        tag.title = "renamed"
+        tag.save()
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_200_OK
+        assert "renamed" in [tag["title"] for tag in response.data["tags"]]
+
+    def test_news_details_not_found(self):
+        news = NewsFactory()
+        url = reverse("news-details", args=[news.pk])
+        news.delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='W/"stale"')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+
+import pytest
+from scraper.extensions import CrawlCheckpoint
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy.exceptions import NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+def open_spider(state_dir, **kwargs):
+    crawler = get_crawler(ZoomitSpider, {"CRAWL_STATE_DIR": str(state_dir)})
+    spider = ZoomitSpider.from_crawler(crawler, incremental="0", **kwargs)
+    crawler.spider = spider
+    crawler.stats.open_spider(spider)
+    checkpoint = CrawlCheckpoint.from_crawler(crawler)
+    checkpoint.spider_opened(spider)
+    return checkpoint, spider
+
+
+def save_state(state_dir, state, age=0):
+    path = state_dir / "zoomit.json"
+    path.write_text(json.dumps({"saved_at": time.time() - age, "state": state}))
+    return path
+
+
+def archive_page(page, *articles):
+    links = "".join(
+        f'<a class="fNLyDV" href="/{article}/">{article}</a>' for article in articles
+    )
+    return HtmlResponse(
+        ZoomitSpider.archive_url.format(page=page),
+        body=f"<html><body>{links}</body></html>",
+        encoding="utf-8",
+    )
+
+
+def parse(spider, response):
+    async def collect():
+        return [request async for request in spider.parse(response)]
+
+    return asyncio.run(collect())
+
+
+STATE = {
+    "page": 2,
+    "paginated": False,
+    "pending": {"https://www.zoomit.ir/3/": None},
+    "seen": {},
+}
+
+
+class TestCrawlCheckpoint:
+    def test_not_configured_without_a_state_dir(self):
+        crawler = get_crawler(ZoomitSpider, {"CRAWL_STATE_DIR": ""})
+        with pytest.raises(NotConfigured):
+            CrawlCheckpoint.from_crawler(crawler)
+
+    def test_resumes_from_the_saved_state(self, tmp_path):
+        save_state(tmp_path, STATE)
+        checkpoint, spider = open_spider(tmp_path)
+        checkpoint.spider_closed(spider, "shutdown")
+
+        assert spider.resumed
+        assert spider.state == STATE
+        urls = [request.url for request in spider.resume_requests()]
+        assert urls == [
+            "https://www.zoomit.ir/3/",
+            ZoomitSpider.archive_url.format(page=3),
+        ]
+
+    def test_discards_expired_state(self, tmp_path):
+        path = save_state(tmp_path, STATE, age=7 * 60 * 60)
+        checkpoint, spider = open_spider(tmp_path)
+        checkpoint.spider_closed(spider, "finished")
+
+        assert not spider.resumed
+        assert spider.state["page"] == 0
+        assert not path.exists()
+
+    def test_discards_unreadable_state(self, tmp_path):
+        path = tmp_path / "zoomit.json"
+        path.write_text("{")
+        checkpoint, spider = open_spider(tmp_path)
+        checkpoint.spider_closed(spider, "finished")
+
+        assert not spider.resumed
+        assert not path.exists()
+
+    def test_keeps_the_state_of_an_interrupted_crawl_only(self, tmp_path):
+        checkpoint, spider = open_spider(tmp_path)
+        spider.state["page"] = 4
+        checkpoint.spider_closed(spider, "shutdown")
+
+        saved = json.loads((tmp_path / "zoomit.json").read_text())
+        assert saved["state"]["page"] == 4
+
+        checkpoint, spider = open_spider(tmp_path)
+        assert spider.resumed
+        checkpoint.spider_closed(spider, "finished")
+        assert not (tmp_path / "zoomit.json").exists()
+
+    def test_ignores_crawls_of_given_urls(self, tmp_path):
+        checkpoint, spider = open_spider(tmp_path, urls="https://www.zoomit.ir/1/")
+        checkpoint.spider_closed(spider, "shutdown")
+
+        assert not spider.resumable
+        assert not (tmp_path / "zoomit.json").exists()
+
+
+class TestZoomitSpiderState:
+    def test_parse_tracks_pagination_and_pending_articles(self, tmp_path):
+        checkpoint, spider = open_spider(tmp_path)
+        requests = parse(spider, archive_page(1, 1, 2))
+        checkpoint.spider_closed(spider, "shutdown")
+
+        assert [request.url for request in requests] == [
+            "https://www.zoomit.ir/2/",
+            "https://www.zoomit.ir/1/",
+            ZoomitSpider.archive_url.format(page=2),
+        ]
+        assert spider.state["page"] == 1
+        assert not spider.state["paginated"]
+        assert list(spider.state["pending"]) == [
+            "https://www.zoomit.ir/2/",
+            "https://www.zoomit.ir/1/",
+        ]
+
+    def test_scraped_articles_are_not_requested_again(self, tmp_path):
+        checkpoint, spider = open_spider(tmp_path)
+        parse(spider, archive_page(1, 1, 2))
+        spider.record_outcome("https://www.zoomit.ir/1/", "created")
+        spider.record_outcome("https://www.zoomit.ir/2/", "failed")
+        checkpoint.spider_closed(spider, "shutdown")
+
+        assert spider.state["pending"] == {}
+        assert sorted(spider.state["seen"].values()) == ["created", "failed"]
+
+        checkpoint, spider = open_spider(tmp_path)
+        requests = parse(spider, archive_page(2, 1, 2, 3))
+        checkpoint.spider_closed(spider, "finished")
+
+        assert [request.url for request in requests] == [
+            "https://www.zoomit.ir/3/",
+            ZoomitSpider.archive_url.format(page=3),
+        ]
+
+    def test_last_page_ends_pagination(self, tmp_path):
+        checkpoint, spider = open_spider(tmp_path)
+        parse(spider, archive_page(ZoomitSpider.last_page, 1))
+        checkpoint.spider_closed(spider, "shutdown")
+
+        assert spider.state["paginated"]
+        assert [request.url for request in spider.resume_requests()] == [
+            "https://www.zoomit.ir/1/"
+        ]
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from scraper.runner import CrawlError
+
+from ..management.commands import scrape_many
+from ..models import News
+from .factories import NewsFactory
+
+
+@pytest.fixture
+def crawls(monkeypatch):
+    calls = []
+
+    def crawl(spider, timeout=None, **kwargs):
+        assert timeout == settings.CRAWL_TIMEOUT
+        calls.append(kwargs)
+        outcomes = {url: "updated" for url in kwargs["urls"][:-1]}
+        return {
+            "items_scraped": len(outcomes),
+            "items_created": 0,
+            "items_updated": len(outcomes),
+            "items_unchanged": 0,
+            "items_failed": 0,
+            "duration": 1.0,
+            "outcomes": outcomes,
+        }
+
+    monkeypatch.setattr(scrape_many, "crawl", crawl)
+    return calls
+
+
+@pytest.mark.django_db
+class TestScrapeMany:
+    def test_urls_are_deduplicated_and_batched(self, crawls, tmp_path):
+        file = tmp_path / "urls.txt"
+        file.write_text("https://a.com/1\n\n# comment\nhttps://a.com/2\n")
+        out = StringIO()
+
+        call_command(
+            "scrape_many",
+            "https://a.com/1",
+            " https://a.com/3 ",
+            file=str(file),
+            batch_size=2,
+            verbosity=2,
+            stdout=out,
+        )
+
+        assert [call["urls"] for call in crawls] == [
+            ["https://a.com/1", "https://a.com/3"],
+            ["https://a.com/2"],
+        ]
+        assert all(call["update_existing"] for call in crawls)
+        assert "not scraped\thttps://a.com/3" in out.getvalue()
+        assert "1 updated, 2 not scraped" in out.getvalue()
+
+    def test_older_than_and_skip_existing(self, crawls):
+        stale = NewsFactory()
+        News.objects.filter(pk=stale.pk).update(
+            updated_at=timezone.now() - timedelta(days=10)
+        )
+        NewsFactory()
+
+        call_command(
+            "scrape_many",
+            "https://a.com/new",
+            older_than=7,
+            stdout=StringIO(),
+        )
+        assert crawls[0]["urls"] == ["https://a.com/new", stale.source]
+
+        call_command(
+            "scrape_many",
+            "https://a.com/new",
+            stale.source,
+            skip_existing=True,
+            stdout=StringIO(),
+        )
+        assert crawls[1] == {"urls": ["https://a.com/new"], "update_existing": False}
+
+    def test_a_failed_batch_does_not_stop_the_others(self, crawls, monkeypatch):
+        succeed = scrape_many.crawl
+
+        def crawl(spider, **kwargs):
+            if "https://a.com/1" in kwargs["urls"]:
+                raise CrawlError("Crawl timed out after 1800s")
+            return succeed(spider, **kwargs)
+
+        monkeypatch.setattr(scrape_many, "crawl", crawl)
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "scrape_many",
+            *(f"https://a.com/{number}" for number in range(1, 5)),
+            batch_size=2,
+            verbosity=2,
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        assert "Crawl timed out after 1800s" in stderr.getvalue()
+        assert "error\thttps://a.com/1" in stdout.getvalue()
+        assert "error\thttps://a.com/2" in stdout.getvalue()
+        assert "updated\thttps://a.com/3" in stdout.getvalue()
+        assert "2 error, 1 updated, 1 not scraped" in stdout.getvalue()
+
+    def test_no_urls(self, crawls):
+        with pytest.raises(CommandError):
+            call_command("scrape_many", stdout=StringIO())
+        assert crawls == []
@@ -0,0 +1,30 @@
+import pytest
+from config.db_routers import PrimaryReplicaRouter
+from django.db import connections
+
+from ..models import News
+
+
+class TestPrimaryReplicaRouter:
+    router = PrimaryReplicaRouter()
+
+    @pytest.fixture
+    def replica(self, settings):
+        settings.DATABASES = {**settings.DATABASES, "replica": {}}
+
+    def test_without_replica(self):
+        assert self.router.db_for_read(News) == "default"
+        assert self.router.db_for_write(News) == "default"
+
+    def test_reads_go_to_replica(self, replica):
+        assert self.router.db_for_read(News) == "replica"
+        assert self.router.db_for_write(News) == "default"
+
+    def test_reads_in_transaction_stay_on_primary(self, replica, monkeypatch):
+        monkeypatch.setattr(connections["default"], "in_atomic_block", True)
+
+        assert self.router.db_for_read(News) == "default"
+
+    def test_migrations_only_on_primary(self, replica):
+        assert self.router.allow_migrate("default", "news")
+        assert not self.router.allow_migrate("replica", "news")
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from scraper.extractors import extract_article
+from scrapy.http import HtmlResponse
+
+FIXTURES = Path(__file__).resolve().parents[3] / "benchmarks" / "fixtures" / "zoomit"
+
+
+def response(body):
+    return HtmlResponse("https://www.zoomit.ir/a/", body=body, encoding="utf-8")
+
+
+class TestExtractArticle:
+    def test_article_fields(self):
+        article = extract_article(
+            response((FIXTURES / "article_basic.html").read_bytes())
+        )
+
+        assert article["title"] == "اپل از آیفون جدید با تراشه‌ی سریع‌تر رونمایی کرد"
+        assert article["tags"] == ["موبایل", "اپل", "آیفون"]
+        content = article["content"]
+        assert content.startswith("اپل در مراسمی که امروز برگزار شد، از نسل جدید آیفون")
+        assert "قیمت پایه‌ی این گوشی ۷۹۹ دلار اعلام شده است." in content
+        assert content.endswith("پاراگراف پایانی در بخش دوم محتوا قرار دارد.")
+        # Headings, stop phrases and everything after a break are left out.
+        for excluded in ["مشخصات فنی", "تبلیغات", "مطالعه", "مرتبط", "نباید"]:
+            assert excluded not in content
+
+    def test_missing_title(self):
+        article = extract_article(response(b"<html><body><p>404</p></body></html>"))
+
+        assert article == {"title": None, "content": "", "tags": []}
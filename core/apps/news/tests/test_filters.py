@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..search import get_search_backend
+from .factories import NewsFactory
+
+
+@pytest.mark.django_db
+class TestNewsFilter:
+    client = APIClient()
+    url = reverse("news-create-get")
+
+    def result_ids(self, response):
+        return {result["id"] for result in response.data.get("results")}
+
+    def test_keywords_filter(self):
+        python = NewsFactory(title="Python release", content="new interpreter")
+        rust = NewsFactory(title="Compiler news", content="rust borrow checker")
+        NewsFactory(title="Weather", content="sunny day")
+
+        response = self.client.get(self.url, {"keywords": "python, rust"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.result_ids(response) == {str(python.id), str(rust.id)}
+
+    def test_keywords_filter_ranks_title_first(self):
+        in_content = NewsFactory(title="Weekly roundup", content="a gadget review")
+        in_title = NewsFactory(title="Gadget launch", content="a new device")
+
+        response = self.client.get(self.url, {"keywords": "gadget"})
+
+        ids = [result["id"] for result in response.data.get("results")]
+        assert ids == [str(in_title.id), str(in_content.id)]
+
+    def test_keywords_match_whole_words(self):
+        NewsFactory(title="Pythonic idioms", content="list comprehensions")
+        python = NewsFactory(title="Python release", content="new interpreter")
+
+        response = self.client.get(self.url, {"keywords": "python"})
+        assert self.result_ids(response) == {str(python.id)}
+
+        response = self.client.get(self.url, {"keywords": "python release"})
+        assert self.result_ids(response) == {str(python.id)}
+
+        response = self.client.get(self.url, {"keywords": "pyth"})
+        assert response.data.get("results") == []
+
+    def test_excludes_filter(self):
+        NewsFactory(title="Python release", content="new interpreter")
+        weather = NewsFactory(title="Weather", content="sunny day")
+
+        response = self.client.get(self.url, {"excludes": "python"})
+
+        assert self.result_ids(response) == {str(weather.id)}
+
+    def test_index_follows_updates_and_deletes(self):
+        news = NewsFactory(title="Old title", content="old body")
+
+        news.title = "Fresh title"
+        news.save()
+
+        response = self.client.get(self.url, {"keywords": "old"})
+        assert self.result_ids(response) == {str(news.id)}
+
+        response = self.client.get(self.url, {"keywords": "fresh"})
+        assert self.result_ids(response) == {str(news.id)}
+
+        news.delete()
+        response = self.client.get(self.url, {"keywords": "fresh"})
+        assert response.data.get("results") == []
+
+    def test_rebuild_index(self):
+        news = NewsFactory(title="Persistent", content="indexed body")
+
+        get_search_backend().rebuild()
+
+        response = self.client.get(self.url, {"keywords": "persistent"})
+        assert self.result_ids(response) == {str(news.id)}
@@ -0,0 +1,37 @@
+import pytest
+from config import views
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestHealth:
+    client = APIClient()
+
+    def test_liveness(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = self.client.get(reverse("health-liveness"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"status": "ok"}
+
+    def test_readiness(self):
+        response = self.client.get(reverse("health-readiness"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "status": "ok",
+            "checks": {"database": "ok", "cache": "ok"},
+        }
+
+    def test_readiness_failing_check(self, monkeypatch):
+        def unavailable():
+            raise ConnectionError("Connection refused")
+
+        monkeypatch.setitem(views.READINESS_CHECKS, "cache", unavailable)
+
+        response = self.client.get(reverse("health-readiness"))
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["checks"] == {"database": "ok", "cache": "error"}
@@ -0,0 +1,93 @@
+import pytest
+
+from .. import cache
+from ..ingest import bulk_upsert_news, fingerprint, resolve_tags
+from ..models import News, Tags
+from .factories import NewsFactory, TagsFactory
+
+
+def item(number, tags=("Tech",)):
+    return {
+        "title": f"title {number}",
+        "content": f"content {number}",
+        "source": f"https://example.com/{number}",
+        "tags": list(tags),
+    }
+
+
+@pytest.mark.django_db
+class TestIngest:
+    def test_resolve_tags(self):
+        existing = TagsFactory(title="Tech")
+
+        tags = resolve_tags(["Tech", "Science"])
+
+        assert tags["Tech"] == existing
+        assert set(tags) == {"Tech", "Science"}
+        assert Tags.objects.count() == 2
+
+    def test_bulk_upsert_skips_existing(self):
+        news = NewsFactory()
+        original_title = news.title
+        items = [item(1), {**item(2), "source": news.source}]
+
+        saved = bulk_upsert_news(items, update_existing=False)
+
+        assert saved[news.source] == (news.pk, "skipped")
+        assert saved[items[0]["source"]][1] == "created"
+        news.refresh_from_db()
+        assert news.title == original_title
+        assert news.tags.count() == 5
+
+    def test_bulk_upsert_searchable(self):
+        bulk_upsert_news([{**item(1), "title": "Quantum computing"}])
+
+        news = News.objects.get(source=item(1)["source"])
+        assert list(
+            News.objects.filter(pk__in=[news.pk]).values_list("title", flat=True)
+        ) == ["Quantum computing"]
+        assert news.estimated_reading_time == 1
+
+    def test_fingerprint_ignores_whitespace_and_tag_order(self):
+        assert fingerprint("a  title", "some\ncontent", ["x", "y"]) == fingerprint(
+            "a title", " some content ", ["y", "x"]
+        )
+        assert fingerprint("a title", "content", ["x"]) != fingerprint(
+            "a title", "content!", ["x"]
+        )
+
+    def test_bulk_upsert_updates_changed(self):
+        bulk_upsert_news([item(1)])
+        news = News.objects.get(source=item(1)["source"])
+
+        saved = bulk_upsert_news([{**item(1), "content": "fixed", "tags": ["AI"]}])
+
+        assert saved[news.source] == (news.pk, "updated")
+        updated = News.objects.get(pk=news.pk)
+        assert updated.content == "fixed"
+        assert updated.updated_at > news.updated_at
+        assert list(updated.tags.values_list("title", flat=True)) == ["AI"]
+
+    def test_bulk_upsert_leaves_unchanged_alone(self):
+        bulk_upsert_news([item(1)])
+        news = News.objects.get(source=item(1)["source"])
+        generations = cache.get_generations([cache.NEWS, cache.TAGS])
+
+        saved = bulk_upsert_news(
+            [{**item(1), "content": " content   1 ", "etag": '"v2"'}]
+        )
+
+        assert saved[news.source] == (news.pk, "unchanged")
+        refreshed = News.objects.get(pk=news.pk)
+        assert refreshed.updated_at == news.updated_at
+        assert refreshed.content == news.content
+        assert refreshed.source_etag == '"v2"'
+        assert cache.get_generations([cache.NEWS, cache.TAGS]) == generations
+
+    def test_bulk_upsert_keeps_is_public_of_scraped_items(self):
+        bulk_upsert_news([{**item(1), "is_public": False}])
+
+        saved = bulk_upsert_news([{**item(1), "content": "fixed"}])
+
+        assert saved[item(1)["source"]][1] == "updated"
+        assert News.objects.get(source=item(1)["source"]).is_public is False
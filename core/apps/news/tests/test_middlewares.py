@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+
+import pytest
+from scraper.middlewares import (
+    PlaywrightContextPoolMiddleware,
+    PlaywrightEscalationMiddleware,
+    should_abort_request,
+)
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy import Request, signals
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.http import HtmlResponse
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+
+POOL = {"PLAYWRIGHT_CONTEXTS": {"zoomit-0": {}, "zoomit-1": {}}}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+def crawler_and_spider(settings=None):
+    crawler = get_crawler(ZoomitSpider, settings)
+    spider = ZoomitSpider.from_crawler(crawler)
+    crawler.spider = spider
+    crawler.stats.open_spider(spider)
+    return crawler, spider
+
+
+def rendered(number, **meta):
+    return Request(
+        f"https://www.zoomit.ir/{number}/", meta={"playwright": True, **meta}
+    )
+
+
+ARTICLE = b"<html><body><h1>Title</h1><div class='sc-481293f7-1'></div></body></html>"
+
+
+class TestPlaywrightEscalationMiddleware:
+    @pytest.fixture
+    def escalation(self):
+        crawler, spider = crawler_and_spider()
+        return PlaywrightEscalationMiddleware.from_crawler(crawler), crawler, spider
+
+    def article_request(self, spider, **meta):
+        return Request(
+            "https://www.zoomit.ir/1/",
+            meta={**spider.request_meta("article"), **meta},
+        )
+
+    def test_complete_static_responses_are_kept(self, escalation):
+        middleware, crawler, spider = escalation
+        request = self.article_request(spider)
+        response = HtmlResponse(request.url, body=ARTICLE, request=request)
+
+        assert middleware.process_response(request, response, spider) is response
+        assert crawler.stats.get_value("hybrid/article/plain") == 1
+
+    @pytest.mark.parametrize(
+        "status, body",
+        [(403, b"<html><body>Access denied</body></html>"), (200, b"")],
+        ids=["blocked", "empty"],
+    )
+    def test_incomplete_static_responses_escalate_once(self, escalation, status, body):
+        middleware, crawler, spider = escalation
+        request = self.article_request(spider)
+        response = HtmlResponse(request.url, status=status, body=body, request=request)
+
+        escalated = middleware.process_response(request, response, spider)
+
+        assert isinstance(escalated, Request)
+        assert escalated.meta["playwright"] is True
+        assert escalated.dont_filter
+        assert crawler.stats.get_value("hybrid/article/escalated") == 1
+
+        # The rendered response is kept, even when it's still incomplete.
+        rendered = HtmlResponse(
+            request.url, status=status, body=body, request=escalated
+        )
+        assert middleware.process_response(escalated, rendered, spider) is rendered
+        assert crawler.stats.get_value("hybrid/article/escalated") == 1
+
+    def test_not_modified_responses_are_kept(self, escalation):
+        middleware, _, spider = escalation
+        request = self.article_request(spider)
+        response = HtmlResponse(request.url, status=304, request=request)
+
+        assert middleware.process_response(request, response, spider) is response
+
+
+def playwright_request(resource_type, url="https://www.zoomit.ir/1/"):
+    return SimpleNamespace(resource_type=resource_type, url=url)
+
+
+class TestShouldAbortRequest:
+    @pytest.mark.parametrize("resource_type", ["image", "font", "media"])
+    def test_heavy_resources_are_blocked(self, resource_type):
+        assert should_abort_request(playwright_request(resource_type))
+
+    @pytest.mark.parametrize("resource_type", ["document", "script", "xhr"])
+    def test_documents_and_scripts_load(self, resource_type):
+        assert not should_abort_request(playwright_request(resource_type))
+
+    def test_ad_and_analytics_hosts_are_blocked(self):
+        assert should_abort_request(
+            playwright_request("script", "https://www.googletagmanager.com/gtm.js")
+        )
+        assert not should_abort_request(
+            playwright_request("script", "https://notdoubleclick.net/app.js")
+        )
+
+
+class TestPlaywrightContextPoolMiddleware:
+    @pytest.fixture
+    def pool(self):
+        crawler, spider = crawler_and_spider(POOL)
+        return PlaywrightContextPoolMiddleware.from_crawler(crawler), crawler, spider
+
+    def test_requests_go_to_the_least_busy_context(self, pool):
+        middleware, _, spider = pool
+        requests = [rendered(number) for number in range(3)]
+        for request in requests:
+            middleware.process_request(request, spider)
+
+        contexts = [request.meta["playwright_context"] for request in requests]
+        assert sorted(contexts[:2]) == ["zoomit-0", "zoomit-1"]
+        assert middleware.in_flight == {"zoomit-0": 2, "zoomit-1": 1}
+
+    def test_plain_and_custom_context_requests_are_left_alone(self, pool):
+        middleware, _, spider = pool
+        plain = Request("https://www.zoomit.ir/1/")
+        custom = rendered(2, playwright_context="login")
+        middleware.process_request(plain, spider)
+        middleware.process_request(custom, spider)
+
+        assert "playwright_context" not in plain.meta
+        assert custom.meta["playwright_context"] == "login"
+        assert middleware.in_flight == {"zoomit-0": 0, "zoomit-1": 0}
+
+    def test_responses_and_exceptions_release_their_context(self, pool):
+        middleware, _, spider = pool
+        first, second = rendered(1), rendered(2)
+        middleware.process_request(first, spider)
+        middleware.process_request(second, spider)
+
+        response = HtmlResponse(first.url, body=b"", request=first)
+        middleware.process_response(first, response, spider)
+        middleware.process_exception(second, TimeoutError(), spider)
+        # Released once, however many hooks see the request.
+        middleware.request_left(first, spider)
+
+        assert middleware.in_flight == {"zoomit-0": 0, "zoomit-1": 0}
+        assert middleware.assigned == {}
+
+    def test_retried_requests_do_not_leak_their_context(self, pool):
+        middleware, crawler, spider = pool
+        request = rendered(1)
+
+        # Retried as often as RETRY_TIMES allows.
+        for _ in range(2):
+            middleware.process_request(request, spider)
+            # RetryMiddleware sits closer to the downloader and returns this
+            # copy before the pool's process_exception runs.
+            retried = get_retry_request(request, spider=spider, reason="timeout")
+            crawler.signals.send_catch_log(
+                signals.request_left_downloader, request=request, spider=spider
+            )
+            assert isinstance(retried, Request)
+            request = retried
+
+        assert middleware.in_flight == {"zoomit-0": 0, "zoomit-1": 0}
+        middleware.process_request(request, spider)
+        assert sum(middleware.in_flight.values()) == 1
@@ -1,8 +1,10 @@
 from math import ceil
 
 import pytest
+from django.core.management import call_command
 
-from ..read_time_engine import NewsReadTimeEngine
+from ..models import News
+from ..read_time_engine import NewsReadTimeEngine, ReadingEstimate
 from .factories import NewsFactory, TagsFactory
 
 
@@ -55,3 +57,96 @@ class TestNewsModel:
         total_time = ceil(total_time)
 
         assert total_time == news.estimated_reading_time
+
+    def test_reading_time_is_stored(self):
+        news = NewsFactory()
+        stored = News.objects.get(pk=news.pk)
+
+        assert stored.title_word_count == NewsReadTimeEngine.word_count(news.title)
+        assert stored.content_word_count == NewsReadTimeEngine.word_count(news.content)
+        assert stored.tags_count == 5
+        assert stored.estimated_reading_time == NewsReadTimeEngine.estimate(news)
+
+    def test_reading_time_follows_content(self):
+        news = NewsFactory()
+        news.content = "word " * 1000
+        news.save()
+
+        stored = News.objects.get(pk=news.pk)
+        assert stored.content_word_count == 1000
+        assert stored.estimated_reading_time == NewsReadTimeEngine.estimate(news)
+
+    def test_reading_time_follows_tags(self):
+        news = NewsFactory()
+        news.tags.add(*TagsFactory.create_batch(20))
+        assert News.objects.get(pk=news.pk).tags_count == 25
+
+        news.tags.first().delete()
+        assert News.objects.get(pk=news.pk).tags_count == 24
+
+        news.tags.clear()
+        stored = News.objects.get(pk=news.pk)
+        assert stored.tags_count == 0
+        assert stored.estimated_reading_time == NewsReadTimeEngine.estimate(news)
+
+    def test_backfill_reading_time(self):
+        news = NewsFactory.create_batch(3)
+        News.objects.update(
+            title_word_count=0,
+            content_word_count=0,
+            tags_count=0,
+            estimated_reading_time=0,
+        )
+
+        call_command("backfill_reading_time", batch_size=2)
+
+        for news_instance in news:
+            stored = News.objects.get(pk=news_instance.pk)
+            assert stored.tags_count == 5
+            assert stored.estimated_reading_time == NewsReadTimeEngine.estimate(
+                news_instance
+            )
+
+
+class TestNewsReadTimeEngine:
+    def test_word_count_keeps_persian_words_whole(self):
+        # Joined by a zero-width non-joiner, and with a kasra.
+        assert NewsReadTimeEngine.word_count("کتاب\u200cهای کِتاب می\u200cشود") == 3
+        assert NewsReadTimeEngine.word_count("Apple's M4, 12.5 \u200c") == 5
+        assert NewsReadTimeEngine.word_count("") == 0
+
+    def test_estimate_many_tuples(self):
+        estimates = NewsReadTimeEngine.estimate_many(
+            [("a title", "word " * 500, 12), ("", "", 0)]
+        )
+
+        assert estimates == [
+            ReadingEstimate(2, 500, 12, 4),
+            ReadingEstimate(0, 0, 0, 0),
+        ]
+
+    @pytest.mark.django_db
+    def test_estimate_many_news(self, django_assert_num_queries):
+        news = NewsFactory.create_batch(3)
+        news[0].tags.clear()
+        news = list(News.objects.filter(pk__in=[n.pk for n in news]))
+
+        with django_assert_num_queries(1):
+            estimates = NewsReadTimeEngine.estimate_many(news)
+
+        for instance, estimate in zip(news, estimates):
+            assert estimate.tags_count == instance.tags.count()
+            assert estimate.estimated_reading_time == NewsReadTimeEngine.estimate(
+                instance
+            )
+
+    @pytest.mark.django_db
+    def test_apply_with_tags_counts(self, django_assert_num_queries):
+        news = [News(title="title", content="word " * 300)]
+
+        with django_assert_num_queries(0):
+            NewsReadTimeEngine.apply(news, [24])
+
+        assert news[0].content_word_count == 300
+        assert news[0].tags_count == 24
+        assert news[0].estimated_reading_time == 4
@@ -0,0 +1,88 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import News
+from .factories import NewsFactory, TagsFactory
+
+
+@pytest.mark.django_db
+class TestKeysetCursorPagination:
+    client = APIClient()
+    news_url = reverse("news-create-get")
+    tags_url = reverse("tag-create-get")
+
+    def walk(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            ids.extend(result["id"] for result in response.data["results"])
+            if not response.data["next"]:
+                return ids, response
+            response = self.client.get(response.data["next"])
+
+    def test_walks_news_feed_with_ties(self):
+        news = NewsFactory.create_batch(7)
+        # Same updated_at for every row so the cursor has to use the full key.
+        News.objects.update(updated_at=timezone.now())
+
+        ids, _ = self.walk(self.news_url, {"pagination": "cursor", "page_size": 2})
+
+        expected = News.objects.order_by("-updated_at", "-created_at", "-id")
+        assert ids == [str(pk) for pk in expected.values_list("pk", flat=True)]
+        assert len(set(ids)) == len(news)
+
+    def test_previous_link(self):
+        NewsFactory.create_batch(5)
+
+        first = self.client.get(self.news_url, {"pagination": "cursor", "page_size": 2})
+        assert first.data["previous"] is None
+
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        assert back.data["results"] == first.data["results"]
+        assert back.data["next"]
+
+    def test_walks_tags(self):
+        tags = TagsFactory.create_batch(4)
+
+        ids, _ = self.walk(self.tags_url, {"pagination": "cursor", "page_size": 3})
+
+        assert sorted(ids) == sorted(str(tag.id) for tag in tags)
+
+    def test_page_size_is_capped(self):
+        TagsFactory.create_batch(3)
+
+        response = self.client.get(
+            self.tags_url, {"pagination": "cursor", "page_size": 10_000}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 3
+
+    def test_no_count_query(self, django_assert_num_queries):
+        NewsFactory.create_batch(6)
+
+        # freshness + page + tags, no COUNT(*) for the page
+        with django_assert_num_queries(3):
+            response = self.client.get(
+                self.news_url, {"pagination": "cursor", "page_size": 3}
+            )
+        assert len(response.data["results"]) == 3
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.news_url, {"cursor": "bm9wZQ=="})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_mode_accepts_page_size(self):
+        NewsFactory.create_batch(7)
+
+        response = self.client.get(self.news_url, {"page_size": 6})
+
+        assert response.data["count"] == 7
+        assert len(response.data["results"]) == 6
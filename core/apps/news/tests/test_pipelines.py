@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from scraper.pipelines import SaveNewsToDjangoPipeLine
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy.pipelines import ItemPipelineManager
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+def item(number):
+    return {
+        "title": f"title {number}",
+        "content": f"content {number}",
+        "source": f"https://www.zoomit.ir/{number}/",
+        "tags": [],
+    }
+
+
+class TestSaveNewsToDjangoPipeLine:
+    def test_the_manager_flushes_the_buffer_on_close(self, monkeypatch):
+        flushed = []
+
+        async def save_items(pipeline, items, spider):
+            flushed.extend(items)
+            return {item["source"]: "created" for item in items}
+
+        monkeypatch.setattr(SaveNewsToDjangoPipeLine, "save_items", save_items)
+        crawler = get_crawler(
+            ZoomitSpider,
+            {
+                "ITEM_PIPELINES": {"scraper.pipelines.SaveNewsToDjangoPipeLine": 300},
+                "NEWS_PIPELINE_BATCH_SIZE": 50,
+            },
+        )
+        spider = ZoomitSpider.from_crawler(crawler)
+        crawler.spider = spider
+        manager = ItemPipelineManager.from_crawler(crawler)
+
+        async def crawl():
+            await maybe_deferred_to_future(manager.open_spider(spider))
+            for number in range(3):
+                await maybe_deferred_to_future(
+                    manager.process_item(item(number), spider)
+                )
+            # Below the batch size: only the close flushes them.
+            assert flushed == []
+            await maybe_deferred_to_future(manager.close_spider(spider))
+
+        asyncio.get_event_loop().run_until_complete(crawl())
+
+        assert [item["source"] for item in flushed] == [
+            f"https://www.zoomit.ir/{number}/" for number in range(3)
+        ]
+        assert spider.outcomes == {item["source"]: "created" for item in flushed}
+
+    def test_a_bad_item_only_fails_itself(self, monkeypatch):
+        batches = []
+
+        async def save_items(pipeline, items, spider):
+            batches.append(len(items))
+            if any(item["title"] == "title 1" for item in items):
+                raise ValueError("invalid byte sequence")
+            return {item["source"]: "created" for item in items}
+
+        monkeypatch.setattr(SaveNewsToDjangoPipeLine, "save_items", save_items)
+        crawler = get_crawler(ZoomitSpider)
+        spider = ZoomitSpider.from_crawler(crawler)
+        crawler.spider = spider
+        crawler.stats.open_spider(spider)
+        pipeline = SaveNewsToDjangoPipeLine.from_crawler(crawler)
+        pipeline.buffer = [item(number) for number in (0, 1, 2, 0)]
+
+        asyncio.get_event_loop().run_until_complete(pipeline.flush(spider))
+
+        assert batches == [4, 1, 1, 1]
+        assert spider.outcomes == {
+            "https://www.zoomit.ir/0/": "created",
+            "https://www.zoomit.ir/1/": "failed",
+            "https://www.zoomit.ir/2/": "created",
+        }
+        assert spider.failures["https://www.zoomit.ir/1/"]["error_class"] == (
+            "ValueError"
+        )
+        assert crawler.stats.get_value("news/failed") == 1
+        assert crawler.stats.get_value("news/skipped") == 1
@@ -0,0 +1,217 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+from scraper.runner import CrawlError
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy import signals
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from .. import crawls, retries, tasks
+from ..models import ArticleRetry
+from .factories import NewsFactory
+
+TIMEOUT = {"error_class": "TimeoutError", "error": "Timeout 30000ms exceeded"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+@pytest.fixture(autouse=True)
+def retry_settings(settings):
+    settings.CRAWL_REDIS_URL = "memory://tests"
+    settings.CRAWL_RETRY_MAX_ATTEMPTS = 3
+    settings.CRAWL_RETRY_BASE_DELAY = 60
+    settings.CRAWL_RETRY_MAX_DELAY = 90
+
+
+def article(number):
+    return f"https://www.zoomit.ir/{number}/"
+
+
+@pytest.mark.django_db
+class TestRetryQueue:
+    def test_backoff_doubles_up_to_the_max_delay(self):
+        assert [retries.backoff(attempts) for attempts in (1, 2, 3)] == [60, 90, 90]
+
+    def test_failures_are_retried_later_then_given_up_on(self):
+        now = timezone.now()
+        retries.record_failures({article(1): TIMEOUT}, now=now)
+
+        retry = ArticleRetry.objects.get()
+        assert retry.attempts == 1
+        assert retry.error_class == "TimeoutError"
+        assert retry.next_attempt_at == now + timedelta(seconds=60)
+
+        retries.record_failures({article(1): TIMEOUT}, now=now)
+        retry.refresh_from_db()
+        assert retry.attempts == 2
+        assert retry.next_attempt_at == now + timedelta(seconds=90)
+
+        assert retries.record_failures({article(1): TIMEOUT}, now=now) == [article(1)]
+        retry.refresh_from_db()
+        assert retry.attempts == 3
+        assert retry.next_attempt_at is None
+
+    def test_outcomes_queue_failed_and_dequeue_stored_articles(self):
+        retries.record_failures({article(1): TIMEOUT, article(2): TIMEOUT})
+
+        retries.record_outcomes(
+            {article(1): "created", article(2): "failed", article(3): "failed"},
+            {article(3): {"error_class": "ExtractionError", "error": "No title"}},
+        )
+
+        queued = dict(ArticleRetry.objects.values_list("source", "error_class"))
+        assert queued == {
+            article(2): "Unknown",
+            article(3): "ExtractionError",
+        }
+        assert ArticleRetry.objects.get(source=article(2)).attempts == 2
+
+    def test_crawl_errors_count_for_the_articles_without_outcome(self):
+        summary = {
+            "finish_reason": "error",
+            "error": "Crawl process exited",
+            "outcomes": {article(1): "created"},
+        }
+        retries.record_crawl_error([article(1), article(2)], summary)
+        retries.record_crawl_error([article(3)], {"finish_reason": "finished"})
+
+        retry = ArticleRetry.objects.get()
+        assert retry.source == article(2)
+        assert retry.error_class == "CrawlError"
+
+    def test_due_sources_in_order(self):
+        now = timezone.now()
+        retries.record_failures({article(1): TIMEOUT}, now=now - timedelta(hours=1))
+        retries.record_failures({article(2): TIMEOUT}, now=now - timedelta(hours=2))
+        retries.record_failures({article(3): TIMEOUT}, now=now)
+        ArticleRetry.objects.filter(source=article(1)).update(attempts=3)
+        retries.record_failures({article(1): TIMEOUT}, now=now - timedelta(hours=1))
+
+        assert retries.due_sources(10, now=now) == [article(2)]
+        assert retries.due_sources(10, now=now + timedelta(hours=1)) == [
+            article(2),
+            article(3),
+        ]
+
+
+@pytest.mark.django_db
+class TestRetryFailedArticles:
+    @pytest.fixture
+    def crawled(self, monkeypatch):
+        """Fake crawl process: the first article still fails, the rest render."""
+        calls = []
+
+        def crawl(spider, **kwargs):
+            calls.append(kwargs["urls"])
+            outcomes = {url: "created" for url in kwargs["urls"]}
+            outcomes[article(1)] = "failed"
+            retries.record_outcomes(outcomes)
+            return {"finish_reason": "finished", "outcomes": outcomes}
+
+        monkeypatch.setattr(tasks, "crawl", crawl)
+        return calls
+
+    def queue(self, *numbers):
+        retries.record_failures(
+            {article(number): TIMEOUT for number in numbers},
+            now=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_renders_the_due_articles(self, crawled):
+        self.queue(1, 2)
+
+        result = tasks.retry_failed_articles()
+
+        assert result["retried"] == 2
+        assert sorted(crawled[0]) == [article(1), article(2)]
+        retry = ArticleRetry.objects.get()
+        assert retry.source == article(1)
+        assert retry.attempts == 2
+        # The failed article can be claimed again, the stored one can't.
+        assert crawls.claim_sources("next", [article(1), article(2)]) == [article(1)]
+
+    def test_skips_articles_claimed_by_a_crawl(self, crawled):
+        self.queue(1, 2)
+        crawls.claim_sources("crawl", [article(2)])
+
+        assert tasks.retry_failed_articles()["retried"] == 1
+        assert crawled == [[article(1)]]
+
+    def test_nothing_due(self, crawled):
+        assert tasks.retry_failed_articles()["retried"] == 0
+        assert crawled == []
+
+    def test_crawl_process_errors_count_as_attempts(self, monkeypatch):
+        self.queue(1)
+
+        def crawl(spider, **kwargs):
+            raise CrawlError("Crawl process exited during the zoomit crawl")
+
+        monkeypatch.setattr(tasks, "crawl", crawl)
+        result = tasks.retry_failed_articles()
+
+        assert result["finish_reason"] == "error"
+        retry = ArticleRetry.objects.get()
+        assert retry.attempts == 2
+        assert retry.error_class == "CrawlError"
+
+
+class TestZoomitSpiderFailures:
+    def spider(self):
+        crawler = get_crawler(ZoomitSpider)
+        return ZoomitSpider.from_crawler(crawler, urls=article(1))
+
+    def test_records_the_error_of_failed_downloads(self):
+        spider = self.spider()
+        failure = Failure(TimeoutError("Timeout 30000ms exceeded"))
+        failure.request = Request(article(1))
+        spider.download_failed(failure)
+
+        assert spider.outcomes == {article(1): "failed"}
+        assert spider.failures[article(1)]["error_class"] == "TimeoutError"
+
+        spider.record_outcome(article(1), "created")
+        assert spider.failures == {}
+
+    def test_records_the_errors_raised_by_article_callbacks(self):
+        spider = self.spider()
+        failure = Failure(AttributeError("'NoneType' object has no attribute 'strip'"))
+        for number, callback in ((1, spider.parse_news_page), (2, spider.parse)):
+            request = Request(article(number), callback=callback)
+            response = HtmlResponse(request.url, body=b"", request=request)
+            spider.crawler.signals.send_catch_log(
+                signals.spider_error, failure=failure, response=response, spider=spider
+            )
+
+        assert spider.failures == {
+            article(1): {
+                "error_class": "AttributeError",
+                "error": "'NoneType' object has no attribute 'strip'",
+            }
+        }
+
+    def test_a_page_without_title_fails(self):
+        spider = self.spider()
+        response = HtmlResponse(article(1), body=b"<html><body></body></html>")
+        assert list(spider.parse_news_page(response)) == []
+
+        assert spider.failures[article(1)]["error_class"] == "ExtractionError"
+
+    @pytest.mark.django_db
+    def test_archive_crawls_leave_queued_articles_to_the_retries(self):
+        spider = self.spider()
+        NewsFactory(source=article(1))
+        retries.record_failures({article(2): TIMEOUT})
+
+        known = async_to_sync(spider.known_sources)([article(n) for n in (1, 2, 3)])
+
+        assert known == {article(1), article(2)}
@@ -0,0 +1,59 @@
+import os
+import signal
+import time
+
+import pytest
+from scraper.runner import CrawlError, CrawlProcess
+
+# Entry points of fake crawl processes: spawned children import them from
+# this module, so they must stay at module level.
+
+
+def echo(conn):
+    while True:
+        try:
+            spider, kwargs = conn.recv()
+        except EOFError:
+            return
+        if kwargs.get("crash"):
+            os._exit(1)
+        if kwargs.get("hang"):
+            # Like a browser call that never returns, deaf to SIGTERM.
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            time.sleep(3600)
+        conn.send({"spider": spider, "pid": os.getpid(), **kwargs})
+
+
+@pytest.fixture
+def process():
+    process = CrawlProcess(target=echo)
+    yield process
+    process.stop(timeout=0)
+
+
+class TestCrawlProcess:
+    def test_crawls_run_in_one_reused_process(self, process):
+        first = process.crawl("zoomit", timeout=30, pages=[1])
+        second = process.crawl("zoomit", timeout=30)
+
+        assert first["spider"] == "zoomit"
+        assert first["pages"] == [1]
+        assert first["pid"] == second["pid"] != os.getpid()
+
+    def test_a_hung_crawl_times_out_and_is_killed(self, process):
+        started = time.monotonic()
+        with pytest.raises(CrawlError, match="timed out after 1s"):
+            process.crawl("zoomit", timeout=1, hang=True)
+
+        assert time.monotonic() - started < 30
+        assert not process.is_alive()
+        # The next crawl starts a new process.
+        assert process.crawl("zoomit", timeout=30)["spider"] == "zoomit"
+
+    def test_a_crashed_process_raises_and_is_restarted(self, process):
+        pid = process.crawl("zoomit", timeout=30)["pid"]
+
+        with pytest.raises(CrawlError, match="exited during the zoomit crawl"):
+            process.crawl("zoomit", timeout=30, crash=True)
+
+        assert process.crawl("zoomit", timeout=30)["pid"] != pid
@@ -0,0 +1,161 @@
+import json
+import time
+
+import pytest
+import scrapy
+from scraper.scheduler import MEMBER_META_KEY, RedisScheduler
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+
+SETTINGS = {
+    "SCHEDULER": "scraper.scheduler.RedisScheduler",
+    "DUPEFILTER_CLASS": "scraper.scheduler.RedisDupeFilter",
+    "SCHEDULER_REDIS_URL": "memory://scheduler",
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+def open_scheduler(job="crawl", **settings):
+    """A scheduler as opened by the engine of one spider process."""
+    crawler = get_crawler(ZoomitSpider, {**SETTINGS, **settings})
+    spider = ZoomitSpider.from_crawler(crawler, job=job)
+    crawler.spider = spider
+    crawler.stats.open_spider(spider)
+    scheduler = RedisScheduler.from_crawler(crawler)
+    scheduler.open(spider)
+    return scheduler, spider
+
+
+def article(number, **kwargs):
+    return scrapy.Request(f"https://www.zoomit.ir/{number}/", **kwargs)
+
+
+class TestRedisScheduler:
+    def test_requests_come_out_by_priority(self):
+        scheduler, spider = open_scheduler()
+        scheduler.enqueue_request(article(1))
+        scheduler.enqueue_request(article(2, priority=10))
+        scheduler.enqueue_request(
+            article(3, callback=spider.parse_news_page, meta={"page_type": "article"})
+        )
+
+        assert len(scheduler) == 3
+        urls = [scheduler.next_request().url for _ in range(3)]
+        assert urls[0] == "https://www.zoomit.ir/2/"
+        assert sorted(urls[1:]) == [
+            "https://www.zoomit.ir/1/",
+            "https://www.zoomit.ir/3/",
+        ]
+        assert scheduler.next_request() is None
+
+    def test_requests_keep_callbacks_and_meta(self):
+        scheduler, spider = open_scheduler()
+        scheduler.enqueue_request(
+            article(1, callback=spider.parse_news_page, meta={"page_type": "article"})
+        )
+
+        request = scheduler.next_request()
+
+        assert request.callback == spider.parse_news_page
+        assert request.meta["page_type"] == "article"
+
+    def test_requests_are_queued_as_json(self):
+        scheduler, _ = open_scheduler()
+        scheduler.enqueue_request(
+            article(1, method="POST", body=b"\xff", headers={"Referer": "x"})
+        )
+
+        (member,) = scheduler.client.zrangebyscore(scheduler.queue_key, "-inf", "+inf")
+        assert json.loads(member)["request"]["url"] == "https://www.zoomit.ir/1/"
+        request = scheduler.next_request()
+        assert request.method == "POST"
+        assert request.body == b"\xff"
+        assert request.headers["Referer"] == b"x"
+
+    def test_processes_share_the_frontier(self):
+        first, _ = open_scheduler()
+        second, _ = open_scheduler()
+
+        assert first.enqueue_request(article(1))
+        assert not second.enqueue_request(article(1))
+        assert second.enqueue_request(article(1, dont_filter=True))
+        assert second.enqueue_request(article(2))
+
+        taken = [first.next_request(), second.next_request(), first.next_request()]
+        assert sorted(request.url for request in taken) == [
+            "https://www.zoomit.ir/1/",
+            "https://www.zoomit.ir/1/",
+            "https://www.zoomit.ir/2/",
+        ]
+        assert first.next_request() is None
+
+    def test_crawls_of_other_jobs_have_their_own_frontier(self):
+        first, _ = open_scheduler(job="discover-1")
+        second, _ = open_scheduler(job="render-1")
+        # Without a job, a crawl gets a frontier of its own.
+        third, third_spider = open_scheduler(job=None)
+
+        for scheduler in (first, second, third):
+            assert scheduler.enqueue_request(article(1))
+        assert first.next_request().url == "https://www.zoomit.ir/1/"
+        assert first.next_request() is None
+        assert len(second) == len(third) == 1
+        assert third.queue_key == f"scrapy:zoomit:{third_spider.job}:requests"
+
+    def test_dequeued_requests_move_to_inflight_at_once(self):
+        scheduler, _ = open_scheduler(SCHEDULER_VISIBILITY_TIMEOUT=60)
+        scheduler.enqueue_request(article(1))
+
+        before = time.time()
+        request = scheduler.next_request()
+
+        member = request.meta[MEMBER_META_KEY]
+        assert scheduler.client.zscore(scheduler.queue_key, member) is None
+        deadline = scheduler.client.zscore(scheduler.inflight_key, member)
+        assert before + 60 <= deadline <= time.time() + 60
+
+    def test_inflight_requests_keep_the_crawl_pending(self):
+        scheduler, spider = open_scheduler()
+        scheduler.enqueue_request(article(1))
+
+        request = scheduler.next_request()
+        assert scheduler.has_pending_requests()
+
+        scheduler.request_done(request, spider)
+        assert not scheduler.has_pending_requests()
+
+    def test_requests_of_a_dead_process_are_requeued(self):
+        dead, _ = open_scheduler(SCHEDULER_VISIBILITY_TIMEOUT=0)
+        dead.enqueue_request(article(1))
+        assert dead.next_request() is not None
+        # The process dies before the request leaves its downloader.
+
+        alive, _ = open_scheduler()
+        request = alive.next_request()
+
+        assert request.url == "https://www.zoomit.ir/1/"
+        assert alive.stats.get_value("scheduler/requeued/redis") == 1
+
+    def test_close_clears_a_finished_frontier(self):
+        scheduler, spider = open_scheduler()
+        scheduler.enqueue_request(article(1))
+        scheduler.request_done(scheduler.next_request(), spider)
+
+        scheduler.close("finished")
+
+        assert scheduler.enqueue_request(article(1))
+
+    def test_close_keeps_a_persisted_frontier(self):
+        scheduler, _ = open_scheduler(SCHEDULER_PERSIST=True)
+        scheduler.enqueue_request(article(1))
+        scheduler.close("shutdown")
+
+        resumed, _ = open_scheduler(SCHEDULER_PERSIST=True)
+        assert not resumed.enqueue_request(article(1))
+        assert resumed.next_request().url == "https://www.zoomit.ir/1/"
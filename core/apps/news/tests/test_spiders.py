@@ -0,0 +1,91 @@
+import pytest
+from asgiref.sync import async_to_sync
+from scraper.spiders.zoomit import ZoomitSpider
+from scrapy.http import HtmlResponse
+from scrapy.utils.reactor import install_reactor
+from scrapy.utils.test import get_crawler
+
+from .factories import NewsFactory
+
+
+@pytest.fixture(scope="module", autouse=True)
+def reactor():
+    # Crawlers are configured for the reactor the spiders run on.
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+
+def article(number):
+    return f"https://www.zoomit.ir/{number}/"
+
+
+def archive_page(page, *numbers):
+    links = "".join(
+        f'<a class="fNLyDV" href="/{number}/">{number}</a>' for number in numbers
+    )
+    return HtmlResponse(
+        ZoomitSpider.archive_url.format(page=page),
+        body=f"<html><body>{links}</body></html>",
+        encoding="utf-8",
+    )
+
+
+def open_spider(**kwargs):
+    crawler = get_crawler(ZoomitSpider)
+    spider = ZoomitSpider.from_crawler(crawler, **kwargs)
+    crawler.spider = spider
+    crawler.stats.open_spider(spider)
+    return spider
+
+
+def parse(spider, response):
+    # async_to_sync runs the ORM queries on this thread, inside the test's
+    # transaction.
+    @async_to_sync
+    async def collect():
+        return [request async for request in spider.parse(response)]
+
+    return collect()
+
+
+@pytest.mark.django_db
+class TestZoomitSpiderArchive:
+    def test_stored_articles_are_skipped(self):
+        NewsFactory(source=article(2))
+        spider = open_spider()
+
+        requests = parse(spider, archive_page(1, 3, 2, 1))
+
+        assert [request.url for request in requests] == [
+            article(1),
+            article(3),
+            ZoomitSpider.archive_url.format(page=2),
+        ]
+        assert spider.crawler.stats.get_value("zoomit/articles_known") == 1
+
+    def test_pagination_stops_on_a_page_of_known_articles(self):
+        NewsFactory(source=article(1))
+        NewsFactory(source=article(2))
+        spider = open_spider()
+
+        assert parse(spider, archive_page(3, 2, 1)) == []
+        assert spider.state["page"] == 3
+        assert spider.state["paginated"]
+
+    def test_non_incremental_crawls_render_every_article(self):
+        NewsFactory(source=article(1))
+        spider = open_spider(incremental="0")
+
+        requests = parse(spider, archive_page(1, 1))
+
+        assert [request.url for request in requests] == [
+            article(1),
+            ZoomitSpider.archive_url.format(page=2),
+        ]
+
+    def test_the_last_page_ends_the_pagination(self):
+        spider = open_spider()
+
+        requests = parse(spider, archive_page(spider.last_page, 1))
+
+        assert [request.url for request in requests] == [article(1)]
+        assert spider.state["paginated"]
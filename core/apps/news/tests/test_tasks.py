@@ -0,0 +1,357 @@
+import json
+import threading
+import time
+from io import StringIO
+
+import pytest
+from config.celery import app
+from django.conf import settings
+from django.core.management import CommandError, call_command
+
+from .. import crawls, tasks
+from ..management.commands import scrape_single, scrape_zoomit
+
+
+@pytest.fixture(autouse=True)
+def crawl_redis(settings):
+    settings.CRAWL_REDIS_URL = "memory://tests"
+
+
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setattr(app.conf, "task_always_eager", True)
+    monkeypatch.setattr(app.conf, "task_eager_propagates", True)
+    # Chords store their results: keep them in memory rather than in the
+    # CELERY_RESULT_BACKEND (which Celery reads from the environment first),
+    # and drop the backend the app already created.
+    monkeypatch.setenv("CELERY_RESULT_BACKEND", "cache+memory://")
+    monkeypatch.setattr(app.conf, "result_backend", "cache+memory://")
+    monkeypatch.setattr(app, "_backend_cache", None)
+    monkeypatch.setattr(app, "_local", threading.local())
+
+
+@pytest.fixture
+def crawls_run(monkeypatch):
+    """Fake crawl process: archive page N lists articles N-1 and N."""
+    calls = []
+
+    def crawl(spider, timeout=None, **kwargs):
+        # A crawl without a timeout could block the worker forever.
+        assert timeout == settings.CRAWL_TIMEOUT
+        calls.append(kwargs)
+        if kwargs.get("discover"):
+            page = kwargs["pages"][0]
+            discovered = [f"https://www.zoomit.ir/{n}/" for n in (page - 1, page)]
+            return {
+                "finish_reason": "finished",
+                "requests": 1,
+                "discovered": discovered,
+            }
+
+        outcomes = {url: "created" for url in kwargs.get("urls", [])}
+        # The first article never renders.
+        outcomes.pop("https://www.zoomit.ir/0/", None)
+        return {
+            "finish_reason": "finished",
+            "requests": len(kwargs.get("urls", [])),
+            "items_scraped": len(outcomes),
+            "items_created": len(outcomes),
+            "outcomes": outcomes,
+        }
+
+    monkeypatch.setattr(tasks, "crawl", crawl)
+    return calls
+
+
+class TestClaims:
+    def test_claims_are_exclusive(self):
+        assert crawls.claim_sources("a", ["1", "2"]) == ["1", "2"]
+        assert crawls.claim_sources("b", ["2", "3"]) == ["3"]
+
+    def test_only_owned_claims_are_released(self):
+        crawls.claim_sources("a", ["1"])
+        crawls.claim_sources("b", ["2"])
+
+        assert crawls.release_sources("a", ["1", "2"]) == 1
+        assert crawls.claim_sources("c", ["1", "2"]) == ["1"]
+
+    def test_batches_are_capped(self):
+        urls = [str(n) for n in range(25)]
+
+        assert [len(b) for b in crawls.batches(urls, 10, 16)] == [10, 10, 5]
+        assert [len(b) for b in crawls.batches(urls, 2, 4)] == [7, 7, 7, 4]
+        assert crawls.batches([], 10, 16) == []
+
+
+class TestScrapeZoomitFanout:
+    def test_single_mode(self, settings, crawls_run):
+        settings.ZOOMIT_CRAWL_MODE = "single"
+
+        summary = tasks.scrape_zoomit.apply().get()
+
+        assert crawls_run == [{}]
+        assert summary["finish_reason"] == "finished"
+
+    def test_fanout(self, settings, eager, crawls_run):
+        settings.ZOOMIT_CRAWL_MODE = "fanout"
+        settings.ZOOMIT_ARCHIVE_PAGES = 3
+        settings.ZOOMIT_FANOUT_BATCH_SIZE = 2
+
+        summary = tasks.scrape_zoomit.apply().get()
+
+        discoveries = [call for call in crawls_run if call.get("discover")]
+        renders = [call["urls"] for call in crawls_run if "urls" in call]
+        assert [call["pages"] for call in discoveries] == [[1], [2], [3]]
+        # Articles listed on two pages are rendered once.
+        assert sorted(url for batch in renders for url in batch) == [
+            f"https://www.zoomit.ir/{n}/" for n in range(4)
+        ]
+        assert [len(batch) for batch in renders] == [2, 2]
+
+        assert summary["pages"] == 3
+        assert summary["discovered"] == 4
+        assert summary["claimed"] == 4
+        assert summary["items_created"] == 3
+        assert summary["requests"] == 3 + 4
+        assert summary["runs"] == 5
+
+        # The failed article was released, the others stay claimed.
+        assert crawls.claim_sources(
+            "next", [f"https://www.zoomit.ir/{n}/" for n in range(4)]
+        ) == ["https://www.zoomit.ir/0/"]
+
+    def test_discovery_stops_at_a_page_without_new_articles(
+        self, settings, eager, crawls_run, monkeypatch
+    ):
+        settings.ZOOMIT_CRAWL_MODE = "fanout"
+        settings.ZOOMIT_ARCHIVE_PAGES = 5
+        fake_crawl = tasks.crawl
+
+        def crawl(spider, **kwargs):
+            summary = fake_crawl(spider, **kwargs)
+            if kwargs.get("pages") == [2]:
+                # Every article listed on page 2 is stored already.
+                summary["discovered"] = []
+            return summary
+
+        monkeypatch.setattr(tasks, "crawl", crawl)
+
+        summary = tasks.scrape_zoomit.apply().get()
+
+        discoveries = [call["pages"] for call in crawls_run if call.get("discover")]
+        assert discoveries == [[1], [2]]
+        assert summary["pages"] == 2
+        assert summary["discovered"] == 2
+
+    def test_crawl_errors_end_in_the_summary(self, settings, eager, monkeypatch):
+        settings.ZOOMIT_CRAWL_MODE = "fanout"
+        settings.ZOOMIT_ARCHIVE_PAGES = 2
+
+        def crawl(spider, **kwargs):
+            raise tasks.CrawlError("zoomit crawl timed out after 10s")
+
+        monkeypatch.setattr(tasks, "crawl", crawl)
+
+        summary = tasks.scrape_zoomit.apply().get()
+
+        assert summary["finish_reason"] == "partial"
+        assert summary["errors_detail"] == ["zoomit crawl timed out after 10s"] * 2
+        assert summary["claimed"] == 0
+
+
+class TestCrawlLease:
+    def test_lease_is_exclusive(self):
+        first = crawls.CrawlLease("zoomit", "first", ttl=60)
+        second = crawls.CrawlLease("zoomit", "second", ttl=60)
+
+        assert first.acquire(stage="starting")
+        assert not second.acquire()
+
+        first.release()
+        assert second.acquire()
+
+    def test_heartbeat_merges_state(self):
+        lease = crawls.CrawlLease("zoomit", "first", ttl=60)
+        lease.acquire(stage="starting")
+
+        assert lease.heartbeat(stage="rendering", claimed=12)
+
+        state = crawls.CrawlLease.state("zoomit")
+        assert state["owner"] == "first"
+        assert state["stage"] == "rendering"
+        assert state["claimed"] == 12
+        assert state["heartbeat_at"] >= state["started_at"]
+        assert 0 < state["ttl"] <= 60
+        assert state["pending"] is False
+
+    def test_expired_lease_is_lost(self):
+        lease = crawls.CrawlLease("zoomit", "first", ttl=0.05)
+        lease.acquire()
+        time.sleep(0.1)
+
+        assert crawls.CrawlLease.state("zoomit") is None
+        assert not lease.heartbeat()
+        assert crawls.CrawlLease("zoomit", "second").acquire()
+
+    def test_keep_alive(self):
+        lease = crawls.CrawlLease("zoomit", "first", ttl=0.3)
+        lease.acquire()
+
+        with lease.keep_alive(interval=0.05, stage="crawling"):
+            time.sleep(0.5)
+            assert crawls.CrawlLease.state("zoomit")["stage"] == "crawling"
+
+    def test_a_hung_crawl_lets_the_lease_expire(self):
+        lease = crawls.CrawlLease("zoomit", "first", ttl=0.3)
+        lease.acquire()
+
+        with lease.keep_alive(interval=0.05, limit=0.2):
+            time.sleep(0.3)
+            assert crawls.CrawlLease.state("zoomit") is not None
+            # Stuck past the limit: the heartbeats stop and the lease expires.
+            time.sleep(0.4)
+            assert crawls.CrawlLease.state("zoomit") is None
+            assert crawls.CrawlLease("zoomit", "second").acquire()
+
+    def test_release_reports_requested_runs(self):
+        lease = crawls.CrawlLease("zoomit", "first", ttl=60)
+        lease.acquire()
+        crawls.CrawlLease.request_run("zoomit")
+
+        assert crawls.CrawlLease.state("zoomit")["pending"] is True
+        assert lease.release() is True
+        assert crawls.CrawlLease.state("zoomit") is None
+
+
+class TestScrapeZoomitOverlap:
+    @pytest.fixture
+    def running(self):
+        lease = crawls.CrawlLease("zoomit", "running", ttl=60)
+        lease.acquire(stage="rendering")
+        return lease
+
+    def test_overlapping_run_is_skipped(self, settings, running, crawls_run):
+        settings.CRAWL_OVERLAP_POLICY = "skip"
+
+        summary = tasks.scrape_zoomit.apply().get()
+
+        assert summary["finish_reason"] == "skipped"
+        assert summary["running"]["owner"] == "running"
+        assert crawls_run == []
+        assert running.release() is False
+
+    def test_overlapping_runs_are_coalesced(
+        self, settings, running, crawls_run, monkeypatch
+    ):
+        settings.CRAWL_OVERLAP_POLICY = "coalesce"
+        settings.ZOOMIT_CRAWL_MODE = "single"
+        delayed = []
+        monkeypatch.setattr(tasks.scrape_zoomit, "delay", lambda: delayed.append(1))
+
+        for _ in range(3):
+            summary = tasks.scrape_zoomit.apply().get()
+            assert summary["finish_reason"] == "coalesced"
+
+        # The running crawl ends: one follow-up run for all three.
+        tasks.finish_crawl(running)
+        assert delayed == [1]
+
+        tasks.scrape_zoomit.apply().get()
+        assert crawls_run == [{}]
+        assert crawls.CrawlLease.state("zoomit") is None
+        assert delayed == [1]
+
+    def test_fanout_releases_the_lease(self, settings, eager, crawls_run):
+        settings.ZOOMIT_CRAWL_MODE = "fanout"
+        settings.ZOOMIT_ARCHIVE_PAGES = 2
+
+        tasks.scrape_zoomit.apply().get()
+
+        assert crawls.CrawlLease.state("zoomit") is None
+        assert tasks.scrape_zoomit.apply().get()["finish_reason"] == "finished"
+
+    @pytest.mark.parametrize("stage", ["discover", "render"])
+    def test_a_dead_subtask_releases_the_crawl(
+        self, settings, eager, crawls_run, monkeypatch, stage
+    ):
+        settings.ZOOMIT_CRAWL_MODE = "fanout"
+        settings.ZOOMIT_ARCHIVE_PAGES = 2
+        settings.CRAWL_OVERLAP_POLICY = "coalesce"
+        fake_crawl = tasks.crawl
+
+        def crawl(spider, **kwargs):
+            if bool(kwargs.get("discover")) == (stage == "discover"):
+                # Not a CrawlError: nothing reports it in the summary.
+                raise ConnectionError("Connection to the broker lost")
+            return fake_crawl(spider, **kwargs)
+
+        monkeypatch.setattr(tasks, "crawl", crawl)
+        delayed = []
+        monkeypatch.setattr(tasks.scrape_zoomit, "delay", lambda: delayed.append(1))
+        crawls.CrawlLease.request_run("zoomit")
+        # Errbacks only run for errors that aren't propagated.
+        monkeypatch.setattr(app.conf, "task_eager_propagates", False)
+
+        with pytest.raises(ConnectionError):
+            tasks.scrape_zoomit.apply().get()
+
+        assert crawls.CrawlLease.state("zoomit") is None
+        urls = [f"https://www.zoomit.ir/{n}/" for n in range(3)]
+        assert crawls.claim_sources("next", urls) == urls
+        # The run coalesced into the dead crawl starts.
+        assert delayed == [1]
+
+
+class TestScrapeCommands:
+    @pytest.fixture
+    def commands_crawl(self, monkeypatch):
+        calls = []
+
+        def crawl(spider, timeout=None, **kwargs):
+            calls.append(crawls.CrawlLease.state("zoomit"))
+            return {"finish_reason": "finished"}
+
+        monkeypatch.setattr(scrape_zoomit, "crawl", crawl)
+        monkeypatch.setattr(scrape_single, "crawl", crawl)
+        return calls
+
+    @pytest.mark.parametrize(
+        "args", [["scrape_zoomit"], ["scrape_single", "https://www.zoomit.ir/1/"]]
+    )
+    def test_commands_hold_the_lease(self, commands_crawl, args):
+        call_command(*args, stdout=StringIO())
+
+        assert commands_crawl[0]["command"] == args[0]
+        assert crawls.CrawlLease.state("zoomit") is None
+
+    @pytest.mark.parametrize(
+        "args", [["scrape_zoomit"], ["scrape_single", "https://www.zoomit.ir/1/"]]
+    )
+    def test_commands_refuse_to_overlap_a_crawl(self, commands_crawl, args):
+        running = crawls.CrawlLease("zoomit", "running", ttl=60)
+        running.acquire(stage="rendering")
+
+        with pytest.raises(CommandError, match="running"):
+            call_command(*args, stdout=StringIO())
+
+        assert commands_crawl == []
+        assert crawls.CrawlLease.state("zoomit")["owner"] == "running"
+
+
+class TestCrawlStatusCommand:
+    def test_no_crawl(self):
+        out = StringIO()
+        call_command("crawl_status", stdout=out)
+        assert out.getvalue() == "No zoomit crawl running\n"
+
+    def test_running_crawl(self):
+        crawls.CrawlLease("zoomit", "abc", ttl=60).acquire(stage="rendering")
+
+        out = StringIO()
+        call_command("crawl_status", stdout=out)
+        assert "owner: abc" in out.getvalue()
+        assert "stage: rendering" in out.getvalue()
+
+        out = StringIO()
+        call_command("crawl_status", json=True, stdout=out)
+        assert json.loads(out.getvalue())["owner"] == "abc"
@@ -1,9 +1,11 @@
+import json
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APIRequestFactory
 
-from ..models import News
+from ..models import News, Tags
 from ..serializers import (
     NewsCreateInputSerializer,
     NewsDetailsInputSerializer,
@@ -37,6 +39,15 @@ class TestTagsApi:
             assert result.get("id") == str(tag.id)
             assert result.get("title") == tag.title
 
+    @pytest.mark.parametrize("batch_size", [1, 5, 20])
+    def test_tags_api_get_num_queries(self, batch_size, django_assert_num_queries):
+        TagsFactory.create_batch(batch_size)
+
+        # count + page
+        with django_assert_num_queries(2):
+            response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
     def test_tags_api_get_empty(self):
         response = self.client.get(self.url)
 
@@ -232,9 +243,24 @@ class TestNewsApi:
             assert data.get("source") == news_instance.source
             assert data.get("tags") == [
                 {"id": str(tag["id"]), "title": tag["title"]}
-                for tag in news_instance.tags.values("id", "title")
+                for tag in news_instance.tags.order_by("created_at", "id").values(
+                    "id", "title"
+                )
             ]
 
+    @pytest.mark.parametrize("batch_size", [1, 5, 20])
+    def test_news_api_get_num_queries(self, batch_size, django_assert_num_queries):
+        NewsFactory.create_batch(batch_size)
+
+        # freshness + count + page + one tag lookup for the whole page
+        with django_assert_num_queries(4) as captured:
+            response = self.client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert not any(
+            '"news_news"."content"' in query["sql"]
+            for query in captured.captured_queries
+        )
+
     def test_news_api_get_empty(self):
         response = self.client.get(self.url)
 
@@ -341,7 +367,7 @@ class TestNewsDetailsApi:
         assert response.data.get("is_public") == news.is_public
         assert response.data.get("tags") == [
             {"id": str(tag["id"]), "title": tag["title"]}
-            for tag in news.tags.values("id", "title")
+            for tag in news.tags.order_by("created_at", "id").values("id", "title")
         ]
         assert (
             response.data.get("estimated_reading_time") == news.estimated_reading_time
@@ -349,6 +375,15 @@ class TestNewsDetailsApi:
         assert response.data.get("created_at")
         assert response.data.get("updated_at")
 
+    def test_news_details_get_num_queries(self, django_assert_num_queries):
+        news = NewsFactory()
+        url = reverse(self.url_name, args=[news.pk])
+
+        # freshness + row + tags
+        with django_assert_num_queries(3):
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
     def test_news_details_get_not_found(self):
         news = NewsFactory()
         pk = news.pk
@@ -503,3 +538,102 @@ class TestNewsDetailsApi:
 
         response = self.client.post(url)
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+@pytest.mark.django_db
+class TestNewsBulkApi:
+    client = APIClient()
+    url = reverse("news-bulk")
+
+    def item(self, number, tags=("Tech",)):
+        return {
+            "title": f"title {number}",
+            "content": f"content number {number}",
+            "source": f"https://example.com/{number}",
+            "tags": list(tags),
+        }
+
+    def test_news_bulk_create(self):
+        existing_tag = TagsFactory(title="Tech")
+        items = [self.item(i, tags=("Tech", "New")) for i in range(3)]
+
+        response = self.client.post(self.url, data=items, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["created"] == 3
+        assert response.data["failed"] == 0
+        assert Tags.objects.count() == 2
+
+        news = News.objects.get(source=items[0]["source"])
+        assert set(news.tags.values_list("title", flat=True)) == {"Tech", "New"}
+        assert news.tags.filter(pk=existing_tag.pk).exists()
+        assert news.tags_count == 2
+        assert news.content_word_count == 3
+        assert response.data["results"][0]["id"] == str(news.pk)
+
+    def test_news_bulk_upsert(self):
+        news = NewsFactory()
+        item = self.item(1, tags=("Replaced",))
+        item["source"] = news.source
+
+        response = self.client.post(self.url, data=[item], format="json")
+
+        assert response.data["updated"] == 1
+        news.refresh_from_db()
+        assert news.title == item["title"]
+        assert list(news.tags.values_list("title", flat=True)) == ["Replaced"]
+        assert News.objects.count() == 1
+
+        response = self.client.post(self.url, data=[item], format="json")
+
+        assert response.data["unchanged"] == 1
+        assert response.data["results"][0]["status"] == "unchanged"
+
+    def test_news_bulk_item_errors(self):
+        items = [
+            self.item(1),
+            {"title": "missing fields"},
+            {**self.item(2), "id": 1},
+            "not an object",
+            self.item(1),
+        ]
+
+        response = self.client.post(self.url, data=items, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 4
+        statuses = [result["status"] for result in response.data["results"]]
+        assert statuses == ["error", "error", "error", "error", "created"]
+        assert News.objects.count() == 1
+
+    def test_news_bulk_ndjson(self):
+        body = "\n".join(json.dumps(self.item(i)) for i in range(4)) + "\n"
+
+        response = self.client.post(
+            self.url, data=body, content_type="application/x-ndjson"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["created"] == 4
+
+    def test_news_bulk_invalid_payload(self):
+        response = self.client.post(self.url, data={"title": "x"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.client.post(
+            self.url, data="{not json}\n", content_type="application/x-ndjson"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_news_bulk_num_queries(self, django_assert_max_num_queries):
+        self.client.post(self.url, data=[self.item(0)], format="json")
+        small = [self.item(i, tags=(f"tag {i}",)) for i in range(2)]
+        large = [self.item(i, tags=(f"tag {i}", "Tech")) for i in range(2, 40)]
+
+        with django_assert_max_num_queries(20) as captured:
+            self.client.post(self.url, data=small, format="json")
+        small_queries = len(captured.captured_queries)
+
+        with django_assert_max_num_queries(small_queries):
+            self.client.post(self.url, data=large, format="json")
@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from .views import NewsApi, NewsDetailsApi, TagsApi, TagsDetailsApi
+from .views import NewsApi, NewsBulkApi, NewsDetailsApi, TagsApi, TagsDetailsApi
 
 urlpatterns = [
     path(
@@ -17,6 +17,7 @@ urlpatterns = [
         include(
             [
                 path("", NewsApi.as_view(), name="news-create-get"),
+                path("bulk/", NewsBulkApi.as_view(), name="news-bulk"),
                 path("<uuid:pk>/", NewsDetailsApi.as_view(), name="news-details"),
             ]
         ),
@@ -1,15 +1,23 @@
+from django.conf import settings
 from django.db import IntegrityError
+from django.db.models import Count, Max, Prefetch, prefetch_related_objects
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import GenericAPIView
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 
+from . import cache
 from .filters import NewsFilter
+from .ingest import bulk_upsert_news
 from .models import News, Tags
+from .pagination import PaginationModeMixin
+from .parsers import NDJSONParser
 from .serializers import (
+    NewsBulkOutputSerializer,
     NewsCreateInputSerializer,
     NewsDetailsInputSerializer,
     NewsDetailsOutputSerializer,
@@ -19,12 +27,50 @@ from .serializers import (
     TagOutputSerializer,
 )
 
+LIST_PARAMS = ("tags_title", "keywords", "excludes")
+
+
+def news_freshness(queryset, *parts):
+    """
+    ETag and Last-Modified of the news of ``queryset``, from one aggregate:
+    how many there are, how many tags they embed and when either last
+    changed. Tags are counted too, as a tag deleted or removed from a news
+    doesn't move any updated_at.
+    """
+    state = queryset.order_by().aggregate(
+        count=Count("pk", distinct=True),
+        news_modified=Max("updated_at"),
+        tag_links=Count("tags"),
+        tags_modified=Max("tags__updated_at"),
+    )
+    last_modified = max(
+        filter(None, (state["news_modified"], state["tags_modified"])), default=None
+    )
+    etag = cache.make_etag(
+        state["count"],
+        state["news_modified"],
+        state["tag_links"],
+        state["tags_modified"],
+        *parts,
+    )
+    return etag, last_modified
+
+
+def tags_prefetch():
+    # One tag lookup per page, limited to what TagOutputSerializer emits, in
+    # a stable order: the oldest tag first.
+    return Prefetch(
+        "tags",
+        queryset=Tags.objects.only("id", "title").order_by("created_at", "id"),
+    )
 
-class TagsApi(GenericAPIView):
+
+class TagsApi(PaginationModeMixin, GenericAPIView):
     serializer_class = TagOutputSerializer
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
-        return Tags.objects.all()
+        return Tags.objects.only("id", "title")
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -60,6 +106,7 @@ class TagsApi(GenericAPIView):
             raise ValidationError("tag item already exist.")
 
     @swagger_auto_schema(responses={200: TagOutputSerializer})
+    @cache.cached_response(cache.TAGS)
     def get(self, request):
         tags = self.get_queryset()
         paginate_tags = self.paginate_queryset(tags)
@@ -84,6 +131,7 @@ class TagsDetailsApi(GenericAPIView):
         return serializer_class(*args, **kwargs)
 
     @swagger_auto_schema(responses={200: TagDetailsOutputSerializer})
+    @cache.cached_response(cache.TAGS)
     def get(self, request, pk):
         try:
             tag = Tags.objects.get(pk=pk)
@@ -129,14 +177,26 @@ class TagsDetailsApi(GenericAPIView):
             raise NotFound(detail="tag item not found")
 
 
-class NewsApi(GenericAPIView):
+class NewsApi(PaginationModeMixin, GenericAPIView):
     serializer_class = NewsOutputSerializer
+    cursor_ordering = ("-updated_at", "-created_at", "-id")
 
     filter_backends = [DjangoFilterBackend]
     filterset_class = NewsFilter
 
     def get_queryset(self):
-        return News.objects.all()
+        return News.objects.only("id", "title", "source", "is_public").prefetch_related(
+            tags_prefetch()
+        )
+
+    def get_freshness(self, request):
+        # Through a subquery: the tags filter's join would otherwise restrict
+        # the aggregate to the matching tags.
+        filtered = self.filter_queryset(News.objects.all()).values("pk")
+        return news_freshness(
+            News.objects.filter(pk__in=filtered),
+            cache.normalize_params(request.query_params, LIST_PARAMS),
+        )
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -182,6 +242,7 @@ class NewsApi(GenericAPIView):
             except Tags.DoesNotExist:
                 raise NotFound(detail=f"{tag} tag item not exists.")
 
+        prefetch_related_objects([news], tags_prefetch())
         return Response(
             NewsOutputSerializer(news, context={"request": request}).data,
             status=status.HTTP_201_CREATED,
@@ -208,8 +269,29 @@ class NewsApi(GenericAPIView):
                 type=openapi.TYPE_STRING,
                 description="Comma-separated keyword exclude for title and content",
             ),
+            openapi.Parameter(
+                name="pagination",
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                enum=["page", "cursor"],
+                description="Use 'cursor' for keyset pagination without a count",
+            ),
+            openapi.Parameter(
+                name="cursor",
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                description="Cursor returned in the 'next'/'previous' links",
+            ),
+            openapi.Parameter(
+                name="page_size",
+                in_=openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                description="Number of results per page (max 100)",
+            ),
         ],
     )
+    @cache.conditional_response(lambda view, request: view.get_freshness(request))
+    @cache.cached_response(cache.NEWS, list_params=LIST_PARAMS)
     def get(self, request):
         queryset = self.filter_queryset(self.get_queryset())
         paginate_news = self.paginate_queryset(queryset)
@@ -217,12 +299,105 @@ class NewsApi(GenericAPIView):
         return self.get_paginated_response(serializer.data)
 
 
+class NewsBulkApi(GenericAPIView):
+    serializer_class = NewsCreateInputSerializer
+    parser_classes = [JSONParser, NDJSONParser]
+
+    allowed_keys = {"title", "content", "source", "is_public", "tags"}
+
+    def get_serializer(self, *args, **kwargs):
+        return self.serializer_class(*args, **kwargs)
+
+    def validate_item(self, item):
+        if not isinstance(item, dict):
+            return None, {"non_field_errors": ["Expected a news object."]}
+
+        unexpected_keys = set(item.keys()) - self.allowed_keys
+        if unexpected_keys:
+            return None, {
+                "non_field_errors": [
+                    f"Invalid input: only {self.allowed_keys} is allowed."
+                ]
+            }
+
+        serializer = self.get_serializer(data=item)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        return serializer.validated_data, None
+
+    @swagger_auto_schema(
+        request_body=NewsCreateInputSerializer(many=True),
+        responses={200: NewsBulkOutputSerializer},
+    )
+    def post(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError("Expected a list of news items.")
+
+        if len(request.data) > settings.NEWS_BULK_MAX_ITEMS:
+            raise ValidationError(
+                f"At most {settings.NEWS_BULK_MAX_ITEMS} items are allowed per request."
+            )
+
+        results = [None] * len(request.data)
+        valid = {}
+        for index, item in enumerate(request.data):
+            data, errors = self.validate_item(item)
+            if errors:
+                results[index] = {"index": index, "status": "error", "errors": errors}
+                continue
+
+            # The last occurrence of a source wins.
+            previous = valid.pop(data["source"], None)
+            if previous is not None:
+                results[previous[0]] = {
+                    "index": previous[0],
+                    "status": "error",
+                    "errors": {"source": [f"Duplicated by item {index}."]},
+                }
+            valid[data["source"]] = (index, data)
+
+        saved = bulk_upsert_news([data for _, data in valid.values()])
+
+        for source, (index, _) in valid.items():
+            pk, item_status = saved[source]
+            results[index] = {"index": index, "status": item_status, "id": pk}
+
+        statuses = [result["status"] for result in results]
+        return Response(
+            NewsBulkOutputSerializer(
+                {
+                    "created": statuses.count("created"),
+                    "updated": statuses.count("updated"),
+                    "unchanged": statuses.count("unchanged"),
+                    "failed": statuses.count("error"),
+                    "results": results,
+                }
+            ).data,
+            status=status.HTTP_200_OK,
+        )
+
+
 class NewsDetailsApi(GenericAPIView):
     serializer_class = NewsDetailsOutputSerializer
     lookup_field = "pk"
 
     def get_queryset(self):
-        return News.objects.all()
+        return News.objects.only(
+            "id",
+            "title",
+            "content",
+            "source",
+            "is_public",
+            "estimated_reading_time",
+            "created_at",
+            "updated_at",
+        ).prefetch_related(tags_prefetch())
+
+    def get_freshness(self, request, pk):
+        etag, last_modified = news_freshness(News.objects.filter(pk=pk), pk)
+        if last_modified is None:
+            return None, None
+        return etag, last_modified
 
     def get_serializer_class(self):
         if self.request.method == "PUT":
@@ -235,9 +410,13 @@ class NewsDetailsApi(GenericAPIView):
         return serializer_class(*args, **kwargs)
 
     @swagger_auto_schema(responses={200: NewsDetailsOutputSerializer})
+    @cache.conditional_response(
+        lambda view, request, pk: view.get_freshness(request, pk)
+    )
+    @cache.cached_response(cache.NEWS)
     def get(self, request, pk):
         try:
-            news = News.objects.get(pk=pk)
+            news = self.get_queryset().get(pk=pk)
             serializer = self.get_serializer(news)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Tags.DoesNotExist:
@@ -291,6 +470,7 @@ class NewsDetailsApi(GenericAPIView):
 
             news.save()
 
+            prefetch_related_objects([news], tags_prefetch())
             return Response(
                 NewsOutputSerializer(news, context={"request": request}).data,
                 status=status.HTTP_204_NO_CONTENT,
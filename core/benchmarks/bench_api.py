@@ -0,0 +1,359 @@
+"""
+Load and latency benchmark of the news and tags API.
+
+    python -m benchmarks.bench_api [--news 100000] [--tags 5000]
+        [--requests 200] [--concurrency 1] [--with-cache] [--keepdb]
+        [--json results.json] [--compare previous.json]
+
+Seeds a test database with a synthetic corpus built from the test
+factories: Persian and English articles with a realistic spread of lengths,
+and tags following a long-tailed (Zipf-like) popularity. With --keepdb the
+corpus is kept and reused by the next run of the same size.
+
+Then drives the list (page and cursor), filter, detail and tag endpoints
+through the Django test client and reports p50/p95/p99 latency, queries per
+request and throughput per scenario. Response caching is disabled unless
+--with-cache is given, so the numbers reflect the database work. A scenario
+answered with anything but 200 measured an error page: the run fails.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+from .utils import percentile, setup_django, test_database
+
+SEED = 20240601
+# Words per article: most news are short, a few are long-form reviews.
+CONTENT_WORDS = [(0.55, 150, 400), (0.35, 400, 900), (0.10, 900, 3000)]
+
+
+class CorpusBuilder:
+    def __init__(self, news, tags, seed=SEED):
+        from faker import Faker
+
+        self.news = news
+        self.tags = tags
+        self.random = random.Random(seed)
+        self.fakers = {"fa": Faker("fa_IR"), "en": Faker("en_US")}
+        for index, faker in enumerate(self.fakers.values()):
+            faker.seed_instance(seed + index)
+        # Composing articles from a sentence pool is much faster than asking
+        # Faker for 100k long texts, and keeps the vocabulary realistic.
+        self.sentences = {
+            language: [faker.sentence(nb_words=12) for _ in range(3000)]
+            for language, faker in self.fakers.items()
+        }
+
+    def tag_titles(self):
+        from apps.news.tests.factories import TagsFactory
+
+        titles = []
+        for index in range(self.tags):
+            title = TagsFactory.build().title.rstrip(".")
+            titles.append(f"{title[:240]} {index}")
+        return titles
+
+    def content(self, language):
+        roll = self.random.random()
+        for share, low, high in CONTENT_WORDS:
+            if roll < share:
+                break
+            roll -= share
+        words = self.random.randint(low, high)
+        sentences = self.sentences[language]
+        return " ".join(self.random.choices(sentences, k=max(1, words // 12)))
+
+    def items(self, tag_titles):
+        from apps.news.tests.factories import NewsFactory
+
+        weights = [1 / rank**1.1 for rank in range(1, len(tag_titles) + 1)]
+        for _ in range(self.news):
+            news = NewsFactory.build(title="", content="")
+            language = "fa" if self.random.random() < 0.7 else "en"
+            title = self.fakers[language].sentence(nb_words=8)
+            yield {
+                "title": title[:255],
+                "content": self.content(language),
+                "source": news.source,
+                "tags": self.random.choices(
+                    tag_titles, weights=weights, k=self.random.randint(1, 6)
+                ),
+                "is_public": self.random.random() < 0.95,
+            }
+
+    def seed(self, batch_size=1000):
+        from apps.news.ingest import bulk_upsert_news
+        from apps.news.models import News, Tags
+
+        if News.objects.count() == self.news and Tags.objects.count() >= self.tags:
+            return False
+
+        News.objects.all().delete()
+        Tags.objects.all().delete()
+        tag_titles = self.tag_titles()
+
+        batch = []
+        for item in self.items(tag_titles):
+            batch.append(item)
+            if len(batch) == batch_size:
+                bulk_upsert_news(batch)
+                batch = []
+        bulk_upsert_news(batch)
+        # Tags no article picked still exist, like in production.
+        Tags.objects.bulk_create(
+            [Tags(title=title) for title in tag_titles], ignore_conflicts=True
+        )
+        return True
+
+
+class Scenarios:
+    """Request urls of each scenario, drawn from the seeded corpus."""
+
+    def __init__(self, seed=SEED):
+        from apps.news.models import News, Tags
+        from django.conf import settings
+        from django.db.models import Count
+
+        self.news_url = reverse("news-create-get")
+        self.tags_url = reverse("tag-create-get")
+        self.random = random.Random(seed)
+        self.news_ids = list(News.objects.values_list("pk", flat=True)[:5000])
+        self.tag_ids = list(Tags.objects.values_list("pk", flat=True)[:5000])
+        by_popularity = list(
+            Tags.objects.annotate(total=Count("news"))
+            .order_by("-total")
+            .values_list("title", flat=True)
+        )
+        self.popular_tags = by_popularity[:20]
+        self.rare_tags = by_popularity[-200:]
+        words = [
+            word
+            for title in News.objects.values_list("title", flat=True)[:2000]
+            for word in title.rstrip(".").split()
+            if len(word) > 3
+        ]
+        self.keywords = words or ["news"]
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        self.pages = max(
+            1, math.ceil(News.objects.filter(is_public=True).count() / page_size)
+        )
+        self.tag_pages = max(1, math.ceil(Tags.objects.count() / page_size))
+
+    def choice(self, values):
+        return self.random.choice(values)
+
+    def urls(self, name, count):
+        make = getattr(self, name)
+        return [make() for _ in range(count)]
+
+    @staticmethod
+    def url(path, **params):
+        return f"{path}?{urlencode(params)}"
+
+    def news_list(self):
+        page = min(self.pages, int(self.random.paretovariate(1.2)))
+        return self.url(self.news_url, page=page)
+
+    def news_list_cursor(self):
+        return self.url(self.news_url, pagination="cursor", page_size=20)
+
+    def news_keywords(self):
+        return self.url(self.news_url, keywords=self.choice(self.keywords))
+
+    def news_excludes(self):
+        return self.url(self.news_url, excludes=self.choice(self.keywords))
+
+    def news_popular_tags(self):
+        return self.url(self.news_url, tags_title=self.choice(self.popular_tags))
+
+    def news_rare_tags(self):
+        return self.url(self.news_url, tags_title=self.choice(self.rare_tags))
+
+    def news_combined(self):
+        return self.url(
+            self.news_url,
+            keywords=self.choice(self.keywords),
+            tags_title=self.choice(self.popular_tags),
+            excludes=self.choice(self.keywords),
+        )
+
+    def news_detail(self):
+        return reverse("news-details", args=[self.choice(self.news_ids)])
+
+    def tags_list(self):
+        return self.url(
+            self.tags_url, page=self.random.randint(1, min(50, self.tag_pages))
+        )
+
+    def tag_detail(self):
+        return reverse("tag-details", args=[self.choice(self.tag_ids)])
+
+
+SCENARIOS = [
+    "news_list",
+    "news_list_cursor",
+    "news_keywords",
+    "news_excludes",
+    "news_popular_tags",
+    "news_rare_tags",
+    "news_combined",
+    "news_detail",
+    "tags_list",
+    "tag_detail",
+]
+
+
+def timed_get(url):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+    return elapsed, len(queries), response.status_code
+
+
+def worker(urls, results, settings_dict=None):
+    from django.db import connection
+
+    if settings_dict is not None:
+        # New threads would otherwise connect to the real database.
+        connection.settings_dict = settings_dict
+    try:
+        # Warm up so imports and the thread's connection aren't measured.
+        timed_get(urls[0])
+        for url in urls:
+            results.append(timed_get(url))
+    finally:
+        if settings_dict is not None:
+            connection.close()
+
+
+def run_scenario(urls, concurrency):
+    from django.db import connection
+
+    results = []
+    started = time.perf_counter()
+    if concurrency > 1:
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(urls[index::concurrency], results, connection.settings_dict),
+            )
+            for index in range(min(concurrency, len(urls)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        worker(urls, results)
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _, _ in results)
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(results),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "queries_per_request": round(
+            sum(queries for _, queries, _ in results) / len(results), 2
+        ),
+        "throughput_rps": round(len(results) / wall, 1),
+        "status_codes": statuses,
+    }
+
+
+def compare(results, previous):
+    print(f"\n{'scenario':<20}{'p95 ms':>18}{'queries':>16}{'rps':>18}")
+    for name, current in results["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        print(
+            f"{name:<20}"
+            f"{before['p95_ms']:>8} -> {current['p95_ms']:<7}"
+            f"{before['queries_per_request']:>6} -> {current['queries_per_request']:<6}"
+            f"{before['throughput_rps']:>8} -> {current['throughput_rps']:<7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--news", type=int, default=100_000)
+    parser.add_argument("--tags", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="Repeatable"
+    )
+    parser.add_argument("--with-cache", action="store_true")
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--json", type=str, help="Write the results to this file")
+    parser.add_argument("--compare", type=str, help="Previous results to diff with")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+
+    caches = settings.CACHES
+    if not args.with_cache:
+        caches = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+    with test_database(args.keepdb) as connection, override_settings(CACHES=caches):
+        started = time.perf_counter()
+        seeded = CorpusBuilder(args.news, args.tags).seed()
+        seed_seconds = time.perf_counter() - started
+
+        scenarios = Scenarios()
+        results = {
+            "meta": {
+                "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "news": args.news,
+                "tags": args.tags,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "cache": args.with_cache,
+                "seed_s": round(seed_seconds, 1) if seeded else None,
+            },
+            "scenarios": {},
+        }
+        failed = []
+        for name in args.scenario or SCENARIOS:
+            urls = scenarios.urls(name, args.requests)
+            results["scenarios"][name] = run_scenario(urls, args.concurrency)
+            print(name, json.dumps(results["scenarios"][name]))
+            if set(results["scenarios"][name]["status_codes"]) != {"200"}:
+                failed.append(name)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+    if failed:
+        sys.exit(f"Responses other than 200 in: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
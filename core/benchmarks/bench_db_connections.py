@@ -0,0 +1,138 @@
+"""
+Benchmark of the database connection overhead per request.
+
+    python -m benchmarks.bench_db_connections [--requests 500]
+        [--path /readyz/] [--json results.json]
+
+Sends requests through Django's WSGI handler, so the request_started and
+request_finished signals close or keep connections exactly like under
+gunicorn, against a test database created from the configured settings.
+Each mode is run in turn:
+
+- close: CONN_MAX_AGE=0, a new connection for every request;
+- persistent: CONN_MAX_AGE=600 with health checks, one per thread;
+- pool: a psycopg 3 pool (PostgreSQL with psycopg[pool] only).
+
+Reports latency percentiles, the connections opened, and the time saved
+per request against "close". Point it at PostgreSQL for realistic numbers:
+on SQLite, opening a connection only opens a file.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from .utils import percentile, setup_django, test_database
+
+
+def configure(connection, mode):
+    connection.close()
+    settings = connection.settings_dict
+    settings["OPTIONS"].pop("pool", None)
+    if mode == "close":
+        settings["CONN_MAX_AGE"] = 0
+    elif mode == "persistent":
+        settings["CONN_MAX_AGE"] = 600
+        settings["CONN_HEALTH_CHECKS"] = True
+    else:
+        settings["CONN_MAX_AGE"] = 0
+        settings["OPTIONS"]["pool"] = {"min_size": 1, "max_size": 4}
+
+
+def pool_available(connection):
+    if connection.vendor != "postgresql":
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run(path, requests):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+
+    handler = WSGIHandler()
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    def start_response(status, headers):
+        if not status.startswith("200"):
+            raise RuntimeError(f"{path} answered {status}")
+
+    connection_created.connect(count)
+    try:
+        # Warm up imports, url resolving and the first connection.
+        handler(RequestFactory().get(path).environ, start_response).close()
+        opened.clear()
+
+        latencies = []
+        for _ in range(requests):
+            environ = RequestFactory().get(path).environ
+            started = time.perf_counter()
+            # Closing the response sends request_finished, like a server does.
+            handler(environ, start_response).close()
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connection_created.disconnect(count)
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "connections_opened": len(opened),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--path", default="/readyz/", help="A GET endpoint that queries the database"
+    )
+    parser.add_argument("--json", type=str, help="Write the results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    if connection.vendor == "sqlite":
+        # The default in-memory test database is never closed, which would
+        # hide the difference between the modes.
+        connection.settings_dict["TEST"]["NAME"] = "bench_db_connections.sqlite3"
+
+    with test_database() as connection:
+        modes = ["close", "persistent"]
+        if pool_available(connection):
+            modes.append("pool")
+
+        results = {"database": connection.vendor, "path": args.path, "modes": {}}
+        original = {**connection.settings_dict}
+        original["OPTIONS"] = {**original["OPTIONS"]}
+        try:
+            for mode in modes:
+                configure(connection, mode)
+                results["modes"][mode] = run(args.path, args.requests)
+        finally:
+            connection.close()
+            connection.settings_dict.update(original)
+
+    baseline = results["modes"]["close"]["mean_ms"]
+    for mode in modes[1:]:
+        saved = baseline - results["modes"][mode]["mean_ms"]
+        results["modes"][mode]["saved_per_request_ms"] = round(saved, 3)
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
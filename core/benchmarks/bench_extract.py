@@ -0,0 +1,114 @@
+"""
+Micro-benchmark of Zoomit article extraction over the saved HTML fixtures.
+
+    python -m benchmarks.bench_extract [--repeat 50] [--rounds 5]
+
+Times scraper.extractors against the selector-per-node implementation
+ZoomitSpider.parse_news_page used before, after checking that both extract
+the same fields. Pages are parsed once up front, so only extraction is
+measured.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from scraper.extractors import extract_article
+from scrapy.http import HtmlResponse
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "zoomit"
+
+
+def legacy_extract(response):
+    content = ""
+
+    stop_titles = [
+        "تبلیغات",
+        "مقاله‌های مرتبط",
+        "مقاله‌ی مرتبط",
+        "مطالعه ",
+    ]
+
+    content_divs = response.css("div.sc-481293f7-1.jrhnOU")
+    for div in content_divs:
+        paragraphs = div.css(".sc-9996cfc-0")
+
+        for p in paragraphs:
+            if "fyrndR" in p.attrib.get("class", ""):
+                continue
+            text_parts = p.css("::text").getall()
+            clean_text = " ".join(t.strip() for t in text_parts if t.strip())
+
+            if any(stop in clean_text for stop in stop_titles):
+                continue
+            if (
+                "داغ‌ترین مطالب روز" in clean_text
+                or "مقالات جدید پیشنهادی" in clean_text
+            ):
+                break
+
+            if clean_text:
+                content += clean_text + "\n"
+
+    tags = response.xpath(
+        "/html/body/div/div[2]/div[1]/main/article/header/div/div/div[2]/div[1]"
+    ).css("a")
+    tags_list = [
+        tag.css("span::text").get().strip()
+        for tag in tags
+        if tag.css("span::text").get()
+    ]
+
+    return {
+        "title": response.css("h1::text").get().strip(),
+        "content": content.strip(),
+        # Blank tags were dropped on save anyway; the extractor skips them.
+        "tags": [tag for tag in tags_list if tag],
+    }
+
+
+def load_responses(pattern="article_*.html"):
+    responses = {}
+    for path in sorted(FIXTURES.glob(pattern)):
+        response = HtmlResponse(
+            f"https://www.zoomit.ir/fixtures/{path.stem}/",
+            body=path.read_bytes(),
+            encoding="utf-8",
+        )
+        response.selector  # parse now, outside the timed loops
+        responses[path.stem] = response
+    return responses
+
+
+def best_time(extract, response, repeat, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            extract(response)
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<16}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for name, response in load_responses().items():
+        expected, actual = legacy_extract(response), extract_article(response)
+        if expected != actual:
+            raise SystemExit(f"{name}: extractors disagree\n{expected}\n{actual}")
+
+        legacy = best_time(legacy_extract, response, args.repeat, args.rounds)
+        current = best_time(extract_article, response, args.repeat, args.rounds)
+        print(
+            f"{name:<16}{legacy * 1000:>12.3f}{current * 1000:>12.3f}"
+            f"{legacy / current:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
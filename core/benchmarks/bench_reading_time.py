@@ -0,0 +1,116 @@
+"""
+Benchmark of reading time estimation, per news against the batch API.
+
+    python -m benchmarks.bench_reading_time [--news 2000] [--tags 500]
+        [--rounds 3] [--keepdb] [--json results.json]
+
+Seeds a test database with the synthetic corpus of bench_api, then times
+estimating every news three ways:
+
+- per_item: ``NewsReadTimeEngine.estimate`` on each instance, i.e. the
+  list-building tokenizer this engine used before and one COUNT per news;
+- batch_news: ``estimate_many`` on the loaded instances, tags counted with
+  one query;
+- batch_tuples: ``estimate_many`` on (title, content, tags_count) tuples,
+  as the ingest and the scraper pipeline use it.
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from .utils import setup_django, test_database
+
+
+def legacy_word_count(text):
+    return len(re.findall(r"\w+", text))
+
+
+def per_item(news):
+    from apps.news.read_time_engine import NewsReadTimeEngine
+
+    return [
+        NewsReadTimeEngine.reading_time(
+            legacy_word_count(instance.title) + legacy_word_count(instance.content),
+            instance.tags.count(),
+        )
+        for instance in news
+    ]
+
+
+def batch_news(news):
+    from apps.news.read_time_engine import NewsReadTimeEngine
+
+    return [
+        estimate.estimated_reading_time
+        for estimate in NewsReadTimeEngine.estimate_many(news)
+    ]
+
+
+def batch_tuples(items):
+    from apps.news.read_time_engine import NewsReadTimeEngine
+
+    return [
+        estimate.estimated_reading_time
+        for estimate in NewsReadTimeEngine.estimate_many(items)
+    ]
+
+
+def timed(function, argument, rounds):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    best = None
+    for _ in range(rounds):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            function(argument)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"best_s": round(best, 4), "queries": len(queries)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--news", type=int, default=2_000)
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--json", type=str, help="Write the results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database(args.keepdb) as connection:
+        from apps.news.models import News
+
+        from .bench_api import CorpusBuilder
+
+        CorpusBuilder(args.news, args.tags).seed()
+        news = list(News.objects.only("pk", "title", "content"))
+        # The tuples must line up with the instances.
+        counts = dict(News.objects.values_list("pk", "tags_count"))
+        items = [(n.title, n.content, counts[n.pk]) for n in news]
+
+        results = {
+            "database": connection.vendor,
+            "news": len(news),
+            "words": sum(legacy_word_count(n.title + " " + n.content) for n in news),
+            "per_item": timed(per_item, news, args.rounds),
+            "batch_news": timed(batch_news, news, args.rounds),
+            "batch_tuples": timed(batch_tuples, items, args.rounds),
+        }
+
+    baseline = results["per_item"]["best_s"]
+    for name in ("batch_news", "batch_tuples"):
+        results[name]["speedup"] = round(baseline / results[name]["best_s"], 2)
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
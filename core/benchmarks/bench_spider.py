@@ -0,0 +1,213 @@
+"""
+Offline benchmark of the Zoomit spider and its pipeline.
+
+    python -m benchmarks.bench_spider [--rounds 3] [--batch-size 50]
+        [--keepdb] [--trace-memory] [--json results.json]
+
+Replays the archive and article pages saved in benchmarks/fixtures/zoomit
+through ZoomitSpider.parse and parse_news_page as HtmlResponses, and feeds
+the items to SaveNewsToDjangoPipeLine against a test database created from
+the configured settings. No network or browser is involved.
+
+Reports items per second, the latency of each stage (parse: archive pages,
+extract: article pages, save: pipeline flushes) and peak memory; the stored
+news are deleted between rounds so every round does the same work.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+
+from .utils import percentile, setup_django, test_database
+
+ARCHIVE_URL = re.compile(r"/archive/.*pageNumber=(\d+)")
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "zoomit"
+
+
+class Corpus:
+    """
+    Serves fixture pages for request urls: archive pages by page number,
+    and articles alternating between the saved article pages, every fourth
+    one being the long article.
+    """
+
+    def __init__(self, directory=FIXTURES):
+        self.archives = {
+            int(path.stem.rsplit("_", 1)[1]): path.read_bytes()
+            for path in directory.glob("archive_page_*.html")
+        }
+        self.articles = [
+            (directory / "article_basic.html").read_bytes(),
+            (directory / "article_long.html").read_bytes(),
+        ]
+        self.served = 0
+
+    def response(self, request):
+        from scrapy.http import HtmlResponse
+
+        match = ARCHIVE_URL.search(request.url)
+        if match:
+            body = self.archives.get(int(match.group(1)))
+            if body is None:
+                return None
+        else:
+            body = self.articles[1 if self.served % 4 == 3 else 0]
+            self.served += 1
+
+        return HtmlResponse(
+            request.url, body=body, encoding="utf-8", request=request, status=200
+        )
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {"parse": [], "extract": [], "save": []}
+
+    def add(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def summary(self):
+        result = {}
+        for stage, samples in self.samples.items():
+            samples = sorted(samples)
+            result[stage] = {
+                "calls": len(samples),
+                "total_s": round(sum(samples), 4),
+                "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+                "max_ms": round(percentile(samples, 1) * 1000, 3),
+            }
+        return result
+
+
+async def crawl(spider, pipeline, corpus, timings):
+    """Walk the fixture archive like the engine would, one page at a time."""
+    import scrapy
+    from scrapy.utils.defer import maybe_deferred_to_future
+
+    items = 0
+    pending = list(spider.start_requests())
+    while pending:
+        request = pending.pop(0)
+        response = corpus.response(request)
+        if response is None:
+            continue
+
+        started = time.perf_counter()
+        if request.callback == spider.parse:
+            results = [result async for result in spider.parse(response)]
+            timings.add("parse", time.perf_counter() - started)
+        else:
+            results = list(request.callback(response))
+            timings.add("extract", time.perf_counter() - started)
+
+        for result in results:
+            if isinstance(result, scrapy.Request):
+                pending.append(result)
+            else:
+                await pipeline.process_item(result, spider)
+                items += 1
+
+    await maybe_deferred_to_future(pipeline.close_spider(spider))
+    return items
+
+
+def run_round(batch_size, corpus, timings):
+    from apps.news.models import News
+    from scraper.pipelines import SaveNewsToDjangoPipeLine
+    from scraper.spiders.zoomit import ZoomitSpider
+    from scrapy.utils.test import get_crawler
+
+    crawler = get_crawler(ZoomitSpider)
+    spider = ZoomitSpider.from_crawler(crawler)
+    crawler.spider = spider
+    crawler.stats.open_spider(spider)
+
+    # Flushes are triggered by the batch size only; no reactor is running.
+    pipeline = SaveNewsToDjangoPipeLine(batch_size=batch_size, flush_interval=0)
+    flush = pipeline.flush
+
+    async def timed_flush(spider):
+        size = len(pipeline.buffer)
+        started = time.perf_counter()
+        await flush(spider)
+        if size:
+            timings.add("save", time.perf_counter() - started)
+
+    pipeline.flush = timed_flush
+    pipeline.open_spider(spider)
+
+    items = asyncio.run(crawl(spider, pipeline, corpus, timings))
+    stored = News.objects.count()
+    News.objects.all().delete()
+    return items, stored, crawler.stats.get_value("news/failed", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also report the Python heap peak (slows every stage down)",
+    )
+    parser.add_argument("--json", type=str, help="Write the results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    from scrapy.utils.reactor import install_reactor
+
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+
+    with test_database(args.keepdb) as connection:
+        corpus = Corpus()
+        timings = Timings()
+        if args.trace_memory:
+            tracemalloc.start()
+
+        items = stored = failed = 0
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            counts = run_round(args.batch_size, corpus, timings)
+            items += counts[0]
+            stored += counts[1]
+            failed += counts[2]
+        elapsed = time.perf_counter() - started
+
+        results = {
+            "rounds": args.rounds,
+            "batch_size": args.batch_size,
+            "database": connection.vendor,
+            "items": items,
+            "stored": stored,
+            "failed": failed,
+            "elapsed_s": round(elapsed, 4),
+            "items_per_second": round(items / elapsed, 2),
+            "stages": timings.summary(),
+            # ru_maxrss is in KiB on Linux.
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        }
+        if args.trace_memory:
+            results["peak_traced_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1
+            )
+            tracemalloc.stop()
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if stored != items:
+        raise SystemExit(f"Only {stored} of {items} items were stored")
+
+
+if __name__ == "__main__":
+    main()
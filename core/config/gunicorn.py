@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration of the API in production.
+
+    gunicorn -c python:config.gunicorn config.wsgi:application
+
+Worker and thread counts follow the CPUs available to the container and can
+be overridden with WEB_CONCURRENCY and WEB_THREADS. Send SIGHUP to the
+master to reload the workers gracefully, e.g. after a release.
+"""
+
+import os
+
+cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+cpus = cpus or os.cpu_count() or 1
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+
+# Views are synchronous and mostly wait on PostgreSQL and Redis, so a few
+# threaded workers per CPU keep every core busy without a process per request.
+workers = int(os.environ.get("WEB_CONCURRENCY", cpus * 2 + 1))
+threads = int(os.environ.get("WEB_THREADS", 4))
+worker_class = os.environ.get("WEB_WORKER_CLASS", "gthread")
+
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+# In-flight requests get this long to finish on a reload or shutdown.
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then to bound slow memory growth; the jitter keeps
+# them from restarting all at once.
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+# Workers heartbeat through shared memory rather than the container's disk.
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("WEB_LOG_LEVEL", "info")
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "*")
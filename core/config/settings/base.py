@@ -118,8 +118,27 @@ MEDIA_ROOT = path.join(BASE_DIR, "media")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# Shared by every API process and the crawl workers, whose writes bump the
+# cache generations the API responses are keyed on. The tests swap it for a
+# local memory cache (apps/news/tests/conftest.py).
+REDIS_CACHE_URL = config("REDIS_CACHE_URL", default="redis://redis:6379/1")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_CACHE_URL,
+    }
+}
+
+# Seconds an API response stays cached; writes invalidate it earlier.
+NEWS_API_CACHE_TIMEOUT = config("NEWS_API_CACHE_TIMEOUT", default=60 * 60, cast=int)
+
+# Largest number of items accepted by one bulk news request.
+NEWS_BULK_MAX_ITEMS = config("NEWS_BULK_MAX_ITEMS", default=5000, cast=int)
+
+
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.news.pagination.StandardPageNumberPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
@@ -131,9 +150,48 @@ CELERY_BROKER_URL = config("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND")
 CELERY_TIME_ZONE = TIME_ZONE
 
+# Redis used to coordinate crawls across workers; the broker by default.
+CRAWL_REDIS_URL = config("CRAWL_REDIS_URL", default=CELERY_BROKER_URL)
+
+# A running crawl holds a lease that expires this long after its last
+# heartbeat. A run scheduled while the lease is held is skipped, or with
+# "coalesce" runs once more after the current one.
+CRAWL_LEASE_TTL = config("CRAWL_LEASE_TTL", default=10 * 60, cast=int)
+CRAWL_OVERLAP_POLICY = config("CRAWL_OVERLAP_POLICY", default="coalesce")
+# Longest a single crawl may run before its crawl process is killed.
+CRAWL_TIMEOUT = config("CRAWL_TIMEOUT", default=30 * 60, cast=int)
+
+# "fanout" splits the scheduled Zoomit crawl into Celery subtasks: one per
+# archive page, then article renders in batches. "single" crawls everything
+# in one task, and is the mode that resumes from CRAWL_STATE_DIR.
+ZOOMIT_CRAWL_MODE = config("ZOOMIT_CRAWL_MODE", default="fanout")
+ZOOMIT_ARCHIVE_PAGES = config("ZOOMIT_ARCHIVE_PAGES", default=5, cast=int)
+# Articles rendered per subtask, and the most subtasks one crawl starts;
+# the worker concurrency bounds how many run at once.
+ZOOMIT_FANOUT_BATCH_SIZE = config("ZOOMIT_FANOUT_BATCH_SIZE", default=10, cast=int)
+ZOOMIT_FANOUT_MAX_TASKS = config("ZOOMIT_FANOUT_MAX_TASKS", default=16, cast=int)
+# How long a claimed article stays reserved for the crawl that claimed it.
+ZOOMIT_CLAIM_TTL = config("ZOOMIT_CLAIM_TTL", default=60 * 60, cast=int)
+
+# A failed article render is retried after CRAWL_RETRY_BASE_DELAY seconds,
+# doubled after every failure up to CRAWL_RETRY_MAX_DELAY, and given up on
+# after CRAWL_RETRY_MAX_ATTEMPTS failures. Each drain of the retry queue
+# renders at most CRAWL_RETRY_BATCH_SIZE articles.
+CRAWL_RETRY_MAX_ATTEMPTS = config("CRAWL_RETRY_MAX_ATTEMPTS", default=5, cast=int)
+CRAWL_RETRY_BASE_DELAY = config("CRAWL_RETRY_BASE_DELAY", default=10 * 60, cast=int)
+CRAWL_RETRY_MAX_DELAY = config("CRAWL_RETRY_MAX_DELAY", default=24 * 60 * 60, cast=int)
+CRAWL_RETRY_BATCH_SIZE = config("CRAWL_RETRY_BATCH_SIZE", default=20, cast=int)
+
 CELERY_BEAT_SCHEDULE = {
     "scrape-zoomit": {
         "task": "apps.news.tasks.scrape_zoomit",
         "schedule": crontab(minute="*/45"),
+        # A run still queued when the next one is due is dropped.
+        "options": {"expires": 45 * 60},
+    },
+    "retry-failed-articles": {
+        "task": "apps.news.tasks.retry_failed_articles",
+        "schedule": crontab(minute="*/15"),
+        "options": {"expires": 15 * 60, "priority": 9},
     },
 }
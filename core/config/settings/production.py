@@ -1,5 +1,5 @@
 from .base import *  # noqa
-from .base import BASE_DIR, config
+from .base import MIDDLEWARE, config
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -15,15 +15,74 @@ SECRET_KEY = config(
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
 
-ALLOWED_HOSTS = ["*"]
+ALLOWED_HOSTS = config(
+    "ALLOWED_HOSTS", default="*", cast=lambda value: value.split(",")
+)
+
+# The API runs behind a proxy that terminates TLS.
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+USE_X_FORWARDED_HOST = True
+
+
+# Static files are served by WhiteNoise from the gunicorn workers: compressed
+# and content-hashed by collectstatic in the release phase, so they can be
+# cached forever by browsers and any CDN in front.
+MIDDLEWARE = [
+    MIDDLEWARE[0],
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    *MIDDLEWARE[1:],
+]
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "prod.sqlite3",
+# With POSTGRES_POOL each worker process keeps a psycopg 3 pool shared by its
+# threads; otherwise each thread keeps its connection for CONN_MAX_AGE
+# seconds. Both are checked before reuse, so a restarted server is noticed.
+POSTGRES_POOL = config("POSTGRES_POOL", default=False, cast=bool)
+
+
+def postgres(host):
+    database = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": config("POSTGRES_DB"),
+        "USER": config("POSTGRES_USER"),
+        "PASSWORD": config("POSTGRES_PASSWORD"),
+        "HOST": host,
+        "PORT": config("POSTGRES_PORT"),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"connect_timeout": 5},
     }
-}
+    if POSTGRES_POOL:
+        # Django refuses persistent connections on top of a pool.
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"]["pool"] = {
+            "min_size": config("POSTGRES_POOL_MIN_SIZE", default=1, cast=int),
+            "max_size": config("POSTGRES_POOL_MAX_SIZE", default=4, cast=int),
+            "timeout": config("POSTGRES_POOL_TIMEOUT", default=10, cast=int),
+        }
+    else:
+        database["CONN_MAX_AGE"] = config("CONN_MAX_AGE", default=60, cast=int)
+    return database
+
+
+DATABASES = {"default": postgres(config("POSTGRES_HOST"))}
+
+# Setting POSTGRES_REPLICA_HOST adds a read replica; the router sends reads
+# there and everything else to the primary.
+POSTGRES_REPLICA_HOST = config("POSTGRES_REPLICA_HOST", default="")
+if POSTGRES_REPLICA_HOST:
+    DATABASES["replica"] = postgres(POSTGRES_REPLICA_HOST)
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["config.db_routers.PrimaryReplicaRouter"]
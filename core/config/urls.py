@@ -22,6 +22,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from .views import liveness, readiness
+
 schema_view = get_schema_view(
     openapi.Info(
         title="News API",
@@ -33,6 +35,8 @@ schema_view = get_schema_view(
 )
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("healthz/", liveness, name="health-liveness"),
+    path("readyz/", readiness, name="health-readiness"),
     path("", RedirectView.as_view(url="/api/v1/news/")),
     path(
         "api/v1/",
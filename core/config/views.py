@@ -0,0 +1,52 @@
+import logging
+import uuid
+
+from django.core.cache import cache
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+def liveness(request):
+    """The process is up and serving requests; touches no backing service."""
+    return JsonResponse({"status": "ok"})
+
+
+def check_database():
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def check_cache():
+    key = f"health:{uuid.uuid4().hex}"
+    cache.set(key, 1, timeout=5)
+    if cache.get(key) != 1:
+        raise RuntimeError("Cache read back a different value")
+    cache.delete(key)
+
+
+READINESS_CHECKS = {"database": check_database, "cache": check_cache}
+
+
+def readiness(request):
+    """
+    The instance can take traffic: every database and the cache answer.
+    Responds 503 otherwise, so the load balancer routes around it.
+    """
+    checks = {}
+    for name, check in READINESS_CHECKS.items():
+        try:
+            check()
+        except Exception:
+            logger.exception("Readiness check %s failed", name)
+            checks[name] = "error"
+        else:
+            checks[name] = "ok"
+
+    healthy = all(status == "ok" for status in checks.values())
+    return JsonResponse(
+        {"status": "ok" if healthy else "error", "checks": checks},
+        status=200 if healthy else 503,
+    )
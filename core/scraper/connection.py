@@ -0,0 +1,9 @@
+"""
+Redis connections shared by the crawl coordination code.
+"""
+
+import redis
+
+
+def get_redis(url):
+    return redis.Redis.from_url(url, decode_responses=True)
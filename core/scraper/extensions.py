@@ -0,0 +1,167 @@
+"""
+Scrapy extensions keeping track of a crawl's progress and failures.
+
+- ``CrawlCheckpoint`` saves the progress of a crawl, so an interrupted one
+  resumes;
+- ``ArticleRetryRecorder`` queues the articles that failed to render, to be
+  tried again later (see apps/news/retries.py).
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from apps.news.retries import record_outcomes
+from asgiref.sync import sync_to_async
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """
+    Scrapy's JOBDIR only writes its state when the spider closes gracefully,
+    which a worker killed for its memory never does. This saves
+    ``spider.state`` every CRAWL_CHECKPOINT_INTERVAL seconds instead, for the
+    spiders with ``resumable`` set, to ``<CRAWL_STATE_DIR>/<spider>.json``:
+
+    - the next run of the spider starts from it, unless it's older than
+      CRAWL_STATE_EXPIRY seconds;
+    - a crawl that finishes deletes it, one that stops for any other reason
+      (closespider, shutdown...) keeps it.
+
+    What goes in the state is up to the spider; it must be JSON serializable.
+    ZoomitSpider is only resumable when it walks the archive itself, not
+    when it crawls given pages or urls like the fan-out subtasks do.
+    """
+
+    def __init__(self, directory, expiry=6 * 60 * 60, interval=10):
+        self.directory = Path(directory)
+        self.expiry = expiry
+        self.interval = interval
+        self.spider = None
+        self.loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("CRAWL_STATE_DIR")
+        if not directory:
+            raise NotConfigured("CRAWL_STATE_DIR isn't set")
+
+        extension = cls(
+            directory,
+            expiry=settings.getfloat("CRAWL_STATE_EXPIRY", 6 * 60 * 60),
+            interval=settings.getfloat("CRAWL_CHECKPOINT_INTERVAL", 10),
+        )
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def path(self, spider):
+        return self.directory / f"{spider.name}.json"
+
+    def load(self, spider):
+        """The saved state of ``spider``, or None when there's none to resume."""
+        path = self.path(spider)
+        try:
+            saved = json.loads(path.read_text())
+            age = time.time() - saved["saved_at"]
+            state = saved["state"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable crawl state {path}: {e!r}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if age > self.expiry:
+            logger.info(f"Discarding crawl state {path} saved {age:.0f}s ago")
+            path.unlink(missing_ok=True)
+            return None
+        return state
+
+    def save(self):
+        path = self.path(self.spider)
+        # Write and rename, so a crash mid-write never leaves half a file.
+        temporary = path.with_suffix(".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(
+                json.dumps({"saved_at": time.time(), "state": self.spider.state})
+            )
+            os.replace(temporary, path)
+        except OSError as e:
+            # The crawl goes on; only its resumability is at stake.
+            logger.error(f"Failed to save crawl state {path}: {e!r}")
+
+    def spider_opened(self, spider):
+        # Runs before the spider's start() is iterated.
+        if not getattr(spider, "resumable", False):
+            return
+
+        self.spider = spider
+        state = self.load(spider)
+        if state is not None:
+            logger.info(f"Resuming {spider.name} from {self.path(spider)}")
+            spider.state = state
+            spider.resumed = True
+            spider.crawler.stats.set_value("checkpoint/resumed", True)
+
+        self.loop = task.LoopingCall(self.save)
+        self.loop.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.spider is None:
+            return
+
+        if self.loop is not None and self.loop.running:
+            self.loop.stop()
+        if reason == "finished":
+            self.path(spider).unlink(missing_ok=True)
+        else:
+            self.save()
+        self.spider = None
+
+
+class ArticleRetryRecorder:
+    """
+    Records the ``outcomes`` and ``failures`` of the spiders that track them
+    in the retry queue when the spider closes. Disabled by setting
+    ARTICLE_RETRY_ENABLED to False.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ARTICLE_RETRY_ENABLED", True):
+            raise NotConfigured("ARTICLE_RETRY_ENABLED is False")
+
+        extension = cls()
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_closed(self, spider, reason):
+        outcomes = getattr(spider, "outcomes", None)
+        if not outcomes:
+            return None
+        return deferred_from_coro(self.record(spider, outcomes))
+
+    async def record(self, spider, outcomes):
+        try:
+            given_up = await sync_to_async(record_outcomes)(
+                outcomes, getattr(spider, "failures", {})
+            )
+        except Exception as e:
+            logger.error(f"Failed to record the failed articles: {e!r}")
+            return
+
+        failed = sum(outcome == "failed" for outcome in outcomes.values())
+        if failed:
+            logger.info(f"Queued {failed} failed articles for a retry")
+        for source in given_up:
+            logger.warning(f"Giving up on {source}")
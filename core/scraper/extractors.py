@@ -0,0 +1,91 @@
+"""
+Field extraction for Zoomit article pages.
+
+Works on the lxml tree behind a response: selectors are compiled once at
+import, paragraph text is read with ``itertext()`` instead of building a
+Selector per text node, every stop/break phrase is checked with a single
+regex, and the body is joined once.
+"""
+
+import re
+
+from cssselect import HTMLTranslator
+from lxml import etree
+
+# Paragraphs containing one of these are left out of the body...
+STOP_PHRASES = (
+    "تبلیغات",
+    "مقاله‌های مرتبط",
+    "مقاله‌ی مرتبط",
+    "مطالعه ",
+)
+# ...and these end the content block they're in.
+BREAK_PHRASES = (
+    "داغ‌ترین مطالب روز",
+    "مقالات جدید پیشنهادی",
+)
+PHRASES = re.compile("|".join(map(re.escape, STOP_PHRASES + BREAK_PHRASES)))
+BREAKS = frozenset(BREAK_PHRASES)
+
+# Paragraph headings, skipped like stop phrases.
+SKIPPED_CLASS = "fyrndR"
+
+
+def compile_css(css):
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix="descendant::"))
+
+
+TITLE = etree.XPath("string((//h1/text())[1])")
+CONTENT_BLOCKS = compile_css("div.sc-481293f7-1.jrhnOU")
+PARAGRAPHS = compile_css(".sc-9996cfc-0")
+# Anchored on the article header rather than on the page wrappers above it,
+# which change with every layout tweak.
+TAG_LINKS = etree.XPath("//article/header/div/div/div[2]/div[1]//a")
+TAG_TITLE = etree.XPath("string((.//span/text())[1])")
+
+
+def paragraph_text(element):
+    return " ".join(part for text in element.itertext() if (part := text.strip()))
+
+
+def extract_content(root):
+    parts = []
+    for block in CONTENT_BLOCKS(root):
+        for paragraph in PARAGRAPHS(block):
+            if SKIPPED_CLASS in paragraph.get("class", ""):
+                continue
+
+            text = paragraph_text(paragraph)
+            if not text:
+                continue
+
+            matches = {match.group() for match in PHRASES.finditer(text)}
+            if matches - BREAKS:
+                continue
+            if matches:
+                break
+
+            parts.append(text)
+    return "\n".join(parts)
+
+
+class ExtractionError(Exception):
+    """An article page lacking a part the extraction needs."""
+
+
+def extract_tags(root):
+    titles = (TAG_TITLE(link).strip() for link in TAG_LINKS(root))
+    return [title for title in titles if title]
+
+
+def extract_article(response):
+    """
+    Title, content and tags of an article response. The title is None when
+    the page has no ``<h1>``, e.g. an error page served with a 200.
+    """
+    root = response.selector.root
+    return {
+        "title": TITLE(root).strip() or None,
+        "content": extract_content(root),
+        "tags": extract_tags(root),
+    }
@@ -3,9 +3,25 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from urllib.parse import urlparse
+
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import TextResponse
+
+# Resources a rendered page never needs for parsing.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "hotjar.com",
+    "yektanet.com",
+    "mediaad.org",
+)
 
 
 class ScraperSpiderMiddleware:
@@ -97,3 +113,110 @@ class ScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class PlaywrightEscalationMiddleware:
+    """
+    Retries a plain HTTP response through Playwright when it lacks any of
+    the selectors listed in ``request.meta["required_selectors"]``.
+
+    Counts plain and escalated responses per ``page_type`` in the stats, as
+    ``hybrid/<page_type>/plain`` and ``hybrid/<page_type>/escalated``.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_response(self, request, response, spider):
+        selectors = request.meta.get("required_selectors")
+        if not selectors or request.meta.get("playwright") or response.status == 304:
+            return response
+
+        page_type = request.meta.get("page_type", "default")
+        if self.is_complete(response, selectors):
+            self.stats.inc_value(f"hybrid/{page_type}/plain")
+            return response
+
+        self.stats.inc_value(f"hybrid/{page_type}/escalated")
+        spider.logger.debug(f"Escalating {request.url} to Playwright")
+        return request.replace(
+            meta={**request.meta, "playwright": True}, dont_filter=True
+        )
+
+    @staticmethod
+    def is_complete(response, selectors):
+        if response.status != 200 or not isinstance(response, TextResponse):
+            return False
+        return all(response.css(selector) for selector in selectors)
+
+
+def should_abort_request(request):
+    """
+    PLAYWRIGHT_ABORT_REQUEST predicate: skip images, media, fonts and ad or
+    analytics hosts while rendering.
+    """
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request.url).hostname or ""
+    return any(
+        host == blocked or host.endswith(f".{blocked}") for blocked in BLOCKED_HOSTS
+    )
+
+
+class PlaywrightContextPoolMiddleware:
+    """
+    Spreads rendered requests over the browser contexts started from
+    ``PLAYWRIGHT_CONTEXTS``, sending each one to the context with the fewest
+    requests in flight. The contexts stay open for the whole crawl, so their
+    cache and connections are reused instead of starting cold per page.
+
+    A request is released when it leaves the downloader: a middleware
+    closer to the downloader, like RetryMiddleware, may replace its response
+    with a new request and skip this one's process_response. The retried
+    copy is assigned a context again like any new request.
+    """
+
+    def __init__(self, contexts):
+        self.in_flight = dict.fromkeys(contexts, 0)
+        self.assigned = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        contexts = list(crawler.settings.getdict("PLAYWRIGHT_CONTEXTS"))
+        if not contexts:
+            raise NotConfigured
+        middleware = cls(contexts)
+        crawler.signals.connect(
+            middleware.request_left, signal=signals.request_left_downloader
+        )
+        return middleware
+
+    def process_request(self, request, spider):
+        context = request.meta.get("playwright_context")
+        if not request.meta.get("playwright") or context not in (None, *self.in_flight):
+            return None
+
+        name = min(self.in_flight, key=self.in_flight.get)
+        request.meta["playwright_context"] = name
+        self.in_flight[name] += 1
+        self.assigned[id(request)] = name
+        return None
+
+    def process_response(self, request, response, spider):
+        self.release(request)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self.release(request)
+
+    def request_left(self, request, spider):
+        self.release(request)
+
+    def release(self, request):
+        name = self.assigned.pop(id(request), None)
+        if name is not None:
+            self.in_flight[name] -= 1
@@ -3,11 +3,13 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+from collections import Counter
 
-from apps.news.models import News, Tags
+from apps.news.ingest import bulk_upsert_news
 from asgiref.sync import sync_to_async
-# useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
 
 
 class ScraperPipeline:
@@ -16,28 +18,114 @@ class ScraperPipeline:
 
 
 class SaveNewsToDjangoPipeLine:
+    """
+    Buffers scraped news and writes them in batches.
+
+    A batch is flushed when it reaches ``NEWS_PIPELINE_BATCH_SIZE`` items,
+    every ``NEWS_PIPELINE_FLUSH_INTERVAL`` seconds and when the spider
+    closes. Each flush is one transaction built from bulk queries, so the
+    reactor no longer waits on a database round trip per item and tag. When
+    a batch fails its items are saved one by one, so a bad item only loses
+    itself.
+    """
+
+    def __init__(self, batch_size=50, flush_interval=30):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.flusher = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint("NEWS_PIPELINE_BATCH_SIZE", 50),
+            flush_interval=crawler.settings.getfloat(
+                "NEWS_PIPELINE_FLUSH_INTERVAL", 30
+            ),
+        )
+
+    def open_spider(self, spider):
+        if self.flush_interval > 0:
+            self.flusher = task.LoopingCall(
+                lambda: deferred_from_coro(self.flush(spider))
+            )
+            self.flusher.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        # The pipeline manager awaits a Deferred here, not a coroutine.
+        if self.flusher is not None and self.flusher.running:
+            self.flusher.stop()
+        return deferred_from_coro(self.flush(spider))
 
     async def process_item(self, item, spider):
+        self.buffer.append(ItemAdapter(item).asdict())
+
+        if len(self.buffer) >= self.batch_size:
+            await self.flush(spider)
+        return item
+
+    async def flush(self, spider):
+        items, self.buffer = self.buffer, []
+        if not items:
+            return
+
+        outcomes, errors = await self.save(items, spider)
+        if hasattr(spider, "record_outcome"):
+            for source, outcome in outcomes.items():
+                spider.record_outcome(source, outcome, errors.get(source))
+
+    async def save(self, items, spider):
+        """Save ``items``; returns their outcomes and the errors of the failed."""
         try:
-            await self.save_item(item, spider)
-            return item
+            return await self.save_items(items, spider), {}
         except Exception as e:
-            spider.logger.error(f"Failed to save item: {e}")
-            raise
+            if len(items) == 1:
+                source = items[0]["source"]
+                spider.crawler.stats.inc_value("news/failed")
+                spider.logger.error(f"Failed to save {source}: {e}")
+                return {source: "failed"}, {source: e}
+            error = e
+
+        # A batch is saved in one transaction, so one bad item fails all of
+        # them: save them one by one, and only the bad ones fail.
+        spider.logger.warning(
+            f"Failed to save {len(items)} items, saving them one by one: {error}"
+        )
+        unique = {}
+        for item in items:
+            unique.setdefault(item["source"], item)
+        if len(items) > len(unique):
+            spider.crawler.stats.inc_value("news/skipped", len(items) - len(unique))
+
+        outcomes, errors = {}, {}
+        for item in unique.values():
+            item_outcomes, item_errors = await self.save([item], spider)
+            outcomes.update(item_outcomes)
+            errors.update(item_errors)
+        return outcomes, errors
 
     @sync_to_async
-    def save_item(self, item, spider):
-        if News.objects.filter(source=item["source"]).exists():
-            spider.logger.info(f"Item already exists: {item['source']}")
-            return
+    def save_items(self, items, spider):
+        # Keep the first occurrence of a source, like the one-by-one path did.
+        unique = {}
+        for item in items:
+            unique.setdefault(item["source"], item)
 
-        spider.logger.info(f"Creating new news item: {item['source']}")
-        news = News.objects.create(
-            title=item["title"],
-            content=item["content"],
-            source=item["source"],
+        saved = bulk_upsert_news(
+            list(unique.values()),
+            update_existing=getattr(spider, "update_existing", False),
         )
 
-        for tag_title in item["tags"]:
-            tag, _ = Tags.objects.get_or_create(title=tag_title)
-            news.tags.add(tag)
+        outcomes = {source: status for source, (_, status) in saved.items()}
+        counts = Counter(outcomes.values())
+        counts["skipped"] += len(items) - len(unique)
+
+        stats = spider.crawler.stats
+        for status, count in counts.items():
+            if count:
+                stats.inc_value(f"news/{status}", count)
+        summary = ", ".join(
+            f"{count} {status}" for status, count in counts.items() if count
+        )
+        spider.logger.info(f"Saved batch: {summary}")
+        return outcomes
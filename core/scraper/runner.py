@@ -0,0 +1,188 @@
+"""
+Run spiders from Django code without shelling out to ``scrapy crawl``.
+
+The Twisted reactor can only be started once per process, so crawls can't
+run inside the Celery worker itself. Instead a child process keeps a reactor
+and a ``CrawlerRunner`` alive and takes crawl jobs over a pipe: Django,
+Scrapy and the spiders are imported once, and every run after the first one
+starts immediately.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import billiard
+
+# Stats copied into a crawl result; everything else stays in the crawl logs.
+RESULT_STATS = {
+    "items_scraped": "item_scraped_count",
+    "items_created": "news/created",
+    "items_updated": "news/updated",
+    "items_unchanged": "news/unchanged",
+    "items_skipped": "news/skipped",
+    "items_failed": "news/failed",
+    "items_dropped": "item_dropped_count",
+    "articles_known": "zoomit/articles_known",
+    "requests": "downloader/request_count",
+    "errors": "log_count/ERROR",
+}
+
+
+class CrawlError(Exception):
+    pass
+
+
+def summarize(crawler, duration, error=None):
+    stats = crawler.stats.get_stats()
+    result = {
+        "spider": crawler.spidercls.name,
+        "finish_reason": stats.get("finish_reason", "error" if error else None),
+        "duration": round(stats.get("elapsed_time_seconds", duration), 3),
+        "error": error,
+    }
+    for name, key in RESULT_STATS.items():
+        result[name] = stats.get(key, 0)
+
+    # Per-url outcomes and discovered urls, for spiders that track them.
+    outcomes = getattr(crawler.spider, "outcomes", None)
+    if outcomes is not None:
+        result["outcomes"] = dict(outcomes)
+    discovered = getattr(crawler.spider, "discovered", None)
+    if discovered:
+        result["discovered"] = list(discovered)
+    # A crawl that picked up where an interrupted one stopped.
+    if getattr(crawler.spider, "resumed", False):
+        result["resumed"] = True
+    return result
+
+
+def serve(conn):
+    """
+    Entry point of the crawl process: run crawl jobs received on ``conn``
+    one at a time until the pipe is closed.
+    """
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "scraper.settings")
+
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    settings = get_project_settings()
+    install_reactor(settings["TWISTED_REACTOR"])
+
+    from asgiref.sync import sync_to_async
+    from django.db import close_old_connections
+    from scrapy.crawler import CrawlerRunner
+    from scrapy.utils.defer import deferred_from_coro
+    from scrapy.utils.log import configure_logging
+    from twisted.internet import defer, reactor, threads
+
+    configure_logging(settings)
+    runner = CrawlerRunner(settings)
+
+    def receive():
+        try:
+            return conn.recv()
+        except EOFError:
+            return None
+
+    @defer.inlineCallbacks
+    def loop():
+        while True:
+            job = yield threads.deferToThread(receive)
+            if job is None:
+                break
+
+            spider, kwargs = job
+            crawler = runner.create_crawler(spider)
+            started = time.monotonic()
+            error = None
+            try:
+                yield runner.crawl(crawler, **kwargs)
+            except Exception as e:
+                error = repr(e)
+
+            # The pipelines' connection lives in the sync_to_async thread and
+            # would otherwise stay open, possibly stale, until the next run.
+            yield deferred_from_coro(sync_to_async(close_old_connections)())
+            conn.send(summarize(crawler, time.monotonic() - started, error))
+
+        reactor.stop()
+
+    reactor.callWhenRunning(loop)
+    reactor.run(installSignalHandlers=False)
+
+
+class CrawlProcess:
+    """
+    Handle on the crawl process, started on first use and restarted if it
+    dies. Crawls are serialized: a second caller waits for the running one.
+    """
+
+    def __init__(self, target=None):
+        # The child's entry point, ``serve`` unless replaced in the tests.
+        self.target = target or serve
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        # A spawned child doesn't inherit the parent's reactor, database
+        # connections or threads. billiard allows it under a Celery worker.
+        context = billiard.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=self.target, args=(child_conn,), name="crawl-process", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout=10):
+        if self.process is None:
+            return
+
+        self.conn.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5)
+        if self.process.is_alive():
+            # Stuck where SIGTERM can't stop it, e.g. in a hung browser call.
+            os.kill(self.process.pid, signal.SIGKILL)
+            self.process.join()
+        self.process = self.conn = None
+
+    def crawl(self, spider, timeout=None, **kwargs):
+        """
+        Run ``spider`` with ``kwargs`` as spider arguments and return a
+        summary of the run. The process is killed and ``CrawlError`` raised
+        if it takes longer than ``timeout`` seconds; the callers pass the
+        CRAWL_TIMEOUT setting, as a crawl that hangs would otherwise block
+        its worker for good.
+        """
+        with self.lock:
+            if not self.is_alive():
+                self.stop()
+                self.start()
+
+            self.conn.send((spider, kwargs))
+            try:
+                if self.conn.poll(timeout):
+                    return self.conn.recv()
+            except (EOFError, OSError):
+                self.stop(timeout=0)
+                raise CrawlError(f"Crawl process exited during the {spider} crawl")
+
+            self.stop(timeout=0)
+            raise CrawlError(f"{spider} crawl timed out after {timeout}s")
+
+
+_process = CrawlProcess()
+
+
+def crawl(spider, timeout=None, **kwargs):
+    return _process.crawl(spider, timeout=timeout, **kwargs)
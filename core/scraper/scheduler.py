@@ -0,0 +1,226 @@
+"""
+Scrapy scheduler and dupefilter keeping the crawl frontier in Redis.
+
+Enabled by setting SCHEDULER_REDIS_URL (see settings.py). Every spider
+process using the same url and key prefix pulls from the same queue and
+shares the fingerprints of the requests seen, so a crawl can be spread over
+several hosts and survives the death of any of them. The prefix includes the
+``job`` spider argument: processes of one crawl pass the same job, and a
+crawl without one gets a frontier of its own, so concurrent crawls of the
+same spider never take each other's requests.
+
+- ``<prefix>:requests`` is a sorted set of serialized requests, by priority;
+- ``<prefix>:inflight`` holds the requests handed to a downloader, scored by
+  the time they're given up on. A request that hasn't left the downloader
+  by then, because its process died, goes back to the queue;
+- ``<prefix>:dupefilter`` is the set of request fingerprints seen.
+"""
+
+import base64
+import json
+import logging
+import time
+import uuid
+
+from scrapy import signals
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.utils.misc import build_from_crawler, load_object
+from scrapy.utils.request import request_from_dict
+
+from . import connection
+
+logger = logging.getLogger(__name__)
+
+# Meta key of the serialized form of a dequeued request, to acknowledge it.
+MEMBER_META_KEY = "_scheduler_member"
+
+# Moves the first queued request to the in-flight set in one step, so a
+# process dying in between can't lose it.
+POP_SCRIPT = """
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if popped[1] then
+    redis.call('ZADD', KEYS[2], ARGV[1], popped[1])
+end
+return popped[1]
+"""
+
+
+def key_prefix(crawler):
+    spider = crawler.spider
+    job = getattr(spider, "job", None)
+    if not job:
+        job = spider.job = uuid.uuid4().hex
+    prefix = crawler.settings.get("SCHEDULER_KEY_PREFIX", "scrapy:%(spider)s:%(job)s")
+    return prefix % {"spider": spider.name, "job": job}
+
+
+class RedisDupeFilter(BaseDupeFilter):
+    """Request fingerprints in a Redis set shared by every process."""
+
+    def __init__(self, client, key, fingerprinter):
+        self.client = client
+        self.key = key
+        self.fingerprinter = fingerprinter
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            connection.get_redis(crawler.settings["SCHEDULER_REDIS_URL"]),
+            f"{key_prefix(crawler)}:dupefilter",
+            crawler.request_fingerprinter,
+        )
+
+    def request_seen(self, request):
+        fingerprint = self.fingerprinter.fingerprint(request).hex()
+        return not self.client.sadd(self.key, fingerprint)
+
+    def clear(self):
+        self.client.delete(self.key)
+
+
+class RedisScheduler(BaseScheduler):
+    def __init__(
+        self,
+        client,
+        prefix,
+        dupefilter,
+        visibility_timeout=600,
+        requeue_interval=30,
+        persist=False,
+        stats=None,
+    ):
+        self.client = client
+        self.queue_key = f"{prefix}:requests"
+        self.inflight_key = f"{prefix}:inflight"
+        self.df = dupefilter
+        self.pop = client.register_script(POP_SCRIPT)
+        self.visibility_timeout = visibility_timeout
+        self.requeue_interval = requeue_interval
+        self.persist = persist
+        self.stats = stats
+        self.spider = None
+        self.next_requeue = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        dupefilter_class = load_object(settings["DUPEFILTER_CLASS"])
+        scheduler = cls(
+            connection.get_redis(settings["SCHEDULER_REDIS_URL"]),
+            key_prefix(crawler),
+            build_from_crawler(dupefilter_class, crawler),
+            visibility_timeout=settings.getfloat("SCHEDULER_VISIBILITY_TIMEOUT", 600),
+            requeue_interval=settings.getfloat("SCHEDULER_REQUEUE_INTERVAL", 30),
+            persist=settings.getbool("SCHEDULER_PERSIST"),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(
+            scheduler.request_done, signal=signals.request_left_downloader
+        )
+        return scheduler
+
+    def open(self, spider):
+        self.spider = spider
+        # Requests left in flight by a process that died.
+        self.requeue_expired()
+        return self.df.open()
+
+    def close(self, reason):
+        # Another process may still be working on the same frontier.
+        if (
+            not self.persist
+            and reason == "finished"
+            and not self.has_pending_requests()
+        ):
+            self.client.delete(self.queue_key, self.inflight_key)
+            self.df.clear()
+        return self.df.close(reason)
+
+    def has_pending_requests(self):
+        # In-flight requests count: they're requeued if their process dies,
+        # so an idle process waits for them instead of closing the spider.
+        with self.client.pipeline(transaction=False) as pipeline:
+            queued, inflight = (
+                pipeline.zcard(self.queue_key).zcard(self.inflight_key).execute()
+            )
+        return queued + inflight > 0
+
+    def __len__(self):
+        return self.client.zcard(self.queue_key)
+
+    def encode(self, request):
+        # JSON rather than pickle: loading a pickle from a shared Redis would
+        # run whatever code anyone able to write there put in it.
+        data = request.to_dict(spider=self.spider)
+        data["meta"].pop(MEMBER_META_KEY, None)
+        data["body"] = base64.b64encode(data["body"]).decode()
+        data["headers"] = {
+            name.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for name, values in data["headers"].items()
+        }
+        try:
+            # The id keeps two identical requests (dont_filter) apart in the set.
+            return json.dumps({"id": uuid.uuid4().hex, "request": data})
+        except TypeError as e:
+            raise ValueError(f"Can't store {request} in the Redis queue: {e}")
+
+    def decode(self, member):
+        data = json.loads(member)["request"]
+        data["body"] = base64.b64decode(data["body"])
+        data["headers"] = {
+            name.encode("latin-1"): [value.encode("latin-1") for value in values]
+            for name, values in data["headers"].items()
+        }
+        return request_from_dict(data, spider=self.spider)
+
+    def enqueue_request(self, request):
+        if not request.dont_filter and self.df.request_seen(request):
+            logger.debug(f"Filtered duplicate request: {request}")
+            self.stats.inc_value("dupefilter/filtered", spider=self.spider)
+            return False
+
+        self.client.zadd(self.queue_key, {self.encode(request): -request.priority})
+        self.stats.inc_value("scheduler/enqueued/redis", spider=self.spider)
+        return True
+
+    def next_request(self):
+        now = time.time()
+        if now >= self.next_requeue:
+            self.requeue_expired()
+
+        member = self.pop(
+            keys=[self.queue_key, self.inflight_key],
+            args=[now + self.visibility_timeout],
+        )
+        if member is None:
+            return None
+
+        request = self.decode(member)
+        request.meta[MEMBER_META_KEY] = member
+        self.stats.inc_value("scheduler/dequeued/redis", spider=self.spider)
+        return request
+
+    def request_done(self, request, spider):
+        member = request.meta.get(MEMBER_META_KEY)
+        if member is not None:
+            self.client.zrem(self.inflight_key, member)
+
+    def requeue_expired(self):
+        now = time.time()
+        self.next_requeue = now + self.requeue_interval
+        expired = self.client.zrangebyscore(self.inflight_key, "-inf", now)
+        requeued = 0
+        for member in expired:
+            # Only the process that removes it requeues it.
+            if self.client.zrem(self.inflight_key, member):
+                priority = self.decode(member).priority
+                self.client.zadd(self.queue_key, {member: -priority})
+                requeued += 1
+
+        if requeued:
+            logger.info(f"Requeued {requeued} requests left in flight")
+            self.stats.inc_value(
+                "scheduler/requeued/redis", requeued, spider=self.spider
+            )
+        return requeued
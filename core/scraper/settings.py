@@ -52,32 +52,66 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "scraper.middlewares.ScraperDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    "scraper.middlewares.PlaywrightEscalationMiddleware": 543,
+    "scraper.middlewares.PlaywrightContextPoolMiddleware": 545,
+}
+
+# "hybrid" fetches pages over plain HTTP and only renders them in Playwright
+# when the selectors the spider needs are missing; "playwright" renders every
+# page and "http" never does.
+ZOOMIT_RENDER_MODE = "hybrid"
+
+# "serial" fetches one page at a time with the delay above. "concurrent"
+# allows ZOOMIT_CONCURRENCY requests in flight, rendered in a pool of
+# ZOOMIT_CONTEXT_POOL_SIZE warm browser contexts, and lets AutoThrottle adapt
+# the delay to the site's latency (see ZoomitSpider.update_settings). Set
+# the ZOOMIT_CONCURRENCY_MODE environment variable to opt in.
+ZOOMIT_CONCURRENCY_MODE = os.environ.get("ZOOMIT_CONCURRENCY_MODE", "serial")
+ZOOMIT_CONCURRENCY = 8
+ZOOMIT_CONTEXT_POOL_SIZE = 4
+
+# Don't download images, media, fonts or ads while rendering
+PLAYWRIGHT_ABORT_REQUEST = "scraper.middlewares.should_abort_request"
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "scraper.extensions.CrawlCheckpoint": 500,
+    "scraper.extensions.ArticleRetryRecorder": 510,
+}
+# Failed article renders are queued in the database to be retried with a
+# backoff by the retry_failed_articles Celery task (apps/news/retries.py).
+ARTICLE_RETRY_ENABLED = True
+# Progress of resumable crawls is saved there every CRAWL_CHECKPOINT_INTERVAL
+# seconds, and an interrupted crawl resumes from it unless it's older than
+# CRAWL_STATE_EXPIRY seconds (see scraper/extensions.py). Unset disables it.
+# Only serial archive crawls are resumable, not the fan-out subtasks, which
+# crawl given pages or urls.
+CRAWL_STATE_DIR = os.environ.get("CRAWL_STATE_DIR", "")
+CRAWL_STATE_EXPIRY = int(os.environ.get("CRAWL_STATE_EXPIRY", 6 * 60 * 60))
+CRAWL_CHECKPOINT_INTERVAL = 10
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
     "scraper.pipelines.SaveNewsToDjangoPipeLine": 300,
 }
+# Items written per transaction, and the longest an item waits in the buffer
+NEWS_PIPELINE_BATCH_SIZE = 50
+NEWS_PIPELINE_FLUSH_INTERVAL = 30
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
+# (enabled by the "concurrent" ZOOMIT_CONCURRENCY_MODE)
 # AUTOTHROTTLE_ENABLED = True
 # The initial download delay
-# AUTOTHROTTLE_START_DELAY = 5
+AUTOTHROTTLE_START_DELAY = 1
 # The maximum download delay to be set in case of high latencies
-# AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_MAX_DELAY = 10
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-# AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
 # Enable showing throttling stats for every response received:
 # AUTOTHROTTLE_DEBUG = False
 
@@ -100,12 +134,29 @@ DOWNLOAD_HANDLERS = {
 
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
+# Shared crawl frontier (see scraper/scheduler.py): with a Redis url, every
+# spider process pulls requests from and dedupes against the same Redis, and
+# the requests of a process that died are requeued after
+# SCHEDULER_VISIBILITY_TIMEOUT seconds. Unset keeps Scrapy's in-memory one.
+SCHEDULER_REDIS_URL = os.environ.get("SCHEDULER_REDIS_URL", "")
+if SCHEDULER_REDIS_URL:
+    SCHEDULER = "scraper.scheduler.RedisScheduler"
+    DUPEFILTER_CLASS = "scraper.scheduler.RedisDupeFilter"
+# Keys are "<prefix>:requests", ":inflight" and ":dupefilter". The spider
+# processes of one crawl share a frontier by passing the same -a job=<id>;
+# without it every crawl gets its own.
+SCHEDULER_KEY_PREFIX = "scrapy:%(spider)s:%(job)s"
+SCHEDULER_VISIBILITY_TIMEOUT = 600
+SCHEDULER_REQUEUE_INTERVAL = 30
+# Keep the queue and fingerprints when the crawl finishes.
+SCHEDULER_PERSIST = False
+
 
 django_path = Path(__file__).resolve().parent.parent
 sys.path.append(str(django_path) + "/")
 
-# Change this in prod
-os.environ["DJANGO_SETTINGS_MODULE"] = "config.settings.local"
+# Change this in prod; a crawl started from Django keeps the caller's settings
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
 django.setup()
 
 # from apps.news.models import News, Tags
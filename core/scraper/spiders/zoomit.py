@@ -1,92 +1,303 @@
+import math
+
 import scrapy
+from apps.news.models import ArticleRetry, News
+from asgiref.sync import sync_to_async
+from scrapy import signals
+
+from ..extractors import ExtractionError, extract_article
 
 
 class ZoomitSpider(scrapy.Spider):
     name = "zoomit"
     allowed_domains = ["zoomit.ir"]
-    start_urls = [
-        "https://www.zoomit.ir/archive/?sort=Newest&publishDate=All&readingTime=All&pageNumber=1"
-    ]
+    archive_url = (
+        "https://www.zoomit.ir/archive/"
+        "?sort=Newest&publishDate=All&readingTime=All&pageNumber={page}"
+    )
+    start_urls = [archive_url.format(page=1)]
+    # Archive pages walked by a full crawl.
+    last_page = 5
+
+    # Selectors each callback needs; a plain HTTP response missing one of them
+    # is rendered again through Playwright (see PlaywrightEscalationMiddleware).
+    required_selectors = {
+        "archive": ["a.fNLyDV"],
+        "article": ["h1", "div.sc-481293f7-1"],
+    }
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        if settings.get("ZOOMIT_CONCURRENCY_MODE") != "concurrent":
+            return
+
+        concurrency = settings.getint("ZOOMIT_CONCURRENCY", 8)
+        pool_size = settings.getint("ZOOMIT_CONTEXT_POOL_SIZE", 4)
+        settings.setdict(
+            {
+                "CONCURRENT_REQUESTS_PER_DOMAIN": concurrency,
+                # AutoThrottle never goes below DOWNLOAD_DELAY.
+                "DOWNLOAD_DELAY": 0,
+                "AUTOTHROTTLE_ENABLED": True,
+                # Started with the browser and reused by every rendered page.
+                "PLAYWRIGHT_CONTEXTS": {
+                    f"zoomit-{index}": {} for index in range(pool_size)
+                },
+                "PLAYWRIGHT_MAX_CONTEXTS": pool_size,
+                "PLAYWRIGHT_MAX_PAGES_PER_CONTEXT": math.ceil(concurrency / pool_size),
+            },
+            priority="spider",
+        )
 
-    def __init__(self, custom_url=None, *args, **kwargs):
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.callback_failed, signal=signals.spider_error)
+        return spider
+
+    def __init__(
+        self,
+        custom_url=None,
+        incremental="1",
+        urls=None,
+        update_existing="0",
+        pages=None,
+        discover="0",
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.custom_url = custom_url
+        # Skip articles that are already stored; pass -a incremental=0 to
+        # render every listed article again.
+        self.incremental = incremental not in ("0", "false", "False")
+        # Article urls to (re-)scrape instead of walking the archive, as a
+        # list or a comma separated string.
+        if isinstance(urls, str):
+            urls = urls.split(",")
+        self.urls = list(
+            dict.fromkeys(url.strip() for url in urls or [] if url.strip())
+        )
+        # Overwrite stored news with the scraped version instead of keeping
+        # the stored one.
+        self.update_existing = update_existing in (True, "1", "true", "True")
+        # Archive pages to crawl instead of walking from page 1, as a list or
+        # a comma separated string; their next pages aren't followed.
+        if isinstance(pages, str):
+            pages = pages.split(",")
+        self.pages = [int(page) for page in pages or []]
+        # Only collect the new article urls of the archive pages in
+        # self.discovered, for the crawl fan-out to render elsewhere.
+        self.discover = discover in (True, "1", "true", "True")
+        self.discovered = []
+        # Outcome of every scraped article url, filled in by the pipeline,
+        # and the error of those that failed, for the retry queue.
+        self.outcomes = {}
+        self.failures = {}
+        # Stored ETag and Last-Modified of the urls, for conditional requests.
+        self.validators = {}
+        # A full crawl of the archive saves its progress, and resumes from
+        # it after an interruption (see scraper/extensions.py): the last
+        # archive page read, the article urls requested but not yet scraped
+        # and the fingerprints of those that were.
+        self.resumable = not (self.urls or self.custom_url or self.pages)
+        self.resumed = False
+        self.state = {"page": 0, "paginated": False, "pending": {}, "seen": {}}
 
-    def start_requests(self):
-        if self.custom_url:
+    def request_meta(self, page_type):
+        """
+        Download mode for a request, from the ZOOMIT_RENDER_MODE setting:
+        "playwright" always renders, "http" never does and "hybrid" tries a
+        plain fetch first.
+        """
+        mode = self.settings.get("ZOOMIT_RENDER_MODE", "hybrid")
+
+        if mode == "playwright":
+            return {"playwright": True}
+        if mode == "http":
+            return {"page_type": page_type}
+        return {
+            "page_type": page_type,
+            "required_selectors": self.required_selectors[page_type],
+        }
+
+    async def start(self):
+        # With the stored validators, an article the origin reports as not
+        # modified is neither parsed nor written again.
+        if self.urls and self.update_existing:
+            self.validators = await self.stored_validators(self.urls)
+
+        requests = self.resume_requests() if self.resumed else self.start_requests()
+        for request in requests:
+            yield request
+
+    def resume_requests(self):
+        for url in self.state["pending"]:
+            yield self.article_request(url)
+
+        next_page = self.state["page"] + 1
+        if not self.state["paginated"] and next_page <= self.last_page:
             yield scrapy.Request(
-                self.custom_url,
-                meta={"playwright": True},
-                callback=self.parse_news_page,
+                self.archive_url.format(page=next_page),
+                meta=self.request_meta("archive"),
+                callback=self.parse,
             )
+
+    def article_request(self, url):
+        return scrapy.Request(
+            url,
+            meta=self.request_meta("article"),
+            callback=self.parse_news_page,
+            errback=self.download_failed,
+        )
+
+    def fingerprint(self, url):
+        return self.crawler.request_fingerprinter.fingerprint(scrapy.Request(url)).hex()
+
+    def start_requests(self):
+        if self.urls:
+            for url in self.urls:
+                yield scrapy.Request(
+                    url,
+                    headers=self.conditional_headers(url),
+                    meta={
+                        **self.request_meta("article"),
+                        "handle_httpstatus_list": [304],
+                    },
+                    callback=self.parse_news_page,
+                    errback=self.download_failed,
+                )
+        elif self.custom_url:
+            yield self.article_request(self.custom_url)
         else:
-            for url in self.start_urls:
+            urls = [self.archive_url.format(page=page) for page in self.pages]
+            for url in urls or self.start_urls:
                 yield scrapy.Request(
-                    url, meta={"playwright": True}, callback=self.parse
+                    url, meta=self.request_meta("archive"), callback=self.parse
                 )
 
-    def parse(self, response):
-        article_urls = response.css("a.fNLyDV::attr(href)").getall()
+    def record_outcome(self, url, outcome, error=None):
+        self.outcomes[url] = outcome
+        if outcome == "failed":
+            self.failures[url] = {
+                "error_class": type(error).__name__ if error else "Unknown",
+                "error": str(error or ""),
+            }
+        else:
+            self.failures.pop(url, None)
+        if self.resumable:
+            self.state["pending"].pop(url, None)
+            self.state["seen"][self.fingerprint(url)] = outcome
+        if self.urls and len(self.outcomes) % 50 == 0:
+            self.logger.info(f"Progress: {len(self.outcomes)}/{len(self.urls)} urls")
+
+    def download_failed(self, failure):
+        self.record_outcome(failure.request.url, "failed", failure.value)
+        self.logger.error(f"Failed to fetch {failure.request.url}: {failure.value!r}")
 
-        for url in article_urls[::-1]:
-            yield response.follow(
-                url, meta={"playwright": True}, callback=self.parse_news_page
+    def callback_failed(self, failure, response, spider):
+        # An article callback that raised; Scrapy already logged the error.
+        request = response.request
+        if request is not None and request.callback == self.parse_news_page:
+            self.record_outcome(response.url, "failed", failure.value)
+
+    @sync_to_async
+    def stored_validators(self, urls):
+        return {
+            source: (etag, last_modified)
+            for source, etag, last_modified in News.objects.filter(
+                source__in=urls
+            ).values_list("source", "source_etag", "source_last_modified")
+        }
+
+    def conditional_headers(self, url):
+        etag, last_modified = self.validators.get(url, ("", ""))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    @staticmethod
+    def validator(response, header, max_length):
+        value = response.headers.get(header, b"").decode("latin-1")
+        # A truncated validator would never match, so don't keep one at all.
+        return value if len(value) <= max_length else ""
+
+    @sync_to_async
+    def known_sources(self, urls):
+        # Stored articles, and failed ones left to the retry queue. A UNION
+        # can't hold the models' default ordering.
+        stored = News.objects.filter(source__in=urls).order_by()
+        queued = ArticleRetry.objects.filter(source__in=urls).order_by()
+        return set(
+            stored.values_list("source", flat=True).union(
+                queued.values_list("source", flat=True)
             )
+        )
+
+    async def parse(self, response):
+        article_urls = [
+            response.urljoin(url)
+            for url in response.css("a.fNLyDV::attr(href)").getall()
+        ]
+
+        # One query per archive page, before any article is rendered.
+        known = await self.known_sources(article_urls) if self.incremental else set()
+        new_urls = [url for url in article_urls if url not in known]
+        self.crawler.stats.inc_value("zoomit/articles_known", len(known))
+
+        if self.discover:
+            self.discovered.extend(new_urls[::-1])
+        else:
+            for url in new_urls[::-1]:
+                if self.resumable:
+                    # Already scraped, or given up on, before an interruption.
+                    if self.fingerprint(url) in self.state["seen"]:
+                        continue
+                    self.state["pending"][url] = None
+                yield self.article_request(url)
+
+        if self.pages:
+            return
 
         current_page = int(response.url.split("pageNumber=")[1])
+        self.state["page"] = max(self.state["page"], current_page)
 
-        if current_page < 5:
+        if article_urls and not new_urls:
+            self.logger.info(f"Only known articles on {response.url}, stopping")
+            self.state["paginated"] = True
+            return
+
+        if current_page >= self.last_page:
+            self.state["paginated"] = True
+        else:
             next_page = current_page + 1
-            next_page_url = f"https://www.zoomit.ir/archive/?sort=Newest&publishDate=All&readingTime=All&pageNumber={next_page}"
+            next_page_url = self.archive_url.format(page=next_page)
 
             yield response.follow(
-                next_page_url, callback=self.parse, meta={"playwright": True}
+                next_page_url, callback=self.parse, meta=self.request_meta("archive")
             )
 
     def parse_news_page(self, response):
+        if response.status == 304:
+            self.crawler.stats.inc_value("news/unchanged")
+            self.record_outcome(response.url, "unchanged")
+            return
 
-        content = ""
-
-        stop_titles = [
-            "تبلیغات",
-            "مقاله‌های مرتبط",
-            "مقاله‌ی مرتبط",
-            "مطالعه ",
-        ]
-
-        content_divs = response.css("div.sc-481293f7-1.jrhnOU")
-        for div in content_divs:
-            paragraphs = div.css(".sc-9996cfc-0")
-
-            for p in paragraphs:
-                if "fyrndR" in p.attrib.get("class", ""):
-                    continue
-                text_parts = p.css("::text").getall()
-                clean_text = " ".join(t.strip() for t in text_parts if t.strip())
-
-                if any(stop in clean_text for stop in stop_titles):
-                    continue
-                if (
-                    "داغ‌ترین مطالب روز" in clean_text
-                    or "مقالات جدید پیشنهادی" in clean_text
-                ):
-                    break
-
-                if clean_text:
-                    content += clean_text + "\n"
-
-        tags = response.xpath(
-            "/html/body/div/div[2]/div[1]/main/article/header/div/div/div[2]/div[1]"
-        ).css("a")
-        tags_list = [
-            tag.css("span::text").get().strip()
-            for tag in tags
-            if tag.css("span::text").get()
-        ]
+        article = extract_article(response)
+        if article["title"] is None:
+            self.record_outcome(
+                response.url, "failed", ExtractionError("No title on the page")
+            )
+            self.logger.warning(f"No title on {response.url}, skipping")
+            return
 
         yield {
-            "title": response.css("h1::text").get().strip(),
-            "content": content.strip(),
+            **article,
             "source": response.url,
-            "tags": tags_list,
+            "etag": self.validator(response, "ETag", 255),
+            "last_modified": self.validator(response, "Last-Modified", 64),
         }
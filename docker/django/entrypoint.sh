@@ -7,17 +7,22 @@ set -o pipefail
 postgres_ready() {
 python << END
 import sys
-import psycopg2
 
+# Production installs psycopg 3, local images psycopg2.
 try:
-    psycopg2.connect(
+    import psycopg as driver
+except ImportError:
+    import psycopg2 as driver
+
+try:
+    driver.connect(
         dbname="${POSTGRES_DB}",
         user="${POSTGRES_USER}",
         password="${POSTGRES_PASSWORD}",
         host="${POSTGRES_HOST}",
         port="${POSTGRES_PORT}",
     )
-except psycopg2.OperationalError:
+except driver.OperationalError:
     sys.exit(-1)
 sys.exit(0)
 
@@ -0,0 +1,16 @@
+#!/bin/sh
+
+set -o errexit
+set -o nounset
+
+cd /src/core
+
+# WSGI by default; DJANGO_SERVER_INTERFACE=asgi serves config.asgi with
+# uvicorn workers instead. Migrations and static files are the release
+# phase's job (/release.sh), so the container starts straight away.
+interface="${DJANGO_SERVER_INTERFACE:-wsgi}"
+if [ "${interface}" = "asgi" ]; then
+  export WEB_WORKER_CLASS="${WEB_WORKER_CLASS:-uvicorn_worker.UvicornWorker}"
+fi
+
+exec gunicorn -c python:config.gunicorn "config.${interface}:application"
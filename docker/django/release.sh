@@ -0,0 +1,13 @@
+#!/bin/sh
+
+set -o errexit
+set -o nounset
+
+# One-shot release phase: run once per deploy, before the API containers
+# start or reload, instead of in every container on every start.
+
+cd /src/core
+
+python manage.py migrate django_celery_beat --no-input
+python manage.py migrate --no-input
+python manage.py collectstatic --no-input
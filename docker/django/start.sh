@@ -3,11 +3,8 @@
 set -o errexit
 set -o nounset
 
-cd core
+/release.sh
 
-python manage.py migrate django_celery_beat
-python manage.py makemigrations --no-input
-python manage.py migrate --no-input
-python manage.py collectstatic --no-input
+cd /src/core
 
-exec python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+exec python manage.py runserver 0.0.0.0:8000